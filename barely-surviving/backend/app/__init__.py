@@ -1,3 +1,7 @@
 """Barely Surviving API - Backend Application"""
+import time
+
+# Start of the import-time phase in the startup report (see app/startup.py)
+IMPORT_STARTED = time.perf_counter()
 
 __version__ = "1.0.0"
@@ -0,0 +1,155 @@
+"""Maintenance commands: python -m app.cli <command>"""
+import argparse
+import asyncio
+from datetime import date
+
+from app.config import settings
+from app.database import connect_to_mongo, close_mongo_connection, sync_indexes
+from app.services.forecast import rebuild_regression
+from app.services.importer import IMPORT_KINDS, import_csv
+from app.services.partitioning import assign_owner, drop_legacy_indexes, shard_collections
+from app.services.query_plans import verify_query_plans
+from app.services.rollups import rebuild_rollups
+from app.services.weight_store import migrate_to_buckets
+
+
+async def _migrate(args: argparse.Namespace) -> None:
+    names = await sync_indexes()
+    print(f"Indexes in place: {len(names)}")
+    for name in names:
+        print(f"  {name}")
+
+
+async def _rebuild_rollups(args: argparse.Namespace) -> None:
+    count = await rebuild_rollups(day=args.day, user_id=args.user)
+    print(f"Rebuilt daily rollups: {count} day(s) stored")
+
+
+async def _rebuild_forecast(args: argparse.Namespace) -> None:
+    count = await rebuild_regression(user_id=args.user)
+    print(f"Rebuilt goal forecast sums: {count} week(s) stored")
+
+
+async def _migrate_weights(args: argparse.Namespace) -> None:
+    count = await migrate_to_buckets(drop_source=args.drop_source)
+    print(f"Migrated weights into {count} monthly bucket(s)")
+    if args.drop_source:
+        print("Removed the per-entry weights documents")
+
+
+async def _import_csv(args: argparse.Namespace) -> None:
+    with open(args.path, "rb") as source:
+        async for report in import_csv(IMPORT_KINDS[args.kind], args.user, source, args.batch_size):
+            print(
+                f"{'Done' if report['done'] else 'Progress'}: {report['rows']} rows read, "
+                f"{report['inserted']} inserted, {report['duplicates']} duplicates, {report['failed']} failed"
+            )
+    
+    for error in report["errors"]:
+        print(f"  row {error['row']}: {error['errors']}")
+    if "error" in report:
+        raise SystemExit(report["error"])
+
+
+async def _assign_owner(args: argparse.Namespace) -> None:
+    for collection, count in (await assign_owner(args.user)).items():
+        print(f"{collection}: {count} document(s) assigned to {args.user}")
+    for index in await drop_legacy_indexes():
+        print(f"Dropped legacy index {index}")
+
+
+async def _shard_collections(args: argparse.Namespace) -> None:
+    for namespace, key in (await shard_collections()).items():
+        print(f"Sharded {namespace} on {', '.join(key)}")
+
+
+async def _explain(args: argparse.Namespace) -> None:
+    results = await verify_query_plans()
+    for result in results:
+        status = "ok  " if result["ok"] else "FAIL"
+        print(f"{status} {result['name']}: {' <- '.join(result['stages'])}")
+    
+    failures = [result for result in results if not result["ok"]]
+    if failures:
+        raise SystemExit(f"{len(failures)} query shape(s) use COLLSCAN, an in-memory SORT or no index")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    migrate_indexes = commands.add_parser(
+        "migrate",
+        help="Create every collection's indexes (needed when the API runs with INDEX_SYNC=background or skip)",
+    )
+    migrate_indexes.set_defaults(handler=_migrate)
+    
+    rebuild = commands.add_parser(
+        "rebuild-rollups",
+        help="Backfill the daily_rollups collection from meals and workouts",
+    )
+    rebuild.add_argument("--day", type=date.fromisoformat, default=None, help="Only rebuild this day (YYYY-MM-DD)")
+    rebuild.add_argument("--user", default=None, help="Only rebuild this user's rollups")
+    rebuild.set_defaults(handler=_rebuild_rollups)
+    
+    forecast = commands.add_parser(
+        "rebuild-forecast",
+        help="Backfill the weight_regression sums behind the /goals/progress forecast",
+    )
+    forecast.add_argument("--user", default=None, help="Only rebuild this user's sums")
+    forecast.set_defaults(handler=_rebuild_forecast)
+    
+    migrate = commands.add_parser(
+        "migrate-weights",
+        help="Copy the weights collection into monthly weight_buckets (run before WEIGHT_STORAGE=buckets)",
+    )
+    migrate.add_argument("--drop-source", action="store_true", help="Delete the per-entry weights documents afterwards")
+    migrate.set_defaults(handler=_migrate_weights)
+    
+    importer = commands.add_parser(
+        "import-csv",
+        help="Stream a CSV export from another tracker into meals, workouts or weight",
+    )
+    importer.add_argument("kind", choices=sorted(IMPORT_KINDS))
+    importer.add_argument("path", help="CSV file to import")
+    importer.add_argument("--batch-size", type=int, default=None, help="Rows per write (default BULK_CHUNK_SIZE)")
+    importer.add_argument("--user", default=settings.default_user_id, help="Owner of the imported entries")
+    importer.set_defaults(handler=_import_csv)
+    
+    owner = commands.add_parser(
+        "assign-owner",
+        help="Give entries stored before multi-user support an owner and drop the old single-user indexes",
+    )
+    owner.add_argument("--user", default=settings.default_user_id, help="Owner to assign (default DEFAULT_USER_ID)")
+    owner.set_defaults(handler=_assign_owner)
+    
+    shard = commands.add_parser(
+        "shard-collections",
+        help="Enable sharding and shard every collection on user_id, entries also on date (run against a mongos)",
+    )
+    shard.set_defaults(handler=_shard_collections)
+    
+    explain = commands.add_parser(
+        "explain",
+        help="Explain every query shape the routes issue; fails on COLLSCAN or in-memory SORT",
+    )
+    explain.set_defaults(handler=_explain)
+    
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> None:
+    await connect_to_mongo()
+    try:
+        await args.handler(args)
+    finally:
+        await close_mongo_connection()
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
     # MongoDB
     mongodb_uri: str = "mongodb://localhost:27017"
     mongodb_db_name: str = "fitness_tracker"
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 10
+    mongodb_max_idle_time_ms: int = 300000
+    mongodb_compressors: str = "zstd,zlib"
+    mongodb_server_selection_timeout_ms: int = 5000
+    readiness_timeout_seconds: float = 2.0
+    # Index builds: "startup" creates missing indexes before serving, "background" once
+    # serving, "skip" never (run `python -m app.cli migrate` when deploying instead)
+    index_sync: Literal["startup", "background", "skip"] = "startup"
     
     # CORS
     cors_origins: str = "http://localhost:5173,http://localhost:3000"
@@ -13,8 +22,66 @@ class Settings(BaseSettings):
     # API
     api_v1_prefix: str = "/api/v1"
     
+    # Users: the auth gateway puts the caller's id in this header; requests
+    # without it belong to the default user (single-tenant deployments)
+    user_id_header: str = "X-User-Id"
+    default_user_id: str = "default"
+    
+    # Weight storage: "documents" (one per entry) or "buckets" (monthly bucket documents)
+    weight_storage: Literal["documents", "buckets"] = "documents"
+    
+    # Bulk ingest
+    bulk_max_items: int = 10000
+    bulk_chunk_size: int = 1000
+    
+    # Write-behind: single creates are queued and flushed with insert_many
+    # (acknowledged before they are durable; see the README)
+    write_behind: bool = False
+    write_behind_batch_size: int = 500
+    write_behind_flush_ms: int = 50
+    write_behind_max_queue: int = 10000
+    
+    # Live dashboard (GET /dashboard/events): updates buffered per connection before
+    # the oldest is dropped, and seconds between keepalive comments
+    events_buffer_size: int = 16
+    events_keepalive_seconds: int = 15
+    # Seconds a stream stays open before it ends and the client reconnects after
+    # events_retry_ms; keep it below the shutdown grace period so deploys drain streams
+    events_max_stream_seconds: int = 60
+    events_retry_ms: int = 1000
+    # Feed events from a MongoDB change stream (replica set or sharded cluster only)
+    # so writes served by any replica reach every open stream
+    events_change_streams: bool = False
+    
+    # Autocomplete: suggestions kept per user and kind (most used first), users kept in
+    # memory, days of history they are built from, and seconds before a user's suggestions
+    # are reloaded to pick up writes served by other replicas
+    autocomplete_max_entries: int = 500
+    autocomplete_max_users: int = 10000
+    autocomplete_lookback_days: int = 365
+    autocomplete_ttl: int = 300
+    
+    # Goal forecast: weeks of weight entries (including the current one) the trend line is fitted to
+    forecast_window_weeks: int = 4
+    
+    # Caching (TTLs in seconds)
+    streak_cache_ttl: int = 60
+    streak_cache_max_users: int = 10000
+    read_cache_ttl: int = 30
+    read_cache_max_entries: int = 1024
+    # Users whose last seen collection versions are remembered (see services/versions.py)
+    version_cache_max_users: int = 10000
+    
+    # Meal macro estimation (POST /meals/estimate): "stub" is a local keyword table for
+    # offline development, "anthropic" asks the model. Estimates are stored in MongoDB by
+    # normalized description; this many of the most recent are also kept in memory
+    macro_estimator: Literal["off", "stub", "anthropic"] = "off"
+    macro_cache_max_entries: int = 10000
+    
     # Anthropic (Phase 2)
     anthropic_api_key: Optional[str] = None
+    anthropic_model: str = "claude-3-haiku-20240307"
+    anthropic_timeout_seconds: float = 30.0
     
     # Logging
     log_level: str = "INFO"
@@ -1,14 +1,34 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
-from beanie import init_beanie
+from beanie.odm.fields import IndexModelField
+from beanie.odm.utils.init import Initializer
 from app.config import settings
+from app.metrics import command_listener, pool_listener
 from app.models.workout import Workout
 from app.models.meal import Meal
 from app.models.weight import Weight
 from app.models.goal import Goal
+from app.models.rollup import DailyRollup
+from app.models.weight_bucket import WeightBucket
+from app.models.version import CollectionVersion
+from app.models.regression import WeightRegression
+from app.models.macro_estimate import MacroEstimate
+from app.services.write_behind import write_queue
+from app.startup import startup_report
+
+
+USER_MODELS = [Workout, Meal, Weight, Goal, DailyRollup, WeightBucket, CollectionVersion, WeightRegression]
+# Shared by every user, so not partitioned by user_id
+SHARED_MODELS = [MacroEstimate]
+DOCUMENT_MODELS = USER_MODELS + SHARED_MODELS
 
 
 class Database:
     client: AsyncIOMotorClient = None
+    warm: bool = False
+    index_task: Optional[asyncio.Task] = None
 
 
 db = Database()
@@ -16,17 +36,86 @@ db = Database()
 
 async def connect_to_mongo():
     """Connect to MongoDB and initialize Beanie"""
-    db.client = AsyncIOMotorClient(settings.mongodb_uri)
+    db.client = AsyncIOMotorClient(
+        settings.mongodb_uri,
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+        compressors=settings.mongodb_compressors or None,
+        serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        event_listeners=[command_listener, pool_listener],
+    )
     
-    await init_beanie(
+    await DeferredIndexInitializer(
         database=db.client[settings.mongodb_db_name],
-        document_models=[Workout, Meal, Weight, Goal]
+        document_models=DOCUMENT_MODELS
     )
+    startup_report.mark("init_beanie")
+    if settings.index_sync == "startup":
+        await sync_indexes()
+        startup_report.mark("indexes")
+    elif settings.index_sync == "background":
+        db.index_task = asyncio.create_task(_sync_indexes_in_background())
+    await warm_pool()
+    startup_report.mark("warm_pool")
     print(f"Connected to MongoDB: {settings.mongodb_db_name}")
 
 
+class DeferredIndexInitializer(Initializer):
+    """init_beanie without its one-model-at-a-time index round trips; see sync_indexes"""
+    
+    async def init_indexes(self, cls, allow_index_dropping: bool = False) -> None:
+        return None
+
+
+async def sync_indexes() -> List[str]:
+    """Create every model's declared indexes, all collections at once; returns the index names"""
+    names = await asyncio.gather(*(
+        document_model.get_motor_collection().create_indexes(
+            IndexModelField.list_to_index_model(document_model.get_settings().indexes)
+        )
+        for document_model in DOCUMENT_MODELS
+        if document_model.get_settings().indexes
+    ))
+    return [name for created in names for name in created]
+
+
+async def _sync_indexes_in_background() -> None:
+    try:
+        names = await sync_indexes()
+    except Exception as exc:
+        print(f"Background index build failed (run python -m app.cli migrate): {exc!r}")
+        return
+    print(f"Background index build finished: {len(names)} index(es) in place")
+
+
+async def warm_pool():
+    """Open min_pool_size connections up front so the first requests skip connection setup"""
+    await asyncio.gather(*(
+        db.client.admin.command("ping")
+        for _ in range(max(settings.mongodb_min_pool_size, 1))
+    ))
+    db.warm = True
+
+
+async def check_ready() -> Dict[str, Any]:
+    """Ping MongoDB and report pool state; raises if the database is unreachable"""
+    if db.client is None or not db.warm:
+        raise ConnectionError("MongoDB connection pool is not warmed up yet")
+    await asyncio.wait_for(db.client.admin.command("ping"), settings.readiness_timeout_seconds)
+    return {
+        "max_pool_size": settings.mongodb_max_pool_size,
+        "min_pool_size": settings.mongodb_min_pool_size,
+        "servers": pool_listener.stats(),
+    }
+
+
 async def close_mongo_connection():
-    """Close MongoDB connection"""
+    """Flush queued writes, then close the MongoDB connection"""
+    await write_queue.stop()
+    if db.index_task is not None and not db.index_task.done():
+        db.index_task.cancel()
     if db.client:
+        db.warm = False
         db.client.close()
         print("Closed MongoDB connection")
@@ -0,0 +1,55 @@
+import re
+from typing import Annotated, Callable, Optional
+
+from fastapi import Depends, Header, HTTPException, Request, Response
+
+from app.config import settings
+from app.services.versions import etag_matches, make_etag, version_counters
+
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.@:|-]{1,128}$")
+
+
+async def current_user(
+    user_id: Optional[str] = Header(None, alias=settings.user_id_header),
+) -> str:
+    """Caller's user id as set by the auth gateway, or the default user"""
+    if user_id is None:
+        return settings.default_user_id
+    if not USER_ID_PATTERN.match(user_id):
+        raise HTTPException(status_code=400, detail=f"Invalid {settings.user_id_header} header")
+    return user_id
+
+
+CurrentUser = Annotated[str, Depends(current_user)]
+
+
+# Browsers revalidate with If-None-Match on every request instead of reusing a stale body
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+class NotModified(Exception):
+    """Raised by `conditional` before the handler runs; answered with an empty 304"""
+    
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Copy the ETag onto a response the handler built itself (FastAPI only merges headers into its own)"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
+    return response
+
+
+def conditional(*names: str) -> Callable:
+    """Dependency that ETags a GET by the caller's versions of `names` and short-circuits If-None-Match hits"""
+    async def check(request: Request, response: Response, user_id: CurrentUser) -> str:
+        versions = await version_counters.current(user_id, names)
+        target = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+        etag = make_etag(user_id, target, versions)
+        if etag_matches(etag, request.headers.get("if-none-match")):
+            raise NotModified(etag)
+        with_etag(response, etag)
+        return etag
+    
+    return check
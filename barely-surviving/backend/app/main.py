@@ -1,24 +1,41 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.database import check_ready, connect_to_mongo, close_mongo_connection
+from app.dependencies import ETAG_CACHE_CONTROL, NotModified
+from app.metrics import CONTENT_TYPE, Gauge, MetricsMiddleware, registry
+from app.services.cache import read_cache
+from app.services.events import event_hub
+from app.services.pagination import NEXT_CURSOR_HEADER
+from app.services.write_behind import write_queue
+from app.startup import startup_report
 from app.routes import (
     workouts_router,
     meals_router,
     weight_router,
     goals_router,
     dashboard_router,
+    analytics_router,
+    search_router,
+    export_router,
+    import_router,
 )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    startup_report.mark("import")
     await connect_to_mongo()
+    write_queue.start()
+    event_hub.start()
+    startup_report.ready()
     yield
     # Shutdown
+    await event_hub.stop()
     await close_mongo_connection()
 
 
@@ -36,27 +53,74 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+app.add_middleware(MetricsMiddleware)
+
+read_cache_gauge = registry.register(Gauge("read_cache", "Read cache counters by kind"))
+
+
+def _collect_read_cache():
+    for kind, value in read_cache.stats().items():
+        if isinstance(value, (int, float)):
+            read_cache_gauge.set(value, kind=kind)
+
+
+registry.collectors.append(_collect_read_cache)
+
+
+@app.exception_handler(NotModified)
+async def not_modified(request: Request, exc: NotModified):
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": ETAG_CACHE_CONTROL})
 
 # Health check endpoints
 @app.get("/health")
 async def health_check():
-    """Basic health check"""
+    """Basic health check (liveness: the process is up)"""
     return {"status": "healthy", "service": "barely-surviving-api"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: the pool is warm and MongoDB answers a ping"""
+    try:
+        pool = await check_ready()
+    except Exception as exc:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "detail": str(exc) or type(exc).__name__},
+        )
+    return {"status": "ready", "pool": pool}
+
+
 @app.get(f"{settings.api_v1_prefix}/health")
 async def api_health_check():
     """API health check"""
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for routes, MongoDB commands and the read cache"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get(f"{settings.api_v1_prefix}/cache/stats")
+async def cache_stats():
+    """Read cache hit/miss counters"""
+    return read_cache.stats()
+
+
 # Include routers
 app.include_router(workouts_router, prefix=settings.api_v1_prefix)
 app.include_router(meals_router, prefix=settings.api_v1_prefix)
 app.include_router(weight_router, prefix=settings.api_v1_prefix)
 app.include_router(goals_router, prefix=settings.api_v1_prefix)
 app.include_router(dashboard_router, prefix=settings.api_v1_prefix)
+app.include_router(analytics_router, prefix=settings.api_v1_prefix)
+app.include_router(search_router, prefix=settings.api_v1_prefix)
+app.include_router(export_router, prefix=settings.api_v1_prefix)
+app.include_router(import_router, prefix=settings.api_v1_prefix)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,293 @@
+"""Prometheus-format metrics for HTTP routes and MongoDB commands"""
+import threading
+import time
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> Labels:
+    return tuple(sorted((name, _escape(value)) for name, value in labels.items()))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.kind = "counter"
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self.kind = "gauge"
+    
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_labels(**labels)] = value
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.kind = "histogram"
+        self.buckets = buckets
+        self._values: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            # Per-bucket counts followed by total count and sum
+            counts = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+    
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, counts in self._values.items():
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', str(bound))])} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {counts[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {counts[-2]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+    
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route, method and status code"
+))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route and method"
+))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+))
+mongo_commands = registry.register(Counter(
+    "mongodb_commands_total", "MongoDB commands by collection, command and outcome"
+))
+mongo_latency = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and command"
+))
+mongo_documents = registry.register(Counter(
+    "mongodb_documents_returned_total", "Documents returned by MongoDB reads by collection and command"
+))
+mongo_pool = registry.register(Gauge(
+    "mongodb_pool_connections", "MongoDB pool connections by server and state"
+))
+write_behind_documents = registry.register(Counter(
+    "write_behind_documents_total", "Documents flushed by the write-behind queue by collection and outcome"
+))
+write_behind_depth = registry.register(Gauge(
+    "write_behind_queue_depth", "Documents waiting in the write-behind queue"
+))
+startup_seconds = registry.register(Gauge(
+    "startup_phase_seconds", "Seconds spent in each startup phase until the app was ready"
+))
+event_connections = registry.register(Gauge(
+    "dashboard_event_connections", "Open /dashboard/events streams"
+))
+events_dropped = registry.register(Counter(
+    "dashboard_events_dropped_total", "Dashboard updates dropped from full per-connection buffers"
+))
+macro_estimates = registry.register(Counter(
+    "macro_estimates_total", "Meal macro estimates served by source (memory, mongodb, estimator)"
+))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status codes and in-flight requests per route template"""
+    
+    def __init__(self, app):
+        self.app = app
+        self._in_flight = 0
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = {"code": 500}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+        
+        self._in_flight += 1
+        http_in_flight.set(self._in_flight)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._in_flight -= 1
+            http_in_flight.set(self._in_flight)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            http_latency.observe(elapsed, route=path, method=method)
+            http_requests.inc(route=path, method=method, status=str(status["code"]))
+
+
+# Commands whose first argument is the collection name
+_COLLECTION_COMMANDS = {
+    "find", "aggregate", "insert", "update", "delete", "count", "distinct",
+    "findAndModify", "createIndexes", "listIndexes", "explain",
+}
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """pymongo listener recording per-collection command counts, durations and documents returned"""
+    
+    def __init__(self):
+        self._collections: Dict[Tuple[int, int], str] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, event) -> Tuple[int, int]:
+        return (event.request_id, event.operation_id)
+    
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name == "getMore":
+            collection = event.command.get("collection", "")
+        elif event.command_name in _COLLECTION_COMMANDS:
+            collection = event.command.get(event.command_name, "")
+            if not isinstance(collection, str):
+                collection = "-"
+        else:
+            collection = "-"
+        with self._lock:
+            self._collections[self._key(event)] = collection
+    
+    def _finish(self, event, outcome: str) -> str:
+        with self._lock:
+            collection = self._collections.pop(self._key(event), "-")
+        seconds = event.duration_micros / 1_000_000
+        mongo_latency.observe(seconds, collection=collection, command=event.command_name)
+        mongo_commands.inc(collection=collection, command=event.command_name, outcome=outcome)
+        return collection
+    
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        collection = self._finish(event, "success")
+        cursor = event.reply.get("cursor") if isinstance(event.reply, Mapping) else None
+        if cursor:
+            returned = len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+            mongo_documents.inc(returned, collection=collection, command=event.command_name)
+    
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, "failure")
+
+
+command_listener = MongoCommandListener()
+
+
+class PoolListener(monitoring.ConnectionPoolListener):
+    """pymongo listener tracking open and checked-out connections per server"""
+    
+    def __init__(self):
+        self._open: Dict[str, int] = {}
+        self._checked_out: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def _adjust(self, counts: Dict[str, int], event, delta: int, state: str) -> None:
+        server = "%s:%s" % event.address
+        with self._lock:
+            counts[server] = max(counts.get(server, 0) + delta, 0)
+            mongo_pool.set(counts[server], server=server, state=state)
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                server: {"open": count, "checked_out": self._checked_out.get(server, 0)}
+                for server, count in self._open.items()
+            }
+    
+    def connection_created(self, event) -> None:
+        self._adjust(self._open, event, 1, "open")
+    
+    def connection_closed(self, event) -> None:
+        self._adjust(self._open, event, -1, "open")
+    
+    def connection_checked_out(self, event) -> None:
+        self._adjust(self._checked_out, event, 1, "checked_out")
+    
+    def connection_checked_in(self, event) -> None:
+        self._adjust(self._checked_out, event, -1, "checked_out")
+    
+    def pool_created(self, event) -> None:
+        pass
+    
+    def pool_ready(self, event) -> None:
+        pass
+    
+    def pool_cleared(self, event) -> None:
+        pass
+    
+    def pool_closed(self, event) -> None:
+        pass
+    
+    def connection_ready(self, event) -> None:
+        pass
+    
+    def connection_check_out_started(self, event) -> None:
+        pass
+    
+    def connection_check_out_failed(self, event) -> None:
+        pass
+
+
+pool_listener = PoolListener()
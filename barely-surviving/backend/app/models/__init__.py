@@ -2,5 +2,10 @@ from app.models.workout import Workout
 from app.models.meal import Meal
 from app.models.weight import Weight
 from app.models.goal import Goal
+from app.models.rollup import DailyRollup
+from app.models.weight_bucket import WeightBucket
+from app.models.version import CollectionVersion
+from app.models.regression import WeightRegression
+from app.models.macro_estimate import MacroEstimate
 
-__all__ = ["Workout", "Meal", "Weight", "Goal"]
+__all__ = ["Workout", "Meal", "Weight", "Goal", "DailyRollup", "WeightBucket", "CollectionVersion", "WeightRegression", "MacroEstimate"]
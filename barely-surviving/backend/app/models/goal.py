@@ -2,9 +2,11 @@ from beanie import Document
 from pydantic import Field
 from datetime import datetime, date
 from typing import Optional
+from pymongo import IndexModel, ASCENDING
 
 
 class Goal(Document):
+    user_id: str = Field(..., description="Owner of the goal")
     start_weight: float = Field(..., description="Starting weight in pounds")
     target_weight: float = Field(..., description="Target weight in pounds")
     target_date: Optional[date] = Field(default=None, description="Target date to reach goal")
@@ -16,6 +18,9 @@ class Goal(Document):
     
     class Settings:
         name = "goals"
+        indexes = [
+            IndexModel([("user_id", ASCENDING)], unique=True),
+        ]
     
     class Config:
         json_schema_extra = {
@@ -0,0 +1,22 @@
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING
+
+
+class MacroEstimate(Document):
+    key: str = Field(..., description="Hash of the normalized meal description")
+    estimator: str = Field(..., description="Estimator that produced the macros")
+    description: str = Field(..., description="Normalized meal description")
+    calories: int = Field(..., ge=0)
+    protein: int = Field(default=0, ge=0)
+    carbs: int = Field(default=0, ge=0)
+    fat: int = Field(default=0, ge=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "macro_estimates"
+        # Shared by every user: the same description always gets the same estimate
+        indexes = [
+            IndexModel([("key", ASCENDING), ("estimator", ASCENDING)], unique=True),
+        ]
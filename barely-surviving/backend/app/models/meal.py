@@ -1,10 +1,12 @@
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 from datetime import datetime
 from typing import Optional
 
 
 class Meal(Document):
+    user_id: str = Field(..., description="Owner of the entry")
     type: str = Field(..., description="Meal type: breakfast, lunch, dinner, snack")
     description: str = Field(..., description="Meal description")
     calories: int = Field(..., description="Total calories")
@@ -19,8 +21,11 @@ class Meal(Document):
     class Settings:
         name = "meals"
         indexes = [
-            "date",
-            "type",
+            # Ascending to support the {user_id: 1, date: 1} shard key; newest-first pages scan it backwards
+            IndexModel([("user_id", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("type", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+            # Full-text search over one user's entries (GET /search)
+            IndexModel([("user_id", ASCENDING), ("description", TEXT)]),
         ]
     
     class Config:
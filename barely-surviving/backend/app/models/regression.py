@@ -0,0 +1,23 @@
+from beanie import Document
+from pydantic import Field
+from datetime import date, datetime
+from typing import Optional
+from pymongo import IndexModel, ASCENDING
+
+
+class WeightRegression(Document):
+    user_id: str = Field(..., description="Owner of the weight entries")
+    week: date = Field(..., description="Monday of the week the sums cover")
+    entry_count: int = Field(default=0, alias="count", description="Number of weight entries")
+    sum_x: float = Field(default=0, description="Sum of entry days since the forecast epoch")
+    sum_y: float = Field(default=0, description="Sum of weights")
+    sum_xy: float = Field(default=0, description="Sum of day times weight")
+    sum_xx: float = Field(default=0, description="Sum of squared days")
+    expires_at: Optional[datetime] = Field(default=None, description="When the week leaves the forecast window")
+    
+    class Settings:
+        name = "weight_regression"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("week", ASCENDING)], unique=True),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
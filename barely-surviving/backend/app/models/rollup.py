@@ -0,0 +1,36 @@
+from beanie import Document
+from pydantic import Field
+from datetime import date
+from pymongo import IndexModel, ASCENDING
+
+
+class DailyRollup(Document):
+    user_id: str = Field(..., description="Owner of the totals")
+    day: date = Field(..., description="Day the totals belong to")
+    calories_consumed: int = Field(default=0, description="Total meal calories")
+    calories_burned: int = Field(default=0, description="Total workout calories burned")
+    protein: int = Field(default=0, description="Total protein in grams")
+    carbs: int = Field(default=0, description="Total carbohydrates in grams")
+    fat: int = Field(default=0, description="Total fat in grams")
+    meal_count: int = Field(default=0, description="Number of meals logged")
+    workout_count: int = Field(default=0, description="Number of workouts logged")
+    
+    class Settings:
+        name = "daily_rollups"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("day", ASCENDING)], unique=True),
+        ]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "day": "2026-02-09",
+                "calories_consumed": 1850,
+                "calories_burned": 245,
+                "protein": 140,
+                "carbs": 160,
+                "fat": 60,
+                "meal_count": 3,
+                "workout_count": 1
+            }
+        }
@@ -0,0 +1,15 @@
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING
+
+
+class CollectionVersion(Document):
+    user_id: str = Field(..., description="Owner of the counted entries")
+    collection: str = Field(..., description="Collection whose writes are counted")
+    version: int = Field(default=0, description="Bumped by every write to the user's entries")
+    
+    class Settings:
+        name = "collection_versions"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("collection", ASCENDING)], unique=True),
+        ]
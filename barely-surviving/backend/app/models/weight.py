@@ -1,10 +1,12 @@
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING
 from datetime import datetime
 from datetime import date as date_type
 
 
 class Weight(Document):
+    user_id: str = Field(..., description="Owner of the entry")
     weight: float = Field(..., description="Weight in pounds")
     date: date_type = Field(default_factory=lambda: datetime.utcnow().date(), description="Weight measurement date")
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -12,7 +14,8 @@ class Weight(Document):
     class Settings:
         name = "weights"
         indexes = [
-            "date",
+            # Ascending to support the {user_id: 1, date: 1} shard key; newest-first pages scan it backwards
+            IndexModel([("user_id", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)]),
         ]
     
     class Config:
@@ -0,0 +1,45 @@
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from datetime import datetime, date
+from typing import List, Optional
+
+
+class WeightBucketEntry(BaseModel):
+    id: PydanticObjectId = Field(..., alias="_id")
+    weight: float = Field(..., description="Weight in pounds")
+    date: datetime = Field(..., description="Weight measurement date (midnight)")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class WeightBucket(Document):
+    user_id: str = Field(..., description="Owner of the entries")
+    month: date = Field(..., description="First day of the month the entries belong to")
+    entries: List[WeightBucketEntry] = Field(default_factory=list, description="Entries sorted by date")
+    entry_count: int = Field(default=0, alias="count", description="Number of entries")
+    sum: float = Field(default=0.0, description="Sum of entry weights")
+    min: Optional[float] = Field(default=None, description="Lowest entry weight")
+    max: Optional[float] = Field(default=None, description="Highest entry weight")
+    last_added: List[PydanticObjectId] = Field(default_factory=list, description="Ids of the entries the latest write added")
+    
+    class Settings:
+        name = "weight_buckets"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("month", DESCENDING)], unique=True),
+            IndexModel([("user_id", ASCENDING), ("entries._id", ASCENDING)]),
+        ]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "user_id": "default",
+                "month": "2026-02-01",
+                "entries": [
+                    {"_id": "65c5f0a1e4b0a1b2c3d4e5f6", "weight": 167.5, "date": "2026-02-09T00:00:00"}
+                ],
+                "count": 1,
+                "sum": 167.5,
+                "min": 167.5,
+                "max": 167.5
+            }
+        }
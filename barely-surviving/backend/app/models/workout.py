@@ -1,10 +1,12 @@
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 from datetime import datetime
 from typing import Optional
 
 
 class Workout(Document):
+    user_id: str = Field(..., description="Owner of the entry")
     type: str = Field(..., description="Workout type: cardio, strength, flexibility, sports, other")
     name: str = Field(..., description="Workout name/title")
     duration: int = Field(..., description="Duration in minutes")
@@ -17,8 +19,11 @@ class Workout(Document):
     class Settings:
         name = "workouts"
         indexes = [
-            "date",
-            "type",
+            # Ascending to support the {user_id: 1, date: 1} shard key; newest-first pages scan it backwards
+            IndexModel([("user_id", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("type", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+            # Full-text search over one user's entries (GET /search)
+            IndexModel([("user_id", ASCENDING), ("name", TEXT)]),
         ]
     
     class Config:
@@ -3,6 +3,10 @@ from app.routes.meals import router as meals_router
 from app.routes.weight import router as weight_router
 from app.routes.goals import router as goals_router
 from app.routes.dashboard import router as dashboard_router
+from app.routes.analytics import router as analytics_router
+from app.routes.search import router as search_router
+from app.routes.export import router as export_router
+from app.routes.imports import router as import_router
 
 __all__ = [
     "workouts_router",
@@ -10,4 +14,8 @@ __all__ = [
     "weight_router",
     "goals_router",
     "dashboard_router",
+    "analytics_router",
+    "search_router",
+    "export_router",
+    "import_router",
 ]
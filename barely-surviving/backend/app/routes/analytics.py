@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Literal, Optional
+from datetime import date
+
+from app.dependencies import CurrentUser, conditional
+from app.services.analytics import get_analytics
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("")
+async def get_period_analytics(
+    user_id: CurrentUser,
+    period: Literal["week", "month"] = Query("week"),
+    range_: int = Query(4, alias="range", ge=1, le=104, description="Number of periods, ending with the current one"),
+    end_date: Optional[date] = Query(None, description="Any day in the last period (default today)"),
+    etag: str = Depends(conditional("meals", "workouts", "goals"))
+):
+    """Weekly or monthly totals, workout minutes by type and active days against the goal"""
+    return await get_analytics(user_id, period, range_, end_date or date.today())
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Literal
+from datetime import date
+
+from app.dependencies import CurrentUser
+from app.services.export import EXPORT_COLLECTIONS, EXPORT_MEDIA_TYPES, export_stream
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("")
+async def export_history(
+    user_id: CurrentUser,
+    format: Literal["csv", "ndjson", "parquet"] = Query("csv"),
+    collections: str = Query("meals,workouts,weight", description="Comma-separated: meals, workouts, weight"),
+    gzip: bool = Query(False, description="Gzip the file (adds .gz to the filename)")
+):
+    """Download the caller's full history as one streamed file"""
+    names = list(dict.fromkeys(name.strip() for name in collections.split(",") if name.strip()))
+    unknown = [name for name in names if name not in EXPORT_COLLECTIONS]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"collections must be a comma-separated subset of {', '.join(EXPORT_COLLECTIONS)}",
+        )
+    
+    filename = f"barely-surviving-{date.today().isoformat()}.{format}{'.gz' if gzip else ''}"
+    return StreamingResponse(
+        export_stream(user_id, names, format, gzip),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
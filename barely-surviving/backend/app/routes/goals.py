@@ -1,57 +1,80 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from beanie import PydanticObjectId
+from pymongo.errors import DuplicateKeyError
 
+from app.dependencies import CurrentUser, conditional
 from app.models.goal import Goal
-from app.models.weight import Weight
 from app.schemas.requests import GoalCreate, GoalUpdate
+from app.services.cache import read_cache, user_tag
+from app.services.forecast import forecast, get_regression_sums
+from app.services.versions import version_counters
+from app.services.weights import get_latest_weight
 
 router = APIRouter(prefix="/goals", tags=["goals"])
 
 
+async def _cached_goal(user_id: str) -> Optional[Goal]:
+    return await read_cache.get_or_load(
+        ("goals", user_id),
+        lambda: Goal.find_one({"user_id": user_id}),
+        tags=[user_tag(user_id, "goals")],
+    )
+
+
 @router.post("", response_model=Goal, status_code=201)
-async def create_or_update_goal(goal_data: GoalCreate):
-    """Create or update goals (only one goal set per user in Phase 1)"""
+async def create_or_update_goal(goal_data: GoalCreate, user_id: CurrentUser):
+    """Create or update goals (one goal set per user)"""
     # Check if a goal already exists
-    existing_goal = await Goal.find_one()
+    existing_goal = await Goal.find_one({"user_id": user_id})
     
     goal_dict = goal_data.model_dump()
     
-    if existing_goal:
-        # Update existing goal
-        goal_dict["updated_at"] = datetime.utcnow()
-        await existing_goal.set(goal_dict)
-        return existing_goal
-    else:
+    if not existing_goal:
         # Create new goal
-        goal = Goal(**goal_dict)
-        await goal.insert()
-        return goal
+        goal = Goal(**goal_dict, user_id=user_id)
+        try:
+            await goal.insert()
+        except DuplicateKeyError:
+            # A concurrent create for this user got in first; update its goal instead
+            existing_goal = await Goal.find_one({"user_id": user_id})
+        else:
+            read_cache.invalidate(user_tag(user_id, "goals"))
+            await version_counters.bump(user_id, "goals")
+            return goal
+    
+    # Update existing goal
+    goal_dict["updated_at"] = datetime.utcnow()
+    await existing_goal.set(goal_dict)
+    read_cache.invalidate(user_tag(user_id, "goals"))
+    await version_counters.bump(user_id, "goals")
+    return existing_goal
 
 
 @router.get("", response_model=Optional[Goal])
-async def get_goals():
+async def get_goals(user_id: CurrentUser, etag: str = Depends(conditional("goals"))):
     """Get current goals"""
-    goal = await Goal.find_one()
-    return goal
+    return await _cached_goal(user_id)
 
 
 @router.get("/progress")
-async def get_progress():
-    """Calculate progress towards goal"""
-    goal = await Goal.find_one()
+async def get_progress(user_id: CurrentUser, etag: str = Depends(conditional("goals", "weights"))):
+    """Calculate progress towards goal, with a projected date from the recent weight trend"""
+    goal = await _cached_goal(user_id)
     
     if not goal:
         raise HTTPException(status_code=404, detail="No goals set")
     
     # Get latest weight
-    latest_weight = await Weight.find_one(sort=[("date", -1)])
+    latest_weight = await get_latest_weight(user_id)
     
     if not latest_weight:
         current_weight = goal.start_weight
+        as_of = date.today()
     else:
         current_weight = latest_weight.weight
+        as_of = latest_weight.date
     
     # Calculate progress
     total_to_lose = goal.start_weight - goal.target_weight
@@ -71,14 +94,15 @@ async def get_progress():
         "total_to_lose": round(total_to_lose, 2),
         "lost_so_far": round(lost_so_far, 2),
         "remaining": round(remaining, 2),
-        "percent_complete": round(percent_complete, 1)
+        "percent_complete": round(percent_complete, 1),
+        **forecast(goal, await get_regression_sums(user_id), current_weight, as_of)
     }
 
 
 @router.put("/{goal_id}", response_model=Goal)
-async def update_goal(goal_id: PydanticObjectId, goal_data: GoalUpdate):
+async def update_goal(goal_id: PydanticObjectId, goal_data: GoalUpdate, user_id: CurrentUser):
     """Update specific goal"""
-    goal = await Goal.get(goal_id)
+    goal = await Goal.find_one({"_id": goal_id, "user_id": user_id})
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
@@ -86,16 +110,20 @@ async def update_goal(goal_id: PydanticObjectId, goal_data: GoalUpdate):
     if update_data:
         update_data["updated_at"] = datetime.utcnow()
         await goal.set(update_data)
+        read_cache.invalidate(user_tag(user_id, "goals"))
+        await version_counters.bump(user_id, "goals")
     
     return goal
 
 
 @router.delete("/{goal_id}", status_code=204)
-async def delete_goal(goal_id: PydanticObjectId):
+async def delete_goal(goal_id: PydanticObjectId, user_id: CurrentUser):
     """Delete a goal"""
-    goal = await Goal.get(goal_id)
+    goal = await Goal.find_one({"_id": goal_id, "user_id": user_id})
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
     await goal.delete()
+    read_cache.invalidate(user_tag(user_id, "goals"))
+    await version_counters.bump(user_id, "goals")
     return None
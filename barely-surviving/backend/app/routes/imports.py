@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import UploadFile
+from typing import AsyncIterator
+
+from app.dependencies import CurrentUser
+from app.services.importer import IMPORT_KINDS, import_csv
+from app.services.serialize import dumps
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+UPLOAD_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary", "description": "CSV export"}},
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("/{kind}", openapi_extra=UPLOAD_SCHEMA)
+async def import_file(kind: str, request: Request, user_id: CurrentUser):
+    """Import a CSV export, streaming one NDJSON progress line per written batch"""
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown import kind; use one of {', '.join(IMPORT_KINDS)}")
+    
+    # Parsed here rather than declared as a File parameter: FastAPI closes declared
+    # uploads when the handler returns, before the streamed response has read them
+    form = await request.form()
+    upload = form.get("file")
+    if not isinstance(upload, UploadFile):
+        await form.close()
+        raise HTTPException(status_code=400, detail="Upload the CSV as the multipart field 'file'")
+    
+    async def progress() -> AsyncIterator[bytes]:
+        try:
+            async for report in import_csv(IMPORT_KINDS[kind], user_id, upload.file):
+                yield dumps(report) + b"\n"
+        finally:
+            await form.close()
+    
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
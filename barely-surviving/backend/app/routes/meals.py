@@ -1,35 +1,85 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from typing import Any, List, Optional
 from datetime import datetime, date
 from beanie import PydanticObjectId
 
+from app.config import settings
+from app.dependencies import CurrentUser, conditional, with_etag
 from app.models.meal import Meal
-from app.schemas.requests import MealCreate, MealUpdate
+from app.schemas.requests import MealCreate, MealEstimateRequest, MealUpdate
+from app.services.autocomplete import autocomplete_index
+from app.services.bulk import bulk_insert
+from app.services.cache import day_tag, read_cache, user_tag
+from app.services.estimation import EstimationUnavailable, macro_cache
+from app.services.events import event_hub
+from app.services.listing import list_page, stream_ndjson
+from app.services.pagination import after_cursor
+from app.services.partitioning import shard_filter
+from app.services.rollups import apply_deltas, get_rollup, meal_delta
+from app.services.summary import stored_datetime
+from app.services.versions import version_counters
+from app.services.write_behind import write_queue
 
 router = APIRouter(prefix="/meals", tags=["meals"])
 
 
-@router.post("", response_model=Meal, status_code=201)
-async def create_meal(meal_data: MealCreate):
-    """Create a new meal entry"""
+def build_meal(meal_data: MealCreate, user_id: str) -> Meal:
     meal_dict = meal_data.model_dump()
-    if meal_dict.get("date") is None:
-        meal_dict["date"] = datetime.utcnow()
-    
-    meal = Meal(**meal_dict)
+    meal_dict["user_id"] = user_id
+    meal_dict["date"] = stored_datetime(meal_dict.get("date") or datetime.utcnow())
+    return Meal(**meal_dict)
+
+
+@router.post("", response_model=Meal, status_code=201)
+async def create_meal(meal_data: MealCreate, user_id: CurrentUser, response: Response):
+    """Create a new meal entry (202 when queued for a write-behind flush)"""
+    meal = build_meal(meal_data, user_id)
+    if write_queue.enabled:
+        await write_queue.enqueue(meal)
+        response.status_code = 202
+        return meal
     await meal.insert()
+    await apply_deltas([meal_delta(meal)])
+    await version_counters.bump(user_id, "meals")
+    autocomplete_index.observe([meal])
+    event_hub.publish(user_id, meal)
     return meal
 
 
+@router.post("/bulk")
+async def bulk_create_meals(user_id: CurrentUser, items: List[Any] = Body(..., max_length=settings.bulk_max_items)):
+    """Create many meals at once, reporting validation and write errors per item"""
+    meals, report = await bulk_insert(Meal, items, MealCreate, lambda meal_data: build_meal(meal_data, user_id))
+    await apply_deltas(meal_delta(meal) for meal in meals)
+    if meals:
+        await version_counters.bump(user_id, "meals")
+        autocomplete_index.observe(meals)
+        event_hub.publish(user_id)
+    return report
+
+
+@router.post("/estimate")
+async def estimate_meal(request: MealEstimateRequest, user_id: CurrentUser):
+    """Estimate a meal's macros from its description (repeat descriptions answer from the cache)"""
+    try:
+        return await macro_cache.estimate(request.description)
+    except EstimationUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+
 @router.get("", response_model=List[Meal])
 async def list_meals(
+    user_id: CurrentUser,
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     meal_type: Optional[str] = Query(None),
-    limit: int = Query(100, le=500)
+    limit: int = Query(100, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    stream: bool = Query(False, description="Stream every match as NDJSON instead of one page"),
+    etag: str = Depends(conditional("meals"))
 ):
     """List meals with optional filtering"""
-    query = {}
+    query = {"user_id": user_id}
     
     if start_date or end_date:
         date_query = {}
@@ -42,68 +92,85 @@ async def list_meals(
     if meal_type:
         query["type"] = meal_type
     
-    meals = await Meal.find(query).sort("-date").limit(limit).to_list()
-    return meals
+    if stream:
+        return with_etag(stream_ndjson(Meal, after_cursor(query, cursor)), etag)
+    
+    return with_etag(await list_page(Meal, query, limit, cursor), etag)
 
 
 @router.get("/daily-summary")
-async def get_daily_summary(target_date: Optional[date] = Query(None)):
+async def get_daily_summary(
+    user_id: CurrentUser,
+    target_date: Optional[date] = Query(None),
+    etag: str = Depends(conditional("meals"))
+):
     """Get daily nutrition summary"""
     if target_date is None:
         target_date = date.today()
     
-    start_datetime = datetime.combine(target_date, datetime.min.time())
-    end_datetime = datetime.combine(target_date, datetime.max.time())
-    
-    meals = await Meal.find({
-        "date": {"$gte": start_datetime, "$lte": end_datetime}
-    }).to_list()
-    
-    total_calories = sum(meal.calories for meal in meals)
-    total_protein = sum(meal.protein for meal in meals)
-    total_carbs = sum(meal.carbs or 0 for meal in meals)
-    total_fat = sum(meal.fat or 0 for meal in meals)
+    return await read_cache.get_or_load(
+        ("meals.daily-summary", user_id, target_date),
+        lambda: _load_daily_summary(user_id, target_date),
+        tags=[day_tag(user_id, target_date), user_tag(user_id, "rollups")],
+    )
+
+
+async def _load_daily_summary(user_id: str, target_date: date) -> dict:
+    rollup = await get_rollup(user_id, target_date)
     
     return {
         "date": target_date,
-        "total_calories": total_calories,
-        "total_protein": total_protein,
-        "total_carbs": total_carbs,
-        "total_fat": total_fat,
-        "meal_count": len(meals)
+        "total_calories": rollup.calories_consumed,
+        "total_protein": rollup.protein,
+        "total_carbs": rollup.carbs,
+        "total_fat": rollup.fat,
+        "meal_count": rollup.meal_count
     }
 
 
 @router.get("/{meal_id}", response_model=Meal)
-async def get_meal(meal_id: PydanticObjectId):
+async def get_meal(meal_id: PydanticObjectId, user_id: CurrentUser):
     """Get a single meal by ID"""
-    meal = await Meal.get(meal_id)
+    meal = await Meal.find_one({"_id": meal_id, "user_id": user_id})
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found")
     return meal
 
 
 @router.put("/{meal_id}", response_model=Meal)
-async def update_meal(meal_id: PydanticObjectId, meal_data: MealUpdate):
+async def update_meal(meal_id: PydanticObjectId, meal_data: MealUpdate, user_id: CurrentUser):
     """Update a meal"""
-    meal = await Meal.get(meal_id)
+    meal = await Meal.find_one({"_id": meal_id, "user_id": user_id})
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found")
     
     update_data = meal_data.model_dump(exclude_unset=True)
     if update_data:
+        previous = meal_delta(meal, sign=-1)
+        if update_data.get("date") is not None:
+            update_data["date"] = stored_datetime(update_data["date"])
         update_data["updated_at"] = datetime.utcnow()
-        await meal.set(update_data)
+        await meal.get_motor_collection().update_one(shard_filter(meal), {"$set": update_data})
+        for field, value in update_data.items():
+            setattr(meal, field, value)
+        await apply_deltas([previous, meal_delta(meal)])
+        await version_counters.bump(user_id, "meals")
+        autocomplete_index.forget(user_id)
+        event_hub.publish(user_id)
     
     return meal
 
 
 @router.delete("/{meal_id}", status_code=204)
-async def delete_meal(meal_id: PydanticObjectId):
+async def delete_meal(meal_id: PydanticObjectId, user_id: CurrentUser):
     """Delete a meal"""
-    meal = await Meal.get(meal_id)
+    meal = await Meal.find_one({"_id": meal_id, "user_id": user_id})
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found")
     
     await meal.delete()
+    await apply_deltas([meal_delta(meal, sign=-1)])
+    await version_counters.bump(user_id, "meals")
+    autocomplete_index.forget(user_id)
+    event_hub.publish(user_id)
     return None
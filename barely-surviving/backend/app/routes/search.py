@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Literal, Optional
+
+from app.dependencies import CurrentUser, conditional
+from app.services.autocomplete import autocomplete_index
+from app.services.search import search_entries
+
+router = APIRouter(tags=["search"])
+
+
+@router.get("/search")
+async def search(
+    user_id: CurrentUser,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in meal descriptions and workout names"),
+    kind: Optional[Literal["meal", "workout"]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    etag: str = Depends(conditional("meals", "workouts"))
+):
+    """Full-text search over meals and workouts, grouped into distinct entries"""
+    return {"results": await search_entries(user_id, q, kind, limit)}
+
+
+@router.get("/autocomplete")
+async def autocomplete(
+    user_id: CurrentUser,
+    q: str = Query(..., min_length=1, max_length=100, description="Start of any word of the entry"),
+    kind: Optional[Literal["meal", "workout"]] = Query(None),
+    limit: int = Query(8, ge=1, le=50),
+):
+    """Frequent meals and workouts starting with `q`, with their last-used macros or duration"""
+    return {"suggestions": await autocomplete_index.suggest(user_id, q, kind, limit)}
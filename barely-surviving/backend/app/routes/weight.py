@@ -1,58 +1,102 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from datetime import datetime, date, timedelta
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from typing import Any, List, Optional
+from datetime import date, timedelta
 from beanie import PydanticObjectId
 
+from app.config import settings
+from app.dependencies import CurrentUser, conditional, with_etag
 from app.models.weight import Weight
 from app.schemas.requests import WeightCreate
+from app.services.bulk import bulk_insert
+from app.services.cache import read_cache, user_tag
+from app.services.events import event_hub
+from app.services.forecast import apply_regression_deltas, weight_delta
+from app.services.versions import version_counters
+from app.services.weight_store import get_weight_store
+from app.services.write_behind import write_queue
 
 router = APIRouter(prefix="/weight", tags=["weight"])
 
 
-@router.post("", response_model=Weight, status_code=201)
-async def create_weight(weight_data: WeightCreate):
-    """Log a new weight entry"""
+def build_weight(weight_data: WeightCreate, user_id: str) -> Weight:
     weight_dict = weight_data.model_dump()
+    weight_dict["user_id"] = user_id
     if weight_dict.get("date") is None:
         weight_dict["date"] = date.today()
-    
-    weight = Weight(**weight_dict)
-    await weight.insert()
+    return Weight(**weight_dict)
+
+
+@router.post("", response_model=Weight, status_code=201)
+async def create_weight(weight_data: WeightCreate, user_id: CurrentUser, response: Response):
+    """Log a new weight entry (202 when queued for a write-behind flush)"""
+    weight = build_weight(weight_data, user_id)
+    if write_queue.enabled:
+        await write_queue.enqueue(weight)
+        response.status_code = 202
+        return weight
+    await get_weight_store().insert(weight)
+    await apply_regression_deltas([weight_delta(weight)])
+    read_cache.invalidate(user_tag(user_id, "weights"))
+    await version_counters.bump(user_id, "weights")
+    event_hub.publish(user_id, weight)
     return weight
 
 
+@router.post("/bulk")
+async def bulk_create_weights(user_id: CurrentUser, items: List[Any] = Body(..., max_length=settings.bulk_max_items)):
+    """Log many weight entries at once, reporting validation and write errors per item"""
+    weights, report = await bulk_insert(
+        Weight,
+        items,
+        WeightCreate,
+        lambda weight_data: build_weight(weight_data, user_id),
+        get_weight_store().insert_many,
+    )
+    if weights:
+        await apply_regression_deltas(weight_delta(weight) for weight in weights)
+        read_cache.invalidate(user_tag(user_id, "weights"))
+        await version_counters.bump(user_id, "weights")
+        event_hub.publish(user_id)
+    return report
+
+
 @router.get("", response_model=List[Weight])
 async def list_weights(
+    user_id: CurrentUser,
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    limit: int = Query(100, le=500)
+    limit: int = Query(100, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    stream: bool = Query(False, description="Stream every match as NDJSON instead of one page"),
+    etag: str = Depends(conditional("weights"))
 ):
     """List weight entries with optional filtering"""
-    query = {}
+    store = get_weight_store()
     
-    if start_date or end_date:
-        date_query = {}
-        if start_date:
-            date_query["$gte"] = start_date
-        if end_date:
-            date_query["$lte"] = end_date
-        query["date"] = date_query
+    if stream:
+        return with_etag(store.stream(user_id, start_date, end_date, cursor), etag)
     
-    weights = await Weight.find(query).sort("-date").limit(limit).to_list()
-    return weights
+    return with_etag(await store.list_page(user_id, start_date, end_date, limit, cursor), etag)
 
 
 @router.get("/trend")
-async def get_weight_trend(days: int = Query(7, ge=1, le=365)):
+async def get_weight_trend(
+    user_id: CurrentUser,
+    days: int = Query(7, ge=1, le=3650),
+    max_points: int = Query(366, ge=3, le=5000, description="Downsample (LTTB) to at most this many points"),
+    window: int = Query(7, ge=1, le=90, description="Moving average window in data points"),
+    etag: str = Depends(conditional("weights"))
+):
     """Get weight trend over specified number of days"""
+    # numpy is only needed here, so it is imported on the first trend request rather than at startup
+    from app.services.trend import build_trend, load_series
+    
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     
-    weights = await Weight.find({
-        "date": {"$gte": start_date, "$lte": end_date}
-    }).sort("date").to_list()
+    dates, weights = await load_series(user_id, start_date, end_date)
     
-    if not weights:
+    if not dates:
         return {
             "start_date": start_date,
             "end_date": end_date,
@@ -60,46 +104,46 @@ async def get_weight_trend(days: int = Query(7, ge=1, le=365)):
             "trend": []
         }
     
-    # Calculate trend
-    trend_data = [
-        {
-            "date": w.date,
-            "weight": w.weight
-        }
-        for w in weights
-    ]
+    trend_data = build_trend(dates, weights, max_points, window)
     
     # Calculate change
-    start_weight = weights[0].weight if weights else 0
-    current_weight = weights[-1].weight if weights else 0
+    start_weight = float(weights[0])
+    current_weight = float(weights[-1])
     change = current_weight - start_weight
     
     return {
         "start_date": start_date,
         "end_date": end_date,
-        "data_points": len(weights),
+        "data_points": len(dates),
+        "returned_points": len(trend_data),
         "start_weight": start_weight,
         "current_weight": current_weight,
         "change": round(change, 2),
+        "true_weight": trend_data[-1]["true_weight"],
         "trend": trend_data
     }
 
 
 @router.get("/{weight_id}", response_model=Weight)
-async def get_weight(weight_id: PydanticObjectId):
+async def get_weight(weight_id: PydanticObjectId, user_id: CurrentUser):
     """Get a single weight entry by ID"""
-    weight = await Weight.get(weight_id)
+    weight = await get_weight_store().get(user_id, weight_id)
     if not weight:
         raise HTTPException(status_code=404, detail="Weight entry not found")
     return weight
 
 
 @router.delete("/{weight_id}", status_code=204)
-async def delete_weight(weight_id: PydanticObjectId):
+async def delete_weight(weight_id: PydanticObjectId, user_id: CurrentUser):
     """Delete a weight entry"""
-    weight = await Weight.get(weight_id)
+    store = get_weight_store()
+    weight = await store.get(user_id, weight_id)
     if not weight:
         raise HTTPException(status_code=404, detail="Weight entry not found")
     
-    await weight.delete()
+    await store.delete(weight)
+    await apply_regression_deltas([weight_delta(weight, sign=-1)])
+    read_cache.invalidate(user_tag(user_id, "weights"))
+    await version_counters.bump(user_id, "weights")
+    event_hub.publish(user_id)
     return None
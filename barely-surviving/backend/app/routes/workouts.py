@@ -1,35 +1,76 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from typing import Any, List, Optional
 from datetime import datetime, date
 from beanie import PydanticObjectId
 
+from app.config import settings
+from app.dependencies import CurrentUser, conditional, with_etag
 from app.models.workout import Workout
 from app.schemas.requests import WorkoutCreate, WorkoutUpdate
+from app.services.autocomplete import autocomplete_index
+from app.services.bulk import bulk_insert
+from app.services.events import event_hub
+from app.services.listing import list_page, stream_ndjson
+from app.services.pagination import after_cursor
+from app.services.partitioning import shard_filter
+from app.services.rollups import apply_deltas, workout_delta
+from app.services.summary import stored_datetime
+from app.services.versions import version_counters
+from app.services.write_behind import write_queue
 
 router = APIRouter(prefix="/workouts", tags=["workouts"])
 
 
-@router.post("", response_model=Workout, status_code=201)
-async def create_workout(workout_data: WorkoutCreate):
-    """Create a new workout entry"""
+def build_workout(workout_data: WorkoutCreate, user_id: str) -> Workout:
     workout_dict = workout_data.model_dump()
-    if workout_dict.get("date") is None:
-        workout_dict["date"] = datetime.utcnow()
-    
-    workout = Workout(**workout_dict)
+    workout_dict["user_id"] = user_id
+    workout_dict["date"] = stored_datetime(workout_dict.get("date") or datetime.utcnow())
+    return Workout(**workout_dict)
+
+
+@router.post("", response_model=Workout, status_code=201)
+async def create_workout(workout_data: WorkoutCreate, user_id: CurrentUser, response: Response):
+    """Create a new workout entry (202 when queued for a write-behind flush)"""
+    workout = build_workout(workout_data, user_id)
+    if write_queue.enabled:
+        await write_queue.enqueue(workout)
+        response.status_code = 202
+        return workout
     await workout.insert()
+    await apply_deltas([workout_delta(workout)])
+    await version_counters.bump(user_id, "workouts")
+    autocomplete_index.observe([workout])
+    event_hub.publish(user_id, workout)
     return workout
 
 
+@router.post("/bulk")
+async def bulk_create_workouts(user_id: CurrentUser, items: List[Any] = Body(..., max_length=settings.bulk_max_items)):
+    """Create many workouts at once, reporting validation and write errors per item"""
+    workouts, report = await bulk_insert(
+        Workout, items, WorkoutCreate, lambda workout_data: build_workout(workout_data, user_id)
+    )
+    await apply_deltas(workout_delta(workout) for workout in workouts)
+    if workouts:
+        await version_counters.bump(user_id, "workouts")
+        autocomplete_index.observe(workouts)
+        event_hub.publish(user_id)
+    return report
+
+
 @router.get("", response_model=List[Workout])
 async def list_workouts(
+    user_id: CurrentUser,
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     workout_type: Optional[str] = Query(None),
-    limit: int = Query(100, le=500)
+    limit: int = Query(100, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    stream: bool = Query(False, description="Stream every match as NDJSON instead of one page"),
+    etag: str = Depends(conditional("workouts"))
 ):
     """List workouts with optional filtering"""
-    query = {}
+    query = {"user_id": user_id}
     
     if start_date or end_date:
         date_query = {}
@@ -42,40 +83,55 @@ async def list_workouts(
     if workout_type:
         query["type"] = workout_type
     
-    workouts = await Workout.find(query).sort("-date").limit(limit).to_list()
-    return workouts
+    if stream:
+        return with_etag(stream_ndjson(Workout, after_cursor(query, cursor)), etag)
+    
+    return with_etag(await list_page(Workout, query, limit, cursor), etag)
 
 
 @router.get("/{workout_id}", response_model=Workout)
-async def get_workout(workout_id: PydanticObjectId):
+async def get_workout(workout_id: PydanticObjectId, user_id: CurrentUser):
     """Get a single workout by ID"""
-    workout = await Workout.get(workout_id)
+    workout = await Workout.find_one({"_id": workout_id, "user_id": user_id})
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     return workout
 
 
 @router.put("/{workout_id}", response_model=Workout)
-async def update_workout(workout_id: PydanticObjectId, workout_data: WorkoutUpdate):
+async def update_workout(workout_id: PydanticObjectId, workout_data: WorkoutUpdate, user_id: CurrentUser):
     """Update a workout"""
-    workout = await Workout.get(workout_id)
+    workout = await Workout.find_one({"_id": workout_id, "user_id": user_id})
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     
     update_data = workout_data.model_dump(exclude_unset=True)
     if update_data:
+        previous = workout_delta(workout, sign=-1)
+        if update_data.get("date") is not None:
+            update_data["date"] = stored_datetime(update_data["date"])
         update_data["updated_at"] = datetime.utcnow()
-        await workout.set(update_data)
+        await workout.get_motor_collection().update_one(shard_filter(workout), {"$set": update_data})
+        for field, value in update_data.items():
+            setattr(workout, field, value)
+        await apply_deltas([previous, workout_delta(workout)])
+        await version_counters.bump(user_id, "workouts")
+        autocomplete_index.forget(user_id)
+        event_hub.publish(user_id)
     
     return workout
 
 
 @router.delete("/{workout_id}", status_code=204)
-async def delete_workout(workout_id: PydanticObjectId):
+async def delete_workout(workout_id: PydanticObjectId, user_id: CurrentUser):
     """Delete a workout"""
-    workout = await Workout.get(workout_id)
+    workout = await Workout.find_one({"_id": workout_id, "user_id": user_id})
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     
     await workout.delete()
+    await apply_deltas([workout_delta(workout, sign=-1)])
+    await version_counters.bump(user_id, "workouts")
+    autocomplete_index.forget(user_id)
+    event_hub.publish(user_id)
     return None
@@ -3,6 +3,7 @@ from app.schemas.requests import (
     WorkoutUpdate,
     MealCreate,
     MealUpdate,
+    MealEstimateRequest,
     WeightCreate,
     GoalCreate,
     GoalUpdate,
@@ -13,6 +14,7 @@ __all__ = [
     "WorkoutUpdate",
     "MealCreate",
     "MealUpdate",
+    "MealEstimateRequest",
     "WeightCreate",
     "GoalCreate",
     "GoalUpdate",
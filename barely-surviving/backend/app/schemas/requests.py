@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime, date
+from datetime import date as date_type
 from typing import Optional
 
 
@@ -45,10 +46,14 @@ class MealUpdate(BaseModel):
     date: Optional[datetime] = None
 
 
+class MealEstimateRequest(BaseModel):
+    description: str = Field(..., min_length=1, max_length=500)
+
+
 # Weight Schemas
 class WeightCreate(BaseModel):
     weight: float = Field(..., gt=0)
-    date: Optional[date] = None
+    date: Optional[date_type] = None
 
 
 # Goal Schemas
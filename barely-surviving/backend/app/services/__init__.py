@@ -0,0 +1 @@
+"""Query engines shared by the API routes"""
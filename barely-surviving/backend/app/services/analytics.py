@@ -0,0 +1,151 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.goal import Goal
+from app.models.meal import Meal
+from app.models.workout import Workout
+
+
+def period_start(day: date, period: str) -> date:
+    """First day of the week (Monday) or month holding `day`"""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _next_start(start: date, period: str) -> date:
+    if period == "week":
+        return start + timedelta(weeks=1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def period_starts(end_date: date, period: str, count: int) -> List[date]:
+    """Starts of the `count` periods ending with the one holding `end_date`, oldest first"""
+    starts = [period_start(end_date, period)]
+    while len(starts) < count:
+        previous = starts[0] - timedelta(days=1)
+        starts.insert(0, period_start(previous, period))
+    return starts
+
+
+def _is(kind: str) -> Dict[str, Any]:
+    return {"$cond": [{"$eq": ["$kind", kind]}, 1, 0]}
+
+
+def analytics_pipeline(user_id: str, period: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """Meals plus workouts in [start, end), bucketed with $dateTrunc and summarised three ways in one $facet"""
+    match = {"$match": {"user_id": user_id, "date": {"$gte": start, "$lt": end}}}
+    truncate: Dict[str, Any] = {"date": "$date", "unit": period}
+    if period == "week":
+        truncate["startOfWeek"] = "monday"
+    return [
+        match,
+        {"$project": {"date": 1, "calories": 1, "protein": 1, "carbs": 1, "fat": 1, "kind": {"$literal": "meal"}}},
+        {"$unionWith": {
+            "coll": Workout.get_settings().name,
+            "pipeline": [
+                match,
+                {"$project": {"date": 1, "type": 1, "duration": 1, "calories_burned": 1, "kind": {"$literal": "workout"}}},
+            ],
+        }},
+        {"$set": {
+            "period": {"$dateTrunc": truncate},
+            "day": {"$dateTrunc": {"date": "$date", "unit": "day"}},
+        }},
+        {"$facet": {
+            "totals": [
+                {"$group": {
+                    "_id": "$period",
+                    "calories_in": {"$sum": {"$ifNull": ["$calories", 0]}},
+                    "calories_out": {"$sum": {"$ifNull": ["$calories_burned", 0]}},
+                    "protein": {"$sum": {"$ifNull": ["$protein", 0]}},
+                    "carbs": {"$sum": {"$ifNull": ["$carbs", 0]}},
+                    "fat": {"$sum": {"$ifNull": ["$fat", 0]}},
+                    "meal_count": {"$sum": _is("meal")},
+                    "workout_count": {"$sum": _is("workout")},
+                }},
+            ],
+            "workout_minutes": [
+                {"$match": {"kind": "workout"}},
+                {"$group": {"_id": {"period": "$period", "type": "$type"}, "minutes": {"$sum": "$duration"}}},
+            ],
+            "days": [
+                {"$group": {"_id": {"period": "$period", "day": "$day"}, "workouts": {"$sum": _is("workout")}}},
+                {"$group": {
+                    "_id": "$_id.period",
+                    "active_days": {"$sum": 1},
+                    "workout_days": {"$sum": {"$cond": [{"$gt": ["$workouts", 0]}, 1, 0]}},
+                }},
+            ],
+        }},
+    ]
+
+
+def _compare(actual: int, weekly_target: Optional[int], days: int) -> Tuple[Optional[int], Optional[bool]]:
+    """Scale a per-week goal to a period of `days` days and check it"""
+    if weekly_target is None:
+        return None, None
+    target = round(weekly_target * days / 7)
+    return target, actual >= target
+
+
+async def get_analytics(user_id: str, period: str, count: int, end_date: date) -> Dict[str, Any]:
+    """Per-period calories, macros, workout minutes by type and active days against the goal"""
+    starts = period_starts(end_date, period, count)
+    end = _next_start(starts[-1], period)
+    low, high = (datetime.combine(day, datetime.min.time()) for day in (starts[0], end))
+    
+    facets, goal = await asyncio.gather(
+        Meal.get_motor_collection().aggregate(analytics_pipeline(user_id, period, low, high)).to_list(length=None),
+        Goal.find_one({"user_id": user_id}),
+    )
+    facet = facets[0] if facets else {}
+    totals = {doc["_id"].date(): doc for doc in facet.get("totals", [])}
+    days = {doc["_id"].date(): doc for doc in facet.get("days", [])}
+    minutes: Dict[date, Dict[str, int]] = {}
+    for doc in facet.get("workout_minutes", []):
+        minutes.setdefault(doc["_id"]["period"].date(), {})[doc["_id"]["type"]] = doc["minutes"]
+    
+    weekly_workouts = goal.weekly_workouts if goal else None
+    active_days_per_week = goal.active_days_per_week if goal else None
+    
+    periods = []
+    for start in starts:
+        next_start = _next_start(start, period)
+        length = (next_start - start).days
+        total = totals.get(start, {})
+        day_counts = days.get(start, {})
+        by_type = minutes.get(start, {})
+        workout_count = total.get("workout_count", 0)
+        active_days = day_counts.get("active_days", 0)
+        target_workouts, workouts_met = _compare(workout_count, weekly_workouts, length)
+        target_active_days, active_days_met = _compare(active_days, active_days_per_week, length)
+        periods.append({
+            "start_date": start,
+            "end_date": next_start - timedelta(days=1),
+            "calories_in": total.get("calories_in", 0),
+            "calories_out": total.get("calories_out", 0),
+            "net_calories": total.get("calories_in", 0) - total.get("calories_out", 0),
+            "protein": total.get("protein", 0),
+            "carbs": total.get("carbs", 0),
+            "fat": total.get("fat", 0),
+            "meal_count": total.get("meal_count", 0),
+            "workout_count": workout_count,
+            "workout_minutes": sum(by_type.values()),
+            "workout_minutes_by_type": by_type,
+            "active_days": active_days,
+            "workout_days": day_counts.get("workout_days", 0),
+            "target_workouts": target_workouts,
+            "workouts_met": workouts_met,
+            "target_active_days": target_active_days,
+            "active_days_met": active_days_met,
+        })
+    
+    return {
+        "period": period,
+        "start_date": starts[0],
+        "end_date": end - timedelta(days=1),
+        "goal": {"weekly_workouts": weekly_workouts, "active_days_per_week": active_days_per_week},
+        "periods": periods,
+    }
@@ -0,0 +1,165 @@
+import asyncio
+import bisect
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from beanie import Document
+
+from app.config import settings
+from app.services.search import KINDS, SOURCES, normalize
+
+
+class Suggestion:
+    """One distinct meal or workout a user logs, with the values of its latest use"""
+    
+    def __init__(self, kind: str, text: str, count: int, last_used: datetime, values: Dict[str, Any]):
+        self.kind = kind
+        self.text = text
+        self.count = count
+        self.last_used = last_used
+        self.values = values
+    
+    def observe(self, text: str, used: datetime, values: Dict[str, Any], count: int = 1) -> None:
+        self.count += count
+        if used >= self.last_used:
+            self.text, self.last_used, self.values = text, used, values
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "text": self.text,
+            "count": self.count,
+            "last_used": self.last_used,
+            "values": self.values,
+        }
+
+
+class PrefixIndex:
+    """A user's suggestions, found by the start of any of their words through one sorted array"""
+    
+    def __init__(self):
+        self.loaded_at = time.monotonic()
+        self.suggestions: Dict[Tuple[str, str], Suggestion] = {}
+        # (text from the start of one word on, kind, normalized text), sorted
+        self._keys: List[Tuple[str, str, str]] = []
+    
+    def add(self, kind: str, text: str, used: datetime, values: Dict[str, Any], count: int = 1) -> None:
+        key = normalize(text)
+        if not key:
+            return
+        text = " ".join(text.split())
+        suggestion = self.suggestions.get((kind, key))
+        if suggestion is not None:
+            suggestion.observe(text, used, values, count)
+            return
+        self.suggestions[(kind, key)] = Suggestion(kind, text, count, used, values)
+        words = key.split(" ")
+        for start in range(len(words)):
+            bisect.insort(self._keys, (" ".join(words[start:]), kind, key))
+    
+    def search(self, prefix: str, kind: Optional[str], limit: int) -> List[Suggestion]:
+        prefix = normalize(prefix)
+        found: Dict[Tuple[str, str], Suggestion] = {}
+        for position in range(bisect.bisect_left(self._keys, (prefix,)), len(self._keys)):
+            words, entry_kind, key = self._keys[position]
+            if not words.startswith(prefix):
+                break
+            if kind is None or entry_kind == kind:
+                found[(entry_kind, key)] = self.suggestions[(entry_kind, key)]
+        ranked = sorted(found.values(), key=lambda suggestion: (suggestion.count, suggestion.last_used), reverse=True)
+        return ranked[:limit]
+
+
+def history_pipeline(kind: str, user_id: str, since: datetime) -> List[Dict[str, Any]]:
+    _, field, values = SOURCES[kind]
+    return [
+        {"$match": {"user_id": user_id, "date": {"$gte": since}}},
+        {"$sort": {"date": 1}},
+        {"$group": {
+            "_id": {"$toLower": f"${field}"},
+            "text": {"$last": f"${field}"},
+            "count": {"$sum": 1},
+            "last_used": {"$last": "$date"},
+            **{name: {"$last": f"${name}"} for name in values},
+        }},
+        {"$sort": {"count": -1}},
+        {"$limit": settings.autocomplete_max_entries},
+    ]
+
+
+class AutocompleteIndex:
+    """In-memory prefix indexes of each user's frequent meals and workouts
+    
+    Loaded on a user's first lookup through the `(user_id, date)` index and kept
+    current by the write paths. Updates and deletes drop the user's index so the
+    next lookup reloads it, and indexes older than `autocomplete_ttl` are
+    reloaded to pick up other replicas' writes.
+    """
+    
+    def __init__(self):
+        self._users: "OrderedDict[str, PrefixIndex]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._stale: Set[str] = set()
+    
+    async def suggest(self, user_id: str, prefix: str, kind: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        index = await self._index(user_id)
+        return [suggestion.to_dict() for suggestion in index.search(prefix, kind, limit)]
+    
+    def observe(self, documents: Iterable[Document]) -> None:
+        """Count newly written meals and workouts into their owners' loaded indexes"""
+        for document in documents:
+            kind = KINDS.get(type(document))
+            if kind is None:
+                continue
+            if document.user_id in self._loading:
+                self._stale.add(document.user_id)
+            index = self._users.get(document.user_id)
+            if index is not None:
+                _, field, values = SOURCES[kind]
+                index.add(kind, getattr(document, field), document.date, {name: getattr(document, name) for name in values})
+    
+    def forget(self, user_id: str) -> None:
+        """Drop a user's index after an update or delete; the next lookup reloads it"""
+        self._users.pop(user_id, None)
+        if user_id in self._loading:
+            self._stale.add(user_id)
+    
+    async def _index(self, user_id: str) -> PrefixIndex:
+        index = self._users.get(user_id)
+        if index is not None and time.monotonic() - index.loaded_at < settings.autocomplete_ttl:
+            self._users.move_to_end(user_id)
+            return index
+        if user_id not in self._loading:
+            self._loading[user_id] = asyncio.ensure_future(self._load(user_id))
+        return await asyncio.shield(self._loading[user_id])
+    
+    async def _load(self, user_id: str) -> PrefixIndex:
+        try:
+            index = await self._build(user_id)
+            # A write that landed while reading may be missing; answer with it but don't keep it
+            if user_id not in self._stale:
+                self._store(user_id, index)
+            return index
+        finally:
+            self._stale.discard(user_id)
+            del self._loading[user_id]
+    
+    async def _build(self, user_id: str) -> PrefixIndex:
+        """Prefix index of the user's most used entries from the last `autocomplete_lookback_days`"""
+        since = datetime.utcnow() - timedelta(days=settings.autocomplete_lookback_days)
+        index = PrefixIndex()
+        for kind, (document_model, _, values) in SOURCES.items():
+            async for row in document_model.aggregate(history_pipeline(kind, user_id, since), allowDiskUse=True):
+                index.add(kind, row["text"], row["last_used"], {name: row.get(name) for name in values}, row["count"])
+        return index
+    
+    def _store(self, user_id: str, index: PrefixIndex) -> None:
+        self._users[user_id] = index
+        self._users.move_to_end(user_id)
+        while len(self._users) > settings.autocomplete_max_users:
+            self._users.popitem(last=False)
+
+
+autocomplete_index = AutocompleteIndex()
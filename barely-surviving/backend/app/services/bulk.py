@@ -0,0 +1,94 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.config import settings
+
+BulkError = Dict[str, Any]
+
+
+def validate_items(
+    items: List[Any],
+    create_schema: Type[BaseModel],
+    build: Callable[[Any], Document],
+) -> Tuple[List[Document], List[int], List[BulkError]]:
+    """Validate every item in one pass, returning the built documents and per-item errors"""
+    documents: List[Document] = []
+    positions: List[int] = []
+    errors: List[BulkError] = []
+    
+    for index, item in enumerate(items):
+        try:
+            data = create_schema.model_validate(item)
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": exc.errors(include_url=False, include_context=False)})
+            continue
+        document = build(data)
+        document.id = PydanticObjectId()
+        documents.append(document)
+        positions.append(index)
+    
+    return documents, positions, errors
+
+
+async def insert_chunked(
+    document_model: Type[Document],
+    documents: List[Document],
+    positions: List[int],
+    insert_many: Optional[Callable[..., Awaitable[Any]]] = None,
+) -> Tuple[List[Document], List[BulkError]]:
+    """Write documents with unordered insert_many in chunks, keeping going past failures
+    
+    Per-document write errors fail only those documents. Any other error (a lost
+    connection, a timeout) stops the batch: the chunks already written are still
+    returned so their side effects can be applied, and the rest are reported failed.
+    """
+    insert_many = insert_many or document_model.insert_many
+    inserted: List[Document] = []
+    errors: List[BulkError] = []
+    chunk_size = settings.bulk_chunk_size
+    
+    for start in range(0, len(documents), chunk_size):
+        chunk = documents[start:start + chunk_size]
+        failed = set()
+        try:
+            await insert_many(chunk, ordered=False)
+        except BulkWriteError as exc:
+            for write_error in exc.details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                errors.append({
+                    "index": positions[start + write_error["index"]],
+                    "errors": [{"type": "write_error", "msg": write_error.get("errmsg", "")}],
+                })
+        except PyMongoError as exc:
+            errors.extend(
+                {"index": position, "errors": [{"type": "write_error", "msg": f"Not written: {exc}"}]}
+                for position in positions[start:]
+            )
+            break
+        inserted.extend(document for offset, document in enumerate(chunk) if offset not in failed)
+    
+    return inserted, errors
+
+
+async def bulk_insert(
+    document_model: Type[Document],
+    items: List[Any],
+    create_schema: Type[BaseModel],
+    build: Callable[[Any], Document],
+    insert_many: Optional[Callable[..., Awaitable[Any]]] = None,
+) -> Tuple[List[Document], Dict[str, Any]]:
+    """Validate and insert a batch, returning the stored documents and the per-item report"""
+    documents, positions, errors = validate_items(items, create_schema, build)
+    inserted, write_errors = await insert_chunked(document_model, documents, positions, insert_many)
+    errors = sorted(errors + write_errors, key=lambda error: error["index"])
+    
+    return inserted, {
+        "received": len(items),
+        "inserted": len(inserted),
+        "failed": len(errors),
+        "inserted_ids": [str(document.id) for document in inserted],
+        "errors": errors,
+    }
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple
+
+from app.config import settings
+
+CacheKey = Tuple[Hashable, ...]
+
+
+class ReadCache:
+    """Async-safe LRU/TTL cache for read endpoints, invalidated by tags that writes drop
+    
+    Concurrent misses on one key share a single load. A load that overlaps an
+    invalidation still answers its caller but is not stored, so a write can never
+    be hidden behind a value read before it.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any, Set[str]]]" = OrderedDict()
+        self._tagged: Dict[str, Set[CacheKey]] = {}
+        self._loading: Dict[CacheKey, asyncio.Future] = {}
+        self._generation = 0
+    
+    async def get_or_load(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Iterable[str],
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value, _ = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._drop(key)
+        
+        self.misses += 1
+        while key in self._loading:
+            loading = self._loading[key]
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                # Only the leading request was cancelled (its client went away): load again
+                if not loading.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+        
+        future.set_result(value)
+        if generation == self._generation:
+            self._store(key, value, set(tags))
+        return value
+    
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying one of `tags`"""
+        self._generation += 1
+        for tag in tags:
+            for key in self._tagged.pop(tag, set()):
+                if key in self._entries:
+                    self._drop(key)
+                    self.invalidations += 1
+    
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._tagged.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+    
+    def _store(self, key: CacheKey, value: Any, tags: Set[str]) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+    
+    def _drop(self, key: CacheKey) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+
+def day_tag(user_id: str, day) -> str:
+    """Tag for anything derived from one user's rollup for one day"""
+    return f"rollup:{user_id}:{day.isoformat()}"
+
+
+def user_tag(user_id: str, name: str) -> str:
+    """Tag for one user's slice of a collection, e.g. user_tag(user_id, "weights")"""
+    return f"{name}:{user_id}"
+
+
+read_cache = ReadCache(settings.read_cache_max_entries, settings.read_cache_ttl)
@@ -0,0 +1,33 @@
+import asyncio
+from datetime import date
+from typing import Any, Dict
+
+from app.services.cache import day_tag, read_cache, user_tag
+from app.services.rollups import get_rollup
+from app.services.weights import get_latest_weight
+
+
+async def get_day_stats(user_id: str, target_date: date) -> Dict[str, Any]:
+    """One day's totals and the latest weight, served from the read cache"""
+    return await read_cache.get_or_load(
+        ("dashboard.stats", user_id, target_date),
+        lambda: _load_dashboard_stats(user_id, target_date),
+        tags=[day_tag(user_id, target_date), user_tag(user_id, "rollups"), user_tag(user_id, "weights")],
+    )
+
+
+async def _load_dashboard_stats(user_id: str, target_date: date) -> Dict[str, Any]:
+    rollup, latest_weight = await asyncio.gather(
+        get_rollup(user_id, target_date),
+        get_latest_weight(user_id),
+    )
+    
+    return {
+        "date": target_date,
+        "calories_consumed": rollup.calories_consumed,
+        "protein_consumed": rollup.protein,
+        "workout_count": rollup.workout_count,
+        "calories_burned": rollup.calories_burned,
+        "current_weight": latest_weight.weight if latest_weight else None,
+        "meal_count": rollup.meal_count
+    }
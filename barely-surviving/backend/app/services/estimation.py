@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.metrics import macro_estimates
+from app.models.macro_estimate import MacroEstimate
+from app.services.search import normalize
+
+MACROS = ("calories", "protein", "carbs", "fat")
+
+EstimateKey = Tuple[str, str]
+
+
+class EstimationUnavailable(Exception):
+    """No estimator is configured, or the configured one cannot answer"""
+
+
+class MacroEstimator(Protocol):
+    name: str
+    
+    async def estimate(self, description: str) -> Dict[str, int]:
+        """Macros (calories, protein, carbs, fat) for one normalized description"""
+
+
+# Typical single servings: calories, protein, carbs, fat
+STUB_FOODS = {
+    "apple": (95, 0, 25, 0),
+    "avocado": (240, 3, 12, 22),
+    "bagel": (280, 11, 55, 2),
+    "banana": (105, 1, 27, 0),
+    "bean": (230, 15, 40, 1),
+    "beef": (250, 26, 0, 15),
+    "bread": (80, 3, 15, 1),
+    "burger": (500, 25, 40, 25),
+    "burrito": (450, 20, 55, 15),
+    "cheese": (110, 7, 1, 9),
+    "chicken": (250, 35, 0, 10),
+    "coffee": (5, 0, 0, 0),
+    "egg": (80, 6, 1, 5),
+    "fries": (320, 4, 42, 15),
+    "milk": (120, 8, 12, 5),
+    "oatmeal": (150, 5, 27, 3),
+    "pasta": (220, 8, 43, 1),
+    "pizza": (285, 12, 36, 10),
+    "potato": (160, 4, 37, 0),
+    "rice": (200, 4, 45, 0),
+    "salad": (150, 3, 10, 10),
+    "salmon": (230, 25, 0, 14),
+    "sandwich": (350, 18, 35, 14),
+    "shake": (150, 25, 5, 2),
+    "soup": (150, 8, 18, 5),
+    "steak": (300, 30, 0, 19),
+    "toast": (80, 3, 15, 1),
+    "tofu": (180, 20, 4, 10),
+    "yogurt": (120, 10, 15, 2),
+}
+STUB_DEFAULT = (400, 15, 45, 15)
+
+
+class StubEstimator:
+    """Deterministic local estimator: sums typical servings of the foods it recognizes"""
+    
+    name = "stub"
+    
+    async def estimate(self, description: str) -> Dict[str, int]:
+        words = re.findall(r"[a-z]+", description)
+        matched = [STUB_FOODS.get(word) or STUB_FOODS.get(word[:-1]) for word in words]
+        matched = [values for values in matched if values]
+        totals = [sum(values) for values in zip(*matched)] if matched else STUB_DEFAULT
+        return dict(zip(MACROS, totals))
+
+
+ANTHROPIC_PROMPT = (
+    "Estimate the nutrition of this meal as typically served: {description}\n"
+    'Answer with JSON only, in the form {{"calories": 0, "protein": 0, "carbs": 0, "fat": 0}}, '
+    "using whole kcal and grams."
+)
+
+
+class AnthropicEstimator:
+    """Asks the Anthropic API; the client library is only imported on first use"""
+    
+    name = "anthropic"
+    
+    def __init__(self):
+        self._anthropic = None
+        self._client = None
+    
+    def _get_client(self):
+        if self._client is None:
+            if not settings.anthropic_api_key:
+                raise EstimationUnavailable("ANTHROPIC_API_KEY is not set")
+            import anthropic
+            
+            self._anthropic = anthropic
+            self._client = anthropic.AsyncAnthropic(
+                api_key=settings.anthropic_api_key,
+                timeout=settings.anthropic_timeout_seconds,
+            )
+        return self._client
+    
+    async def estimate(self, description: str) -> Dict[str, int]:
+        client = self._get_client()
+        try:
+            message = await client.messages.create(
+                model=settings.anthropic_model,
+                max_tokens=100,
+                messages=[{"role": "user", "content": ANTHROPIC_PROMPT.format(description=description)}],
+            )
+        except self._anthropic.APIError as exc:
+            raise EstimationUnavailable(f"Anthropic API error: {exc}") from exc
+        text = "".join(getattr(block, "text", "") for block in message.content)
+        found = re.search(r"\{.*\}", text, re.DOTALL)
+        try:
+            answer = json.loads(found.group(0)) if found else {}
+            return {macro: max(int(round(float(answer[macro]))), 0) for macro in MACROS}
+        except (ValueError, TypeError, KeyError) as exc:
+            raise EstimationUnavailable(f"Unreadable estimate from {settings.anthropic_model}: {text!r}") from exc
+
+
+ESTIMATORS: Dict[str, Callable[[], MacroEstimator]] = {
+    "stub": StubEstimator,
+    "anthropic": AnthropicEstimator,
+}
+
+
+def description_key(description: str) -> str:
+    """Content address of an already normalized description"""
+    return hashlib.blake2b(description.encode(), digest_size=16).hexdigest()
+
+
+class MacroCache:
+    """Estimates keyed on the normalized description: memory LRU, then MongoDB, then the estimator
+    
+    Concurrent requests for one description share a single lookup, so a burst of
+    identical meals costs one estimator call. Estimates are stored per estimator, so
+    stub results never answer once a real model is configured.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._estimator: Optional[MacroEstimator] = None
+        self._entries: "OrderedDict[EstimateKey, Dict[str, Any]]" = OrderedDict()
+        self._loading: Dict[EstimateKey, asyncio.Future] = {}
+    
+    @property
+    def estimator(self) -> MacroEstimator:
+        if self._estimator is None:
+            if settings.macro_estimator not in ESTIMATORS:
+                raise EstimationUnavailable("Meal estimation is turned off (set MACRO_ESTIMATOR)")
+            self._estimator = ESTIMATORS[settings.macro_estimator]()
+        return self._estimator
+    
+    def use(self, estimator: Optional[MacroEstimator]) -> None:
+        """Swap the estimator (None goes back to the configured one)"""
+        self._estimator = estimator
+        self._entries.clear()
+    
+    async def estimate(self, description: str) -> Dict[str, Any]:
+        estimator = self.estimator
+        text = normalize(description)
+        key = (estimator.name, description_key(text))
+        
+        while True:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                macro_estimates.inc(source="memory")
+                return cached
+            
+            loading = self._loading.get(key)
+            if loading is None:
+                break
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                # Only the leading request was cancelled (its client went away): look up again
+                if not loading.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await self._load(estimator, key, text)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+        
+        future.set_result(value)
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+    
+    async def _load(self, estimator: MacroEstimator, key: EstimateKey, text: str) -> Dict[str, Any]:
+        collection = MacroEstimate.get_motor_collection()
+        query = {"key": key[1], "estimator": key[0]}
+        projection = {"_id": 0, **{macro: 1 for macro in MACROS}}
+        stored = await collection.find_one(query, projection)
+        if stored is not None:
+            macro_estimates.inc(source="mongodb")
+            return {"description": text, **stored, "estimator": estimator.name}
+        
+        macros = await estimator.estimate(text)
+        macro_estimates.inc(source="estimator")
+        # Another replica may have estimated the same description meanwhile; first write wins
+        stored = await collection.find_one_and_update(
+            query,
+            {"$setOnInsert": {"description": text, **macros, "created_at": datetime.utcnow()}},
+            projection=projection,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return {"description": text, **stored, "estimator": estimator.name}
+
+
+macro_cache = MacroCache(settings.macro_cache_max_entries)
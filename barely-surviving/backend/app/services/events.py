@@ -0,0 +1,225 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from beanie import Document
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+from app.metrics import event_connections, events_dropped
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.models.weight import Weight
+from app.models.weight_bucket import WeightBucket
+from app.models.version import CollectionVersion
+from app.services.cache import read_cache, user_tag
+from app.services.dashboard import get_day_stats
+from app.services.feed import FEED_FIELDS, activity_item
+from app.services.serialize import dumps
+from app.services.streak import streak_cache
+from app.services.versions import STALE_TAGS
+from app.services.weight_store import get_weight_store
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Newest activity items carried by one update; clients refetch the feed after a resync
+MAX_ACTIVITY_ITEMS = 10
+
+ACTIVITY_KINDS = {Workout: "workout", Meal: "meal", Weight: "weight"}
+
+
+class Subscription:
+    """One open stream's bounded buffer of updates
+    
+    Every update carries the full stats and streak, so when a slow client lets
+    the buffer fill, the oldest update is dropped and the next one delivered is
+    marked `resync` so the client refetches the activity it missed.
+    """
+    
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.events_buffer_size)
+        self.dropped = 0
+    
+    def push(self, update: Optional[Dict[str, Any]]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            events_dropped.inc()
+        self.queue.put_nowait(update)
+
+
+class EventHub:
+    """In-process pub/sub from write handlers to the user's open /dashboard/events streams
+    
+    Writes only mark a user as changed; one task per burst then reads the stats
+    and streak once and fans the update out to all of that user's connections.
+    With EVENTS_CHANGE_STREAMS the handlers' publishes are ignored and changes
+    come from a MongoDB change stream instead, so writes on any replica arrive.
+    """
+    
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._activity: Dict[str, List[Dict[str, Any]]] = {}
+        self._scheduled: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._watcher: Optional[asyncio.Task] = None
+    
+    @property
+    def connections(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+    
+    def start(self) -> None:
+        """Start the change stream watcher if EVENTS_CHANGE_STREAMS is on; called from the app lifespan"""
+        if settings.events_change_streams and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+    
+    async def stop(self) -> None:
+        """Stop the watcher and end every open stream"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.push(None)
+    
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[Subscription]:
+        subscription = Subscription(user_id)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        event_connections.set(self.connections)
+        try:
+            yield subscription
+        finally:
+            subscriptions = self._subscribers[user_id]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[user_id]
+                self._activity.pop(user_id, None)
+            event_connections.set(self.connections)
+    
+    def publish(self, user_id: str, document: Optional[Document] = None) -> None:
+        """Called after a write; pass the new document to include it as an activity item"""
+        if self._watcher is not None or user_id not in self._subscribers:
+            return
+        item = None
+        if document is not None:
+            kind = ACTIVITY_KINDS[type(document)]
+            fields = document.model_dump(include=set(FEED_FIELDS[kind]))
+            day = document.date if isinstance(document.date, datetime) else datetime.combine(document.date, datetime.min.time())
+            item = activity_item(kind, {"_id": document.id, "date": day, **fields})
+        self._notify(user_id, item)
+    
+    def _notify(self, user_id: str, item: Optional[Dict[str, Any]] = None, deliver: bool = True) -> None:
+        if user_id not in self._subscribers:
+            return
+        if item is not None:
+            self._activity.setdefault(user_id, []).append(item)
+        if deliver and user_id not in self._scheduled:
+            self._scheduled.add(user_id)
+            task = asyncio.create_task(self._deliver(user_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _deliver(self, user_id: str) -> None:
+        # Publishes that arrive before this runs share the update
+        self._scheduled.discard(user_id)
+        items = self._activity.pop(user_id, [])
+        try:
+            update = await snapshot(user_id)
+        except Exception as exc:
+            print(f"Dashboard update for {user_id} failed: {exc!r}")
+            return
+        update["activity"] = items[-MAX_ACTIVITY_ITEMS:]
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription.push(update)
+    
+    async def _watch(self) -> None:
+        kinds = {document_model.get_settings().name: kind for document_model, kind in ACTIVITY_KINDS.items()}
+        # Weights go wherever WEIGHT_STORAGE puts them
+        del kinds[Weight.get_settings().name]
+        kinds[get_weight_store().collection_name] = "weight"
+        versions = CollectionVersion.get_settings().name
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": [versions, *kinds]},
+            "operationType": {"$in": ["insert", "update", "replace"]},
+        }}]
+        database = CollectionVersion.get_motor_collection().database
+        resume_token = None
+        while True:
+            try:
+                async with database.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._on_change(change, kinds, versions)
+            except PyMongoError as exc:
+                print(f"Dashboard change stream interrupted, resuming: {exc!r}")
+                await asyncio.sleep(1)
+    
+    def _on_change(self, change: Dict[str, Any], kinds: Dict[str, str], versions: str) -> None:
+        doc = change.get("fullDocument") or {}
+        user_id = doc.get("user_id")
+        if user_id is None:
+            return
+        collection = change["ns"]["coll"]
+        if collection == versions:
+            # Every write path bumps its counter after writing, so this is when the stats are final;
+            # the write may have come from another replica, so drop what this one cached
+            read_cache.invalidate(user_tag(user_id, STALE_TAGS[doc["collection"]]))
+            streak_cache.clear(user_id)
+            self._notify(user_id)
+        elif collection == WeightBucket.get_settings().name:
+            # Every bucket write records the entries it added; removals record none
+            if change["operationType"] == "update":
+                added = change["updateDescription"]["updatedFields"].get("last_added", [])
+            else:
+                added = doc.get("last_added", [])
+            for entry in doc.get("entries", []):
+                if entry["_id"] in added:
+                    self._notify(user_id, activity_item("weight", entry), deliver=False)
+        elif change["operationType"] == "insert":
+            self._notify(user_id, activity_item(kinds[collection], doc), deliver=False)
+
+
+async def snapshot(user_id: str) -> Dict[str, Any]:
+    stats, streak = await asyncio.gather(get_day_stats(user_id, date.today()), streak_cache.get(user_id))
+    return {"stats": stats, "streak": streak}
+
+
+def format_event(event: str, data: Dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def event_stream(user_id: str) -> AsyncIterator[bytes]:
+    """The current stats and streak, then one `update` event per change until the stream's time is up"""
+    # A graceful shutdown waits for open responses before the lifespan ends, so streams
+    # end on their own; `retry` has EventSource reconnect, to any replica, soon after
+    loop = asyncio.get_running_loop()
+    closes_at = loop.time() + settings.events_max_stream_seconds
+    async with event_hub.subscribe(user_id) as subscription:
+        yield f"retry: {settings.events_retry_ms}\n\n".encode()
+        yield format_event("update", {**await snapshot(user_id), "activity": []})
+        while True:
+            remaining = closes_at - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                update = await asyncio.wait_for(
+                    subscription.queue.get(), min(settings.events_keepalive_seconds, remaining)
+                )
+            except asyncio.TimeoutError:
+                if loop.time() < closes_at:
+                    yield b": keepalive\n\n"
+                continue
+            if update is None:
+                return
+            if subscription.dropped:
+                update = {**update, "resync": True}
+                subscription.dropped = 0
+            yield format_event("update", update)
+
+
+event_hub = EventHub()
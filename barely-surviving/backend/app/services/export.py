@@ -0,0 +1,171 @@
+import csv
+import io
+import zlib
+from datetime import datetime, date
+from typing import Any, AsyncIterator, Dict, List, Type, Union, get_args, get_origin
+
+from beanie import Document
+
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.models.weight import Weight
+from app.services.serialize import dumps, serializer_for
+from app.services.weight_store import EXPORT_SORT, get_weight_store
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLLECTIONS: Dict[str, Type[Document]] = {
+    "meals": Meal,
+    "workouts": Workout,
+    "weight": Weight,
+}
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+async def iter_batches(user_id: str, name: str, batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """A user's raw documents of one collection oldest-first, `batch_size` at a time"""
+    document_model = EXPORT_COLLECTIONS[name]
+    projection = serializer_for(document_model).projection
+    if document_model is Weight:
+        docs = get_weight_store().iter_all(user_id, projection, batch_size)
+    else:
+        docs = document_model.get_motor_collection().find(
+            {"user_id": user_id}, projection, sort=EXPORT_SORT, batch_size=batch_size
+        )
+    
+    batch: List[Dict[str, Any]] = []
+    async for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_columns(names: List[str]) -> List[str]:
+    """Union of the exported collections' fields, prefixed with the collection name and id"""
+    columns = ["collection", "_id"]
+    for name in names:
+        for field, _ in serializer_for(EXPORT_COLLECTIONS[name]).fields:
+            if field not in columns:
+                columns.append(field)
+    return columns
+
+
+async def _ndjson(user_id: str, names: List[str], batch_size: int) -> AsyncIterator[bytes]:
+    for name in names:
+        serializer = serializer_for(EXPORT_COLLECTIONS[name])
+        async for batch in iter_batches(user_id, name, batch_size):
+            yield b"".join(dumps({"collection": name, **serializer.to_dict(doc)}) + b"\n" for doc in batch)
+
+
+async def _csv(user_id: str, names: List[str], batch_size: int) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=export_columns(names))
+    writer.writeheader()
+    for name in names:
+        serializer = serializer_for(EXPORT_COLLECTIONS[name])
+        async for batch in iter_batches(user_id, name, batch_size):
+            writer.writerows({"collection": name, **serializer.to_dict(doc)} for doc in batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands whatever was written back to the response stream"""
+    
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _arrow_type(pa, annotation: Any):
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if annotation in (datetime, date):
+        return pa.timestamp("ms")
+    return {int: pa.int64(), float: pa.float64()}.get(annotation, pa.string())
+
+
+async def _parquet(user_id: str, names: List[str], batch_size: int) -> AsyncIterator[bytes]:
+    # Imported here so the API doesn't pay for pyarrow unless someone asks for Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    types = {"collection": pa.string(), "_id": pa.string()}
+    for name in names:
+        for field, info in EXPORT_COLLECTIONS[name].model_fields.items():
+            types.setdefault(field, _arrow_type(pa, info.annotation))
+    schema = pa.schema([(column, types[column]) for column in export_columns(names)])
+    
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    for name in names:
+        fields = serializer_for(EXPORT_COLLECTIONS[name]).fields
+        async for batch in iter_batches(user_id, name, batch_size):
+            rows = [
+                {"collection": name, "_id": str(doc["_id"]), **{field: doc.get(field, default) for field, default in fields}}
+                for doc in batch
+            ]
+            # One row group per batch, so nothing but the footer metadata accumulates
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    "csv": _csv,
+    "ndjson": _ndjson,
+    "parquet": _parquet,
+}
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(
+    user_id: str,
+    names: List[str],
+    format: str,
+    gzip: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """A user's full history of `names` as a byte stream whose memory use is bounded by `batch_size`"""
+    chunks = EXPORT_WRITERS[format](user_id, names, batch_size)
+    return _gzip(chunks) if gzip else chunks
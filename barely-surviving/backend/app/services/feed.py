@@ -0,0 +1,86 @@
+from typing import Any, Dict, List, Mapping, Optional
+
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.services.weight_store import get_weight_store
+from app.services.pagination import KEYSET_SORT, after_cursor, encode_cursor
+
+SORT_STAGE = {"$sort": dict(KEYSET_SORT)}
+
+FEED_FIELDS = {
+    "workout": {"name": 1, "duration": 1, "calories_burned": 1},
+    "meal": {"description": 1, "calories": 1, "protein": 1},
+    "weight": {"weight": 1},
+}
+
+
+def _branch(kind: str, match: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Newest `limit` entries of one collection, projected down to the feed fields"""
+    return [
+        {"$match": match},
+        SORT_STAGE,
+        {"$limit": limit},
+        {"$project": {"date": 1, **FEED_FIELDS[kind], "kind": {"$literal": kind}}},
+    ]
+
+
+def _weight_branch(user_id: str, cursor: Optional[str], limit: int) -> Dict[str, Any]:
+    store = get_weight_store()
+    return {
+        "coll": store.collection_name,
+        "pipeline": store.feed_pipeline(user_id, cursor, limit) + [
+            {"$project": {"date": 1, **FEED_FIELDS["weight"], "kind": {"$literal": "weight"}}},
+        ],
+    }
+
+
+def _format(doc: Dict[str, Any]) -> Dict[str, Any]:
+    kind = doc["kind"]
+    if kind == "workout":
+        title = doc["name"]
+        details = f"{doc['duration']} min • {doc['calories_burned']} cal burned"
+        icon = "🏃"
+    elif kind == "meal":
+        title = doc["description"]
+        details = f"{doc['calories']} cal • {doc['protein']}g protein"
+        icon = "🍽️"
+    else:
+        title = "Weight Check"
+        details = f"{doc['weight']} lbs"
+        icon = "⚖️"
+    
+    return {
+        "type": kind,
+        "id": str(doc["_id"]),
+        "title": title,
+        "details": details,
+        "date": doc["date"],
+        "icon": icon,
+    }
+
+
+def activity_item(kind: str, doc: Mapping[str, Any]) -> Dict[str, Any]:
+    """One feed entry for a single stored workout, meal or weight document"""
+    return _format({**doc, "kind": kind})
+
+
+def feed_pipeline(user_id: str, cursor: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """Pipeline run on workouts that merges in the user's meals and weights"""
+    match = after_cursor({"user_id": user_id}, cursor)
+    return _branch("workout", match, limit) + [
+        {"$unionWith": {"coll": Meal.get_settings().name, "pipeline": _branch("meal", match, limit)}},
+        {"$unionWith": _weight_branch(user_id, cursor, limit)},
+        SORT_STAGE,
+        {"$limit": limit},
+    ]
+
+
+async def get_activity_feed(user_id: str, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Merge a user's workouts, meals and weights newest-first in a single $unionWith round trip"""
+    docs = await Workout.aggregate(feed_pipeline(user_id, cursor, limit)).to_list(length=limit)
+    
+    return {
+        "activities": [_format(doc) for doc in docs],
+        "count": len(docs),
+        "next_cursor": encode_cursor(docs[-1]) if len(docs) == limit else None,
+    }
@@ -0,0 +1,146 @@
+import math
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.models.goal import Goal
+from app.models.regression import WeightRegression
+from app.models.weight import Weight
+from app.services.cache import read_cache, user_tag
+from app.services.weight_store import get_weight_store
+
+# x is days since this date, keeping x² small enough that the sums stay exact in a double
+EPOCH = date(2000, 1, 1)
+
+SUM_FIELDS = ("count", "sum_x", "sum_y", "sum_xy", "sum_xx")
+
+# (user_id, week, field increments)
+RegressionDelta = Tuple[str, date, Dict[str, float]]
+
+
+def _week_key(day: date) -> datetime:
+    monday = day - timedelta(days=day.weekday())
+    return datetime.combine(monday, datetime.min.time())
+
+
+def window_start(today: Optional[date] = None) -> datetime:
+    """Monday of the oldest week the trend line is fitted to"""
+    return _week_key(today or date.today()) - timedelta(weeks=settings.forecast_window_weeks - 1)
+
+
+def weight_delta(weight: Weight, sign: int = 1) -> RegressionDelta:
+    """Regression sums change caused by adding (sign=1) or removing (sign=-1) a weight entry"""
+    x = (weight.date - EPOCH).days
+    y = weight.weight
+    return weight.user_id, weight.date, {
+        "count": sign,
+        "sum_x": sign * x,
+        "sum_y": sign * y,
+        "sum_xy": sign * x * y,
+        "sum_xx": sign * x * x,
+    }
+
+
+async def apply_regression_deltas(deltas: Iterable[RegressionDelta]) -> None:
+    """Fold deltas into one $inc per user and week; weeks already outside the window are never read again"""
+    oldest = window_start()
+    per_user: Dict[str, Dict[datetime, Dict[str, float]]] = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+    for user_id, day, delta in deltas:
+        week = _week_key(day)
+        if week < oldest:
+            continue
+        for field, value in delta.items():
+            per_user[user_id][week][field] += value
+    
+    # Weeks that slide out of the window are deleted by the TTL index on expires_at
+    window = timedelta(weeks=settings.forecast_window_weeks)
+    operations = [
+        UpdateOne(
+            {"user_id": user_id, "week": week},
+            {"$inc": dict(sums), "$set": {"expires_at": week + window}},
+            upsert=True,
+        )
+        for user_id, per_week in per_user.items()
+        for week, sums in per_week.items()
+    ]
+    if operations:
+        await WeightRegression.get_motor_collection().bulk_write(operations, ordered=False)
+        read_cache.invalidate(*(user_tag(user_id, "weights") for user_id in per_user))
+
+
+async def _load_sums(user_id: str) -> Dict[str, float]:
+    cursor = WeightRegression.get_motor_collection().find(
+        {"user_id": user_id, "week": {"$gte": window_start()}},
+        {"_id": 0, **{field: 1 for field in SUM_FIELDS}},
+    )
+    sums = dict.fromkeys(SUM_FIELDS, 0.0)
+    async for week in cursor:
+        for field in SUM_FIELDS:
+            sums[field] += week.get(field, 0)
+    return sums
+
+
+async def get_regression_sums(user_id: str) -> Dict[str, float]:
+    """The user's sums over the window: at most `forecast_window_weeks` small documents, whatever the history length"""
+    return await read_cache.get_or_load(
+        ("weights.regression", user_id),
+        lambda: _load_sums(user_id),
+        tags=[user_tag(user_id, "weights")],
+    )
+
+
+def daily_slope(sums: Dict[str, float]) -> Optional[float]:
+    """Least-squares slope in weight per day, or None with fewer than two distinct days"""
+    count = sums["count"]
+    denominator = count * sums["sum_xx"] - sums["sum_x"] ** 2
+    # Sums of whole days are exact, so a single day gives exactly zero
+    if count < 2 or denominator <= 0:
+        return None
+    return (count * sums["sum_xy"] - sums["sum_x"] * sums["sum_y"]) / denominator
+
+
+def forecast(goal: Goal, sums: Dict[str, float], current_weight: float, as_of: date) -> Dict[str, Any]:
+    """Projected goal date at the fitted rate, starting from `current_weight` on `as_of`"""
+    slope = daily_slope(sums)
+    result: Dict[str, Any] = {
+        "weekly_rate": None if slope is None else round(slope * 7, 2),
+        "projected_date": None,
+        "on_track": None,
+    }
+    direction = 1 if goal.target_weight >= goal.start_weight else -1
+    remaining = (goal.target_weight - current_weight) * direction
+    
+    if remaining <= 0:
+        result["on_track"] = True
+        return result
+    if slope is not None and slope * direction > 0:
+        try:
+            result["projected_date"] = as_of + timedelta(days=math.ceil(remaining / abs(slope)))
+        except OverflowError:
+            pass
+    if goal.target_date is not None and slope is not None:
+        projected = result["projected_date"]
+        result["on_track"] = projected is not None and projected <= goal.target_date
+    return result
+
+
+async def rebuild_regression(user_id: Optional[str] = None) -> int:
+    """Recompute the windowed sums from stored weights, for one user or all; returns the weeks stored"""
+    scope: Dict[str, Any] = {} if user_id is None else {"user_id": user_id}
+    await WeightRegression.find(scope).delete()
+    
+    store = get_weight_store()
+    oldest = window_start()
+    user_ids: List[str] = [user_id] if user_id is not None else await store.user_ids()
+    for owner in user_ids:
+        entries = await store.series(owner, oldest.date(), date.max)
+        await apply_regression_deltas(
+            weight_delta(Weight(user_id=owner, weight=entry["weight"], date=entry["date"].date()))
+            for entry in entries
+        )
+    
+    read_cache.clear()
+    return await WeightRegression.find(scope).count()
@@ -0,0 +1,385 @@
+import asyncio
+import csv
+import io
+import re
+import threading
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+from beanie import Document
+from pydantic import BaseModel
+
+from app.config import settings
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.models.weight import Weight
+from app.schemas.requests import MealCreate, WeightCreate, WorkoutCreate
+from app.services.autocomplete import autocomplete_index
+from app.services.bulk import BulkError, insert_chunked, validate_items
+from app.services.cache import read_cache, user_tag
+from app.services.events import event_hub
+from app.services.forecast import apply_regression_deltas, weight_delta
+from app.services.rollups import apply_deltas, meal_delta, workout_delta
+from app.services.summary import stored_datetime
+from app.services.versions import version_counters
+from app.services.weight_store import get_weight_store
+
+# Parsed batches allowed to wait for the writer before the parser thread blocks
+IMPORT_QUEUE_BATCHES = 2
+
+# Row errors kept for the final report; later ones are only counted
+MAX_REPORTED_ERRORS = 100
+
+MEAL_TYPE_ALIASES = {"snacks": "snack", "morning snack": "snack", "afternoon snack": "snack", "evening snack": "snack"}
+
+DATE_FORMATS = (
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y",
+    "%Y/%m/%d",
+    "%d.%m.%Y",
+    "%b %d, %Y",
+)
+
+
+def normalize_header(header: str) -> str:
+    """'Protein (g)' -> 'protein', 'Workout Name' -> 'workout_name'"""
+    header = re.sub(r"\(.*?\)", "", header or "")
+    return re.sub(r"[^a-z0-9]+", "_", header.strip().lower()).strip("_")
+
+
+def parse_datetime(value: str) -> Any:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    return value
+
+
+def parse_timestamp(value: str) -> Any:
+    """parse_datetime as MongoDB stores it, so duplicate keys match stored documents"""
+    parsed = parse_datetime(value)
+    return stored_datetime(parsed) if isinstance(parsed, datetime) else parsed
+
+
+def parse_number(value: str) -> Any:
+    try:
+        return float(value.replace(",", ""))
+    except ValueError:
+        return value
+
+
+def parse_meal_type(value: str) -> str:
+    """'Breakfast' -> 'breakfast', 'Snacks' -> 'snack'"""
+    value = value.strip().lower()
+    return MEAL_TYPE_ALIASES.get(value, value)
+
+
+def parse_minutes(value: str) -> Any:
+    """Minutes from '45', '45.5', '1:05:00' (h:m:s) or '05:30' (m:s)"""
+    if ":" not in value:
+        return parse_number(value)
+    try:
+        parts = [float(part) for part in value.split(":")]
+    except ValueError:
+        return value
+    if len(parts) == 2:
+        parts.insert(0, 0.0)
+    hours, minutes, seconds = parts[-3:]
+    return hours * 60 + minutes + seconds / 60
+
+
+class ImportKind:
+    """How one collection's CSV columns map onto its create schema"""
+    
+    def __init__(
+        self,
+        name: str,
+        document_model: Type[Document],
+        create_schema: Type[BaseModel],
+        columns: Dict[str, Tuple[str, ...]],
+        key_fields: Tuple[str, ...],
+        defaults: Optional[Dict[str, Any]] = None,
+        parsers: Optional[Dict[str, Callable[[str], Any]]] = None,
+    ):
+        self.name = name
+        self.document_model = document_model
+        self.create_schema = create_schema
+        self.columns = columns
+        self.key_fields = key_fields
+        self.defaults = defaults or {}
+        self.parsers = parsers or {}
+    
+    def resolve_columns(self, headers: List[str]) -> Dict[str, str]:
+        """Target field -> CSV header, using the first alias present in the file"""
+        by_name = {normalize_header(header): header for header in headers}
+        resolved = {}
+        for field, aliases in self.columns.items():
+            for alias in (field,) + aliases:
+                if alias in by_name:
+                    resolved[field] = by_name[alias]
+                    break
+        
+        # Duplicates are found by the key fields, so they are required even where the API defaults them
+        missing = [
+            field for field, info in self.create_schema.model_fields.items()
+            if (info.is_required() or field in self.key_fields) and field not in resolved and field not in self.defaults
+        ]
+        if missing:
+            raise ValueError(f"CSV has no column for {', '.join(missing)} (headers: {', '.join(headers)})")
+        return resolved
+    
+    def map_row(self, row: Dict[str, str], columns: Dict[str, str]) -> Dict[str, Any]:
+        item = dict(self.defaults)
+        for field, header in columns.items():
+            value = (row.get(header) or "").strip()
+            if not value:
+                continue
+            parser = self.parsers.get(field)
+            item[field] = parser(value) if parser else value
+        for field, info in self.create_schema.model_fields.items():
+            # Exports write whole numbers as "250.0"; round rather than reject them
+            if isinstance(item.get(field), float) and int in (info.annotation, *getattr(info.annotation, "__args__", ())):
+                item[field] = round(item[field])
+        return item
+    
+    def build(self, data: BaseModel, user_id: str) -> Document:
+        return self.document_model(**data.model_dump(exclude_none=True), user_id=user_id)
+    
+    def key(self, document: Document) -> Tuple:
+        return tuple(getattr(document, field) for field in self.key_fields)
+    
+    async def existing_keys(self, user_id: str, documents: List[Document]) -> Set[Tuple]:
+        """Keys of `documents` that the user already has stored"""
+        if self.document_model is Weight:
+            days = await get_weight_store().existing_dates(user_id, [weight.date for weight in documents])
+            return {(day,) for day in days}
+        query: Dict[str, Any] = {"user_id": user_id}
+        for field in self.key_fields:
+            query[field] = {"$in": list({getattr(document, field) for document in documents})}
+        projection = {"_id": 0, **{field: 1 for field in self.key_fields}}
+        cursor = self.document_model.get_motor_collection().find(query, projection)
+        return {tuple(doc[field] for field in self.key_fields) async for doc in cursor}
+    
+    async def insert(self, documents: List[Document], positions: List[int]) -> Tuple[List[Document], List[BulkError]]:
+        if self.document_model is Weight:
+            return await insert_chunked(Weight, documents, positions, get_weight_store().insert_many)
+        return await insert_chunked(self.document_model, documents, positions)
+    
+    async def after_insert(self, user_id: str, documents: List[Document]) -> None:
+        if self.document_model is Meal:
+            await apply_deltas(meal_delta(meal) for meal in documents)
+        elif self.document_model is Workout:
+            await apply_deltas(workout_delta(workout) for workout in documents)
+        else:
+            await apply_regression_deltas(weight_delta(weight) for weight in documents)
+            read_cache.invalidate(user_tag(user_id, "weights"))
+        await version_counters.bump(user_id, self.document_model.get_settings().name)
+        autocomplete_index.observe(documents)
+        event_hub.publish(user_id)
+
+
+IMPORT_KINDS = {
+    "meals": ImportKind(
+        "meals",
+        Meal,
+        MealCreate,
+        columns={
+            "date": ("day", "datetime", "logged_at"),
+            "type": ("meal", "meal_type", "meal_name", "category"),
+            "description": ("food", "food_name", "name", "item", "title"),
+            "calories": ("energy", "kcal", "calories_consumed"),
+            "protein": ("protein_g",),
+            "carbs": ("carbohydrates", "carbohydrate", "carbs_g", "total_carbs"),
+            "fat": ("fat_g", "total_fat", "fats"),
+            "notes": ("note", "comment", "comments"),
+        },
+        key_fields=("date", "description"),
+        defaults={"type": "snack"},
+        parsers={
+            "date": parse_timestamp,
+            "type": parse_meal_type,
+            "calories": parse_number,
+            "protein": parse_number,
+            "carbs": parse_number,
+            "fat": parse_number,
+        },
+    ),
+    "workouts": ImportKind(
+        "workouts",
+        Workout,
+        WorkoutCreate,
+        columns={
+            "date": ("day", "start_time", "workout_date", "datetime", "start"),
+            "type": ("activity_type", "workout_type", "category", "sport"),
+            "name": ("workout_name", "title", "activity", "activity_name", "exercise_name"),
+            "duration": ("duration_minutes", "minutes", "moving_time", "elapsed_time", "time"),
+            "calories_burned": ("calories", "active_calories", "energy", "kcal"),
+            "notes": ("note", "description", "comment", "comments"),
+        },
+        key_fields=("date", "name"),
+        defaults={"type": "other"},
+        parsers={
+            "date": parse_timestamp,
+            "type": str.lower,
+            "duration": parse_minutes,
+            "calories_burned": parse_number,
+        },
+    ),
+    "weight": ImportKind(
+        "weight",
+        Weight,
+        WeightCreate,
+        columns={
+            "date": ("day", "datetime", "time", "measured_at"),
+            "weight": ("weight_lbs", "weight_lb", "body_weight", "bodyweight", "mass"),
+        },
+        key_fields=("date",),
+        parsers={
+            "date": lambda value: _as_date(parse_datetime(value)),
+            "weight": parse_number,
+        },
+    ),
+}
+
+
+def _as_date(value: Any) -> Any:
+    return value.date() if isinstance(value, datetime) else value
+
+
+ParsedBatch = Tuple[List[Document], List[int], List[BulkError], int]
+
+
+def parse_batches(kind: ImportKind, user_id: str, source: BinaryIO, batch_size: int) -> Iterator[ParsedBatch]:
+    """Read, map and validate the CSV `batch_size` rows at a time (blocking; runs in a worker thread)"""
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        columns = kind.resolve_columns(reader.fieldnames or [])
+        items: List[Dict[str, Any]] = []
+        rows: List[int] = []
+        for row in reader:
+            items.append(kind.map_row(row, columns))
+            rows.append(reader.line_num)
+            if len(items) >= batch_size:
+                yield _validate(kind, user_id, items, rows)
+                items, rows = [], []
+        if items:
+            yield _validate(kind, user_id, items, rows)
+    finally:
+        text.detach()
+
+
+def _validate(kind: ImportKind, user_id: str, items: List[Dict[str, Any]], rows: List[int]) -> ParsedBatch:
+    # A blank key cell would take the API's default (now), which never matches on re-import
+    keyed_items: List[Dict[str, Any]] = []
+    keyed_rows: List[int] = []
+    errors: List[BulkError] = []
+    for item, row in zip(items, rows):
+        missing = [field for field in kind.key_fields if field not in item]
+        if missing:
+            errors.append({"row": row, "errors": [{"type": "missing", "loc": [field], "msg": "Field required"} for field in missing]})
+        else:
+            keyed_items.append(item)
+            keyed_rows.append(row)
+    
+    documents, positions, item_errors = validate_items(
+        keyed_items, kind.create_schema, lambda data: kind.build(data, user_id)
+    )
+    for error in item_errors:
+        error["row"] = keyed_rows[error.pop("index")]
+    errors = sorted(errors + item_errors, key=lambda error: error["row"])
+    return documents, [keyed_rows[position] for position in positions], errors, len(items)
+
+
+async def _produce(kind: ImportKind, user_id: str, source: BinaryIO, batch_size: int) -> AsyncIterator[ParsedBatch]:
+    """Parse in a worker thread; the bounded queue blocks the parser while the writer catches up"""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=IMPORT_QUEUE_BATCHES)
+    cancelled = threading.Event()
+    done = object()
+    
+    def put(item: Any) -> None:
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+    
+    def parse() -> None:
+        try:
+            for batch in parse_batches(kind, user_id, source, batch_size):
+                if cancelled.is_set():
+                    return
+                put(batch)
+        except Exception as exc:
+            put(exc)
+        finally:
+            put(done)
+    
+    parser = loop.run_in_executor(None, parse)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+        # Unblock a parser stuck on a full queue so the thread can exit
+        while not parser.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+
+
+async def import_csv(
+    kind: ImportKind,
+    user_id: str,
+    source: BinaryIO,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Import a CSV export into a user's history, yielding a progress report after every written batch"""
+    batch_size = batch_size or settings.bulk_chunk_size
+    report: Dict[str, Any] = {"kind": kind.name, "rows": 0, "inserted": 0, "duplicates": 0, "failed": 0, "errors": []}
+    
+    def record(errors: List[BulkError]) -> None:
+        report["failed"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(report["errors"])
+        report["errors"].extend(errors[:max(room, 0)])
+    
+    try:
+        async for documents, rows, errors, row_count in _produce(kind, user_id, source, batch_size):
+            report["rows"] += row_count
+            record(errors)
+            
+            existing = await kind.existing_keys(user_id, documents) if documents else set()
+            fresh: List[Document] = []
+            fresh_rows: List[int] = []
+            for document, row in zip(documents, rows):
+                key = kind.key(document)
+                if key in existing:
+                    report["duplicates"] += 1
+                    continue
+                existing.add(key)
+                fresh.append(document)
+                fresh_rows.append(row)
+            
+            if fresh:
+                inserted, write_errors = await kind.insert(fresh, fresh_rows)
+                for error in write_errors:
+                    error["row"] = error.pop("index")
+                record(write_errors)
+                report["inserted"] += len(inserted)
+                if inserted:
+                    await kind.after_insert(user_id, inserted)
+            
+            yield {**{key: value for key, value in report.items() if key != "errors"}, "done": False}
+    except (ValueError, csv.Error) as exc:
+        report["error"] = str(exc)
+    
+    yield {**report, "done": True}
@@ -0,0 +1,53 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+
+from beanie import Document
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from app.services.pagination import KEYSET_SORT, NEXT_CURSOR_HEADER, after_cursor, encode_cursor
+from app.services.serialize import dumps, serializer_for
+
+STREAM_BATCH_SIZE = 500
+
+
+async def list_page(
+    document_model: Type[Document],
+    query: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str],
+) -> ORJSONResponse:
+    """Fetch one keyset page without hydrating models and put the next cursor in X-Next-Cursor"""
+    serializer = serializer_for(document_model)
+    docs = await document_model.get_motor_collection().find(
+        after_cursor(query, cursor), serializer.projection, sort=KEYSET_SORT, limit=limit
+    ).to_list(length=limit)
+    
+    headers = {}
+    if len(docs) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(docs[-1])
+    return ORJSONResponse([serializer.to_dict(doc) for doc in docs], headers=headers)
+
+
+async def iter_ndjson(
+    document_model: Type[Document],
+    query: Dict[str, Any],
+    batch_size: int = STREAM_BATCH_SIZE,
+    limit: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """Yield NDJSON chunks of `batch_size` lines straight from the Motor cursor"""
+    serializer = serializer_for(document_model)
+    cursor = document_model.get_motor_collection().find(
+        query, serializer.projection, sort=KEYSET_SORT, batch_size=batch_size, limit=limit or 0
+    )
+    lines: List[bytes] = []
+    async for doc in cursor:
+        lines.append(dumps(serializer.to_dict(doc)) + b"\n")
+        if len(lines) >= batch_size:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
+
+
+def stream_ndjson(document_model: Type[Document], query: Dict[str, Any]) -> StreamingResponse:
+    """Stream every matching document as NDJSON, newest first"""
+    return StreamingResponse(iter_ndjson(document_model, query), media_type="application/x-ndjson")
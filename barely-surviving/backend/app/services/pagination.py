@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+KEYSET_SORT = [("date", -1), ("_id", -1)]
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(doc: Mapping[str, Any]) -> str:
+    """Opaque cursor pointing just past `doc` in (date, _id) descending order"""
+    last_date = doc["date"]
+    if not isinstance(last_date, datetime):
+        last_date = datetime.combine(last_date, datetime.min.time())
+    payload = json.dumps([last_date.isoformat(), str(doc["_id"])])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def cursor_position(cursor: str) -> Tuple[datetime, ObjectId]:
+    """The (date, _id) a cursor points just past"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_str, id_str = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_str), ObjectId(id_str)
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Turn a cursor back into a keyset filter selecting the entries after it"""
+    last_date, last_id = cursor_position(cursor)
+    return {
+        "$or": [
+            {"date": {"$lt": last_date}},
+            {"date": last_date, "_id": {"$lt": last_id}},
+        ]
+    }
+
+
+def after_cursor(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Combine a route's filter with the keyset filter for `cursor`"""
+    if not cursor:
+        return query
+    keyset = decode_cursor(cursor)
+    return {"$and": [query, keyset]} if query else keyset
+
@@ -0,0 +1,72 @@
+from typing import Any, Dict, List, Type
+
+from beanie import Document
+
+from app.config import settings
+from app.database import USER_MODELS, db
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.models.weight import Weight
+from app.services.versions import STALE_TAGS, version_counters
+
+# Every user-scoped query has an equality on user_id, so a key leading with user_id
+# routes each request to the shards holding that user. Entries add their date, so a
+# heavy user's history (e.g. wearable syncs) splits into chunks by time instead of
+# growing one jumbo chunk, and the (user_id, date, _id) indexes support the key. The
+# other collections hold a few documents per user or day and keep user_id alone,
+# which their unique indexes start with.
+SHARD_KEY = {"user_id": 1}
+ENTRY_SHARD_KEY = {"user_id": 1, "date": 1}
+ENTRY_MODELS = (Workout, Meal, Weight)
+
+# Descending entry indexes -> the ascending ones that replaced them to support ENTRY_SHARD_KEY
+REPLACED_INDEXES = {"user_id_1_date_-1__id_-1": "user_id_1_date_1__id_1"}
+
+
+def shard_key(document_model: Type[Document]) -> Dict[str, int]:
+    return ENTRY_SHARD_KEY if document_model in ENTRY_MODELS else SHARD_KEY
+
+
+def shard_filter(document: Document) -> Dict[str, Any]:
+    """Filter on `document`'s _id and full shard key, as a sharded update that changes the key requires"""
+    return {"_id": document.id, **{field: getattr(document, field) for field in shard_key(type(document))}}
+
+
+async def shard_collections() -> Dict[str, Dict[str, int]]:
+    """Enable sharding on the database and shard every user-scoped collection; returns the key per namespace"""
+    admin = db.client.admin
+    await admin.command("enableSharding", settings.mongodb_db_name)
+    sharded = {}
+    for document_model in USER_MODELS:
+        namespace = f"{settings.mongodb_db_name}.{document_model.get_settings().name}"
+        key = shard_key(document_model)
+        await admin.command("shardCollection", namespace, key=key)
+        sharded[namespace] = key
+    return sharded
+
+
+async def drop_legacy_indexes() -> List[str]:
+    """Drop indexes from before user partitioning (the old unique `day`/`month` ones block other users) or sharding"""
+    dropped = []
+    for document_model in USER_MODELS:
+        collection = document_model.get_motor_collection()
+        indexes = await collection.index_information()
+        for name, info in indexes.items():
+            unpartitioned = next(iter(info["key"]))[0] != "user_id"
+            replaced = REPLACED_INDEXES.get(name) in indexes
+            if name != "_id_" and (unpartitioned or replaced):
+                await collection.drop_index(name)
+                dropped.append(f"{collection.name}.{name}")
+    return dropped
+
+
+async def assign_owner(user_id: str) -> Dict[str, Any]:
+    """Give every document stored before user partitioning an owner; returns the count per collection"""
+    assigned = {}
+    for document_model in USER_MODELS:
+        collection = document_model.get_motor_collection()
+        result = await collection.update_many({"user_id": {"$exists": False}}, {"$set": {"user_id": user_id}})
+        assigned[collection.name] = result.modified_count
+    # Clients may hold ETags for the owner's empty history
+    await version_counters.bump(user_id, *STALE_TAGS)
+    return assigned
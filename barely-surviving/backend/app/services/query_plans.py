@@ -0,0 +1,235 @@
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from beanie import Document
+from bson import ObjectId
+
+from app.config import settings
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.models.weight import Weight
+from app.models.rollup import DailyRollup
+from app.models.goal import Goal
+from app.models.weight_bucket import WeightBucket
+from app.models.version import CollectionVersion
+from app.models.regression import WeightRegression
+from app.services.analytics import analytics_pipeline
+from app.services.autocomplete import history_pipeline
+from app.services.feed import feed_pipeline
+from app.services.forecast import window_start
+from app.services.pagination import KEYSET_SORT
+from app.services.search import SOURCES, search_pipeline
+from app.services.streak import ACTIVE_DAY
+from app.services.summary import day_bounds
+from app.services.versions import STALE_TAGS
+from app.services.weight_store import month_start
+
+FORBIDDEN_STAGES = {"COLLSCAN", "SORT"}
+
+# Pipelines may sort or group what the index hands them, but every read must use an index
+PIPELINE_FORBIDDEN_STAGES = {"COLLSCAN"}
+
+
+class QueryShape:
+    """One find() the routes issue, with representative values"""
+    
+    forbidden = FORBIDDEN_STAGES
+    
+    def __init__(
+        self,
+        name: str,
+        document_model: Type[Document],
+        filter: Dict[str, Any],
+        sort: Optional[List] = None,
+        limit: int = 100,
+        projection: Optional[Dict[str, int]] = None,
+    ):
+        self.name = name
+        self.document_model = document_model
+        self.filter = filter
+        self.sort = sort
+        self.limit = limit
+        self.projection = projection
+    
+    async def explain(self) -> Dict[str, Any]:
+        cursor = self.document_model.get_motor_collection().find(self.filter, self.projection)
+        if self.sort:
+            cursor = cursor.sort(self.sort)
+        return await cursor.limit(self.limit).explain()
+    
+    def reads(self) -> int:
+        return 1
+
+
+class PipelineShape:
+    """One aggregate() the routes issue, explained through the aggregate command"""
+    
+    forbidden = PIPELINE_FORBIDDEN_STAGES
+    
+    def __init__(self, name: str, document_model: Type[Document], pipeline: List[Dict[str, Any]]):
+        self.name = name
+        self.document_model = document_model
+        self.pipeline = pipeline
+    
+    async def explain(self) -> Dict[str, Any]:
+        collection = self.document_model.get_motor_collection()
+        return await collection.database.command({
+            "explain": {"aggregate": collection.name, "pipeline": self.pipeline, "cursor": {}},
+            "verbosity": "queryPlanner",
+        })
+    
+    def reads(self) -> int:
+        """Collections the pipeline reads: its own plus one per $unionWith"""
+        return 1 + sum(_unions(self.pipeline))
+
+
+def _unions(pipeline: List[Dict[str, Any]]) -> Iterator[int]:
+    for stage in pipeline:
+        union = stage.get("$unionWith")
+        if union is not None:
+            yield 1 + sum(_unions(union.get("pipeline", [])))
+
+
+def _keyset(last_date: datetime) -> Dict[str, Any]:
+    return {"$or": [
+        {"date": {"$lt": last_date}},
+        {"date": last_date, "_id": {"$lt": ObjectId()}},
+    ]}
+
+
+def build_query_shapes() -> List[QueryShape]:
+    today = date.today()
+    start, _ = day_bounds(today - timedelta(days=30))
+    _, end = day_bounds(today)
+    owner = {"user_id": settings.default_user_id}
+    date_range = {**owner, "date": {"$gte": start, "$lte": end}}
+    
+    bucketed = settings.weight_storage == "buckets"
+    listed = [(Workout, "cardio"), (Meal, "lunch")] + ([] if bucketed else [(Weight, None)])
+    
+    shapes = []
+    for document_model, type_value in listed:
+        collection = document_model.get_settings().name
+        shapes += [
+            QueryShape(f"{collection}: list", document_model, owner, KEYSET_SORT),
+            QueryShape(f"{collection}: list by date range", document_model, date_range, KEYSET_SORT),
+            QueryShape(f"{collection}: list next page", document_model, {**owner, **_keyset(end)}, KEYSET_SORT),
+        ]
+        if type_value:
+            shapes += [
+                QueryShape(f"{collection}: list by type", document_model, {**owner, "type": type_value}, KEYSET_SORT),
+                QueryShape(
+                    f"{collection}: list by type and date range",
+                    document_model,
+                    {"type": type_value, **date_range},
+                    KEYSET_SORT,
+                ),
+                QueryShape(
+                    f"{collection}: list by type next page",
+                    document_model,
+                    {"$and": [{**owner, "type": type_value}, _keyset(end)]},
+                    KEYSET_SORT,
+                ),
+            ]
+    
+    if bucketed:
+        month_range = {**owner, "month": {"$gte": month_start(start), "$lte": month_start(end)}}
+        shapes += [
+            QueryShape("weight_buckets: newest first", WeightBucket, owner, [("month", -1)], projection={"entries": 1}),
+            QueryShape("weight_buckets: by month range", WeightBucket, month_range, [("month", -1)]),
+            QueryShape("weight_buckets: trend", WeightBucket, month_range, [("month", 1)], limit=0),
+            QueryShape("weight_buckets: by entry id", WeightBucket, {**owner, "entries._id": ObjectId()}, limit=1),
+        ]
+    else:
+        shapes += [
+            QueryShape("weights: latest", Weight, owner, [("date", -1)], limit=1),
+            QueryShape("weights: trend", Weight, date_range, [("date", 1)], limit=0),
+        ]
+    
+    shapes += [
+        QueryShape("daily_rollups: by day", DailyRollup, {**owner, "day": day_bounds(today)[0]}, limit=1),
+        QueryShape(
+            "daily_rollups: streak scan",
+            DailyRollup,
+            {**owner, "day": {"$lte": day_bounds(today)[0]}, **ACTIVE_DAY},
+            [("day", -1)],
+            limit=0,
+            projection={"day": 1},
+        ),
+        QueryShape("goals: by user", Goal, owner, limit=1),
+        # Every conditional GET reads these before anything else
+        QueryShape(
+            "collection_versions: conditional GET",
+            CollectionVersion,
+            {**owner, "collection": {"$in": list(STALE_TAGS)}},
+            limit=0,
+            projection={"_id": 0, "collection": 1, "version": 1},
+        ),
+        QueryShape("weight_regression: forecast window", WeightRegression, {**owner, "week": {"$gte": window_start()}}, limit=0),
+    ]
+    
+    shapes += [
+        PipelineShape("recent activity feed", Workout, feed_pipeline(settings.default_user_id, None, 20)),
+        PipelineShape("analytics", Meal, analytics_pipeline(settings.default_user_id, "week", start, end)),
+    ]
+    since = datetime.utcnow() - timedelta(days=settings.autocomplete_lookback_days)
+    for kind, (document_model, _, _) in SOURCES.items():
+        collection = document_model.get_settings().name
+        shapes += [
+            PipelineShape(
+                f"{collection}: text search",
+                document_model,
+                search_pipeline(kind, settings.default_user_id, "chicken", 10),
+            ),
+            PipelineShape(
+                f"{collection}: autocomplete history",
+                document_model,
+                history_pipeline(kind, settings.default_user_id, since),
+            ),
+        ]
+    return shapes
+
+
+def _plan_stages(plan: Dict[str, Any]) -> Iterator[str]:
+    if "queryPlan" in plan:
+        plan = plan["queryPlan"]
+    yield plan.get("stage", "")
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def _winning_plans(explanation: Any) -> Iterator[Dict[str, Any]]:
+    """Every winning plan in an explain result: one per collection read, per shard"""
+    if isinstance(explanation, dict):
+        for key, value in explanation.items():
+            if key == "winningPlan" and "shards" not in value:
+                yield value
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(explanation, list):
+        for item in explanation:
+            yield from _winning_plans(item)
+
+
+def check_plans(shape, explanation: Dict[str, Any]) -> Dict[str, Any]:
+    """Flag winning plans that scan the collection or sort in memory
+    
+    Pipelines must also show an index scan for each collection they read.
+    """
+    plans = [list(_plan_stages(plan)) for plan in _winning_plans(explanation)]
+    stages = [stage for plan in plans for stage in plan]
+    ok = len(plans) >= shape.reads() and not shape.forbidden.intersection(stages)
+    if isinstance(shape, PipelineShape):
+        ok = ok and all("IXSCAN" in plan for plan in plans)
+    return {
+        "name": shape.name,
+        "stages": stages,
+        "ok": ok,
+    }
+
+
+async def verify_query_plans() -> List[Dict[str, Any]]:
+    """Explain every query shape against the live indexes"""
+    return [check_plans(shape, await shape.explain()) for shape in build_query_shapes()]
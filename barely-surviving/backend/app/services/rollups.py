@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import datetime, date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.models.rollup import DailyRollup
+from app.services.cache import day_tag, read_cache
+from app.services.streak import streak_cache
+from app.services.summary import MEAL_TOTALS_GROUP, WORKOUT_TOTALS_GROUP, day_bounds, day_match, stored_datetime
+
+# (user_id, day, field increments)
+RollupDelta = Tuple[str, date, Dict[str, int]]
+
+
+def _day_key(day: date) -> datetime:
+    return day_bounds(day)[0]
+
+
+def _stored_day(value: datetime) -> date:
+    """UTC day of a date, which is the day the stored entry is counted under"""
+    return stored_datetime(value).date()
+
+
+def meal_delta(meal: Meal, sign: int = 1) -> RollupDelta:
+    """Rollup change caused by adding (sign=1) or removing (sign=-1) a meal"""
+    return meal.user_id, _stored_day(meal.date), {
+        "calories_consumed": sign * meal.calories,
+        "protein": sign * meal.protein,
+        "carbs": sign * (meal.carbs or 0),
+        "fat": sign * (meal.fat or 0),
+        "meal_count": sign,
+    }
+
+
+def workout_delta(workout: Workout, sign: int = 1) -> RollupDelta:
+    """Rollup change caused by adding (sign=1) or removing (sign=-1) a workout"""
+    return workout.user_id, _stored_day(workout.date), {
+        "calories_burned": sign * workout.calories_burned,
+        "workout_count": sign,
+    }
+
+
+async def apply_deltas(deltas: Iterable[RollupDelta]) -> None:
+    """Fold deltas into one atomic $inc per user and day and write them in a single round trip"""
+    per_user: Dict[str, Dict[date, Dict[str, int]]] = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+    for user_id, day, delta in deltas:
+        for field, value in delta.items():
+            per_user[user_id][day][field] += value
+    
+    operations = []
+    for user_id, per_day in per_user.items():
+        for day, totals in per_day.items():
+            increments = {field: value for field, value in totals.items() if value}
+            if increments:
+                operations.append(
+                    UpdateOne({"user_id": user_id, "day": _day_key(day)}, {"$inc": increments}, upsert=True)
+                )
+    
+    if operations:
+        await DailyRollup.get_motor_collection().bulk_write(operations, ordered=False)
+        for user_id, per_day in per_user.items():
+            streak_cache.observe(user_id, per_day)
+            read_cache.invalidate(*(day_tag(user_id, day) for day in per_day))
+
+
+async def get_rollup(user_id: str, day: date) -> DailyRollup:
+    """Read a user's totals for a day by key, returning zeros for days with no activity"""
+    rollup = await DailyRollup.find_one({"user_id": user_id, "day": _day_key(day)})
+    return rollup or DailyRollup(user_id=user_id, day=day)
+
+
+def _rebuild_pipeline(group: Dict, fields: Dict[str, str]) -> List[Dict]:
+    return [
+        {"$group": {**group, "_id": {"user_id": "$user_id", "day": {"$dateTrunc": {"date": "$date", "unit": "day"}}}}},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id.user_id",
+            "day": "$_id.day",
+            **{name: f"${source}" for name, source in fields.items()},
+        }},
+        {"$merge": {
+            "into": DailyRollup.get_settings().name,
+            "on": ["user_id", "day"],
+            "whenMatched": "merge",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+async def rebuild_rollups(day: Optional[date] = None, user_id: Optional[str] = None) -> int:
+    """Recompute rollups from the raw meals and workouts, for one day or all history, one user or all"""
+    scope: Dict = {} if user_id is None else {"user_id": user_id}
+    if day is not None:
+        scope["day"] = _day_key(day)
+        match = [day_match(day, user_id)]
+    else:
+        match = [{"$match": scope}] if scope else []
+    await DailyRollup.find(scope).delete()
+    
+    await Meal.aggregate(match + _rebuild_pipeline(MEAL_TOTALS_GROUP, {
+        "calories_consumed": "calories",
+        "protein": "protein",
+        "carbs": "carbs",
+        "fat": "fat",
+        "meal_count": "count",
+    })).to_list()
+    await Workout.aggregate(match + _rebuild_pipeline(WORKOUT_TOTALS_GROUP, {
+        "calories_burned": "calories_burned",
+        "workout_count": "count",
+    })).to_list()
+    
+    streak_cache.clear(user_id)
+    read_cache.clear()
+    return await DailyRollup.find(scope).count()
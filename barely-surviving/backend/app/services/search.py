@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from beanie import Document
+
+from app.models.workout import Workout
+from app.models.meal import Meal
+
+# kind -> (model, text field, values remembered from the latest use)
+SOURCES: Dict[str, Tuple[Type[Document], str, Tuple[str, ...]]] = {
+    "meal": (Meal, "description", ("type", "calories", "protein", "carbs", "fat")),
+    "workout": (Workout, "name", ("type", "duration", "calories_burned")),
+}
+
+KINDS: Dict[Type[Document], str] = {document_model: kind for kind, (document_model, _, _) in SOURCES.items()}
+
+
+def normalize(text: str) -> str:
+    """Case- and whitespace-insensitive form entries are grouped by"""
+    return " ".join(text.lower().split())
+
+
+def search_pipeline(kind: str, user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+    _, field, values = SOURCES[kind]
+    return [
+        {"$match": {"user_id": user_id, "$text": {"$search": query}}},
+        {"$set": {"score": {"$meta": "textScore"}}},
+        {"$sort": {"date": -1}},
+        {"$group": {
+            "_id": {"$toLower": f"${field}"},
+            "text": {"$first": f"${field}"},
+            "count": {"$sum": 1},
+            "score": {"$max": "$score"},
+            "last_id": {"$first": "$_id"},
+            "last_used": {"$first": "$date"},
+            **{name: {"$first": f"${name}"} for name in values},
+        }},
+        {"$sort": {"score": -1, "count": -1}},
+        {"$limit": limit},
+    ]
+
+
+async def _search(kind: str, user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+    document_model, _, values = SOURCES[kind]
+    docs = await document_model.aggregate(search_pipeline(kind, user_id, query, limit)).to_list(length=limit)
+    return [
+        {
+            "kind": kind,
+            "text": doc["text"],
+            "count": doc["count"],
+            "score": round(doc["score"], 3),
+            "last_id": str(doc["last_id"]),
+            "last_used": doc["last_used"],
+            "values": {name: doc.get(name) for name in values},
+        }
+        for doc in docs
+    ]
+
+
+async def search_entries(user_id: str, query: str, kind: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """Distinct meals and workouts matching `query` through the text indexes, best match first
+    
+    Repeated entries are grouped case-insensitively, carrying how often they
+    were logged and the values of the latest one so they can be re-logged.
+    """
+    kinds: Sequence[str] = [kind] if kind else list(SOURCES)
+    results = await asyncio.gather(*(_search(name, user_id, query, limit) for name in kinds))
+    merged = [result for per_kind in results for result in per_kind]
+    merged.sort(key=lambda result: (result["score"], result["count"]), reverse=True)
+    return merged[:limit]
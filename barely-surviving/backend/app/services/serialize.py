@@ -0,0 +1,51 @@
+from datetime import datetime, date
+from typing import Any, Dict, Mapping, Type
+
+import orjson
+from beanie import Document
+from bson import ObjectId
+from pydantic_core import PydanticUndefined
+
+SKIPPED_FIELDS = {"id", "revision_id"}
+
+
+class DocumentSerializer:
+    """Turn raw Motor documents into the same JSON shape as the Beanie response models"""
+    
+    def __init__(self, document_model: Type[Document]):
+        self.fields = []
+        self.date_only = set()
+        for name, field in document_model.model_fields.items():
+            if name in SKIPPED_FIELDS:
+                continue
+            default = None if field.default is PydanticUndefined else field.default
+            self.fields.append((name, default))
+            if field.annotation is date:
+                self.date_only.add(name)
+        self.projection = {name: 1 for name, _ in self.fields}
+    
+    def to_dict(self, doc: Mapping[str, Any]) -> Dict[str, Any]:
+        result = {"_id": str(doc["_id"])}
+        for name, default in self.fields:
+            value = doc.get(name, default)
+            if isinstance(value, datetime):
+                value = value.date().isoformat() if name in self.date_only else value.isoformat()
+            elif isinstance(value, date):
+                value = value.isoformat()
+            elif isinstance(value, ObjectId):
+                value = str(value)
+            result[name] = value
+        return result
+
+
+_serializers: Dict[Type[Document], DocumentSerializer] = {}
+
+
+def serializer_for(document_model: Type[Document]) -> DocumentSerializer:
+    if document_model not in _serializers:
+        _serializers[document_model] = DocumentSerializer(document_model)
+    return _serializers[document_model]
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value)
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, Mapping, Optional
+
+from app.config import settings
+from app.models.rollup import DailyRollup
+
+ACTIVE_DAY = {"$or": [{"meal_count": {"$gt": 0}}, {"workout_count": {"$gt": 0}}]}
+SCAN_BATCH_SIZE = 32
+
+
+def _day_key(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+class UserStreak:
+    """One user's current activity run, scanned from their daily rollups and kept up to date on writes
+    
+    Writes that extend or leave the run untouched are applied in place; anything
+    that could split or merge runs drops the state so the next read rescans.
+    State also expires after `streak_cache_ttl` seconds so writes served by
+    other replicas are picked up.
+    """
+    
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.as_of: Optional[date] = None
+        self.scanned_at = 0.0
+        self.run_start: Optional[date] = None
+        self.run_end: Optional[date] = None
+        # End of the newest run when it ended before yesterday; how far back it goes is never scanned
+        self.stale_run_end: Optional[date] = None
+        self.latest: Optional[date] = None
+        self.lock = asyncio.Lock()
+    
+    def clear(self) -> None:
+        self.as_of = None
+    
+    def is_fresh(self, today: date) -> bool:
+        return self.as_of == today and time.monotonic() - self.scanned_at < settings.streak_cache_ttl
+    
+    async def scan(self, today: date) -> None:
+        """Walk active days backwards from today and stop at the first gap
+        
+        A run that ended before yesterday can't be the current streak, so it isn't walked at all.
+        """
+        collection = DailyRollup.get_motor_collection()
+        active = {"user_id": self.user_id, **ACTIVE_DAY}
+        cursor = collection.find(
+            {**active, "day": {"$lte": _day_key(today)}}, {"day": 1}
+        ).sort("day", -1).batch_size(SCAN_BATCH_SIZE)
+        
+        run_start = run_end = stale_run_end = None
+        async for doc in cursor:
+            day = doc["day"].date()
+            if run_end is None:
+                if day < today - timedelta(days=1):
+                    stale_run_end = day
+                    break
+                run_start = run_end = day
+            elif day == run_start - timedelta(days=1):
+                run_start = day
+            else:
+                break
+        await cursor.close()
+        
+        latest = await collection.find_one(active, {"day": 1}, sort=[("day", -1)])
+        
+        self.run_start, self.run_end, self.stale_run_end = run_start, run_end, stale_run_end
+        self.latest = latest["day"].date() if latest else None
+        self.as_of = today
+        self.scanned_at = time.monotonic()
+    
+    def result(self, today: date) -> Dict[str, Any]:
+        if self.run_end == today:
+            return {"streak": (today - self.run_start).days + 1, "last_activity_date": today}
+        if self.run_end is not None and self.run_end == today - timedelta(days=1):
+            return {"streak": 0, "last_activity_date": self.run_end}
+        return {"streak": 0, "last_activity_date": self.latest}
+    
+    def observe(self, changes: Mapping[date, Mapping[str, int]]) -> None:
+        """Apply per-day rollup increments to the cached run"""
+        if self.as_of is None:
+            return
+        if self.as_of != date.today():
+            self.clear()
+            return
+        
+        for day, totals in changes.items():
+            entries = totals.get("meal_count", 0) + totals.get("workout_count", 0)
+            if entries > 0:
+                self._observe_added(day)
+            elif entries < 0:
+                self._observe_removed(day)
+            if self.as_of is None:
+                return
+    
+    def _observe_added(self, day: date) -> None:
+        if self.latest is None or day > self.latest:
+            self.latest = day
+        if day > self.as_of:
+            return
+        if self.run_end is None and self.stale_run_end is not None and day == self.stale_run_end + timedelta(days=1):
+            # Extends the unscanned run
+            self.clear()
+        elif self.run_end is None or day > self.run_end + timedelta(days=1):
+            self.run_start = self.run_end = day
+        elif day == self.run_end + timedelta(days=1):
+            self.run_end = day
+        elif day == self.run_start - timedelta(days=1):
+            # May join an earlier run; only a rescan knows how far back it goes
+            self.clear()
+    
+    def _observe_removed(self, day: date) -> None:
+        in_run = self.run_end is not None and self.run_start <= day <= self.run_end
+        if in_run or day == self.latest:
+            self.clear()
+
+
+class StreakCache:
+    """Per-user streak state, least recently used users evicted past `streak_cache_max_users`"""
+    
+    def __init__(self):
+        self._users: "OrderedDict[str, UserStreak]" = OrderedDict()
+    
+    def _state(self, user_id: str) -> UserStreak:
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = UserStreak(user_id)
+            while len(self._users) > settings.streak_cache_max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return state
+    
+    def clear(self, user_id: Optional[str] = None) -> None:
+        if user_id is None:
+            self._users.clear()
+        else:
+            self._users.pop(user_id, None)
+    
+    async def get(self, user_id: str) -> Dict[str, Any]:
+        today = date.today()
+        state = self._state(user_id)
+        if not state.is_fresh(today):
+            async with state.lock:
+                if not state.is_fresh(today):
+                    await state.scan(today)
+        return state.result(today)
+    
+    def observe(self, user_id: str, changes: Mapping[date, Mapping[str, int]]) -> None:
+        """Apply per-day rollup increments to the user's cached run, if one is cached"""
+        state = self._users.get(user_id)
+        if state is not None:
+            state.observe(changes)
+
+
+streak_cache = StreakCache()
@@ -0,0 +1,41 @@
+from datetime import datetime, date, timezone
+from typing import Any, Dict, Optional, Tuple
+
+
+def day_bounds(target_date: date) -> Tuple[datetime, datetime]:
+    """Return the first and last datetime of a day, matching the `date` index"""
+    return (
+        datetime.combine(target_date, datetime.min.time()),
+        datetime.combine(target_date, datetime.max.time()),
+    )
+
+
+def stored_datetime(value: datetime) -> datetime:
+    """`value` as MongoDB hands it back: naive UTC, truncated to milliseconds"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def day_match(target_date: date, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """$match stage selecting one day's entries (of one user, if given) through the `(user_id, date)` index"""
+    start_datetime, end_datetime = day_bounds(target_date)
+    match: Dict[str, Any] = {} if user_id is None else {"user_id": user_id}
+    match["date"] = {"$gte": start_datetime, "$lte": end_datetime}
+    return {"$match": match}
+
+
+MEAL_TOTALS_GROUP = {
+    "_id": None,
+    "calories": {"$sum": "$calories"},
+    "protein": {"$sum": "$protein"},
+    "carbs": {"$sum": {"$ifNull": ["$carbs", 0]}},
+    "fat": {"$sum": {"$ifNull": ["$fat", 0]}},
+    "count": {"$sum": 1},
+}
+
+WORKOUT_TOTALS_GROUP = {
+    "_id": None,
+    "calories_burned": {"$sum": "$calories_burned"},
+    "count": {"$sum": 1},
+}
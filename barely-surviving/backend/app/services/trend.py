@@ -0,0 +1,97 @@
+from datetime import date
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.services.weight_store import get_weight_store
+
+# Smoothing factor of the "true weight" EWMA (Hacker's Diet style, one point per day)
+TRUE_WEIGHT_ALPHA = 0.1
+EWMA_BLOCK = 256
+
+
+async def load_series(user_id: str, start_date: date, end_date: date) -> Tuple[List[date], np.ndarray]:
+    """Read a user's (date, weight) pairs in date order without hydrating documents"""
+    docs = await get_weight_store().series(user_id, start_date, end_date)
+    return [doc["date"].date() for doc in docs], np.fromiter((doc["weight"] for doc in docs), dtype=float, count=len(docs))
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over the last `window` points (fewer at the start of the series)"""
+    totals = np.cumsum(values)
+    shifted = np.zeros(len(values))
+    if len(values) > window:
+        shifted[window:] = totals[:-window]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return (totals - shifted) / counts
+
+
+def ewma(values: np.ndarray, alpha: float = TRUE_WEIGHT_ALPHA) -> np.ndarray:
+    """Exponentially weighted moving average seeded with the first value
+    
+    Each block of EWMA_BLOCK points is solved in closed form relative to the
+    value carried in from the previous block, keeping the powers of (1 - alpha)
+    well inside float range for multi-year series.
+    """
+    result = np.empty_like(values)
+    if not len(values):
+        return result
+    decay = 1.0 - alpha
+    carry = values[0]
+    for start in range(0, len(values), EWMA_BLOCK):
+        block = values[start:start + EWMA_BLOCK]
+        steps = np.arange(1, len(block) + 1)
+        # s_k = decay^k * (carry + alpha * sum_{j<=k} decay^-j * x_j)
+        result[start:start + len(block)] = decay ** steps * (carry + alpha * np.cumsum(decay ** -steps * block))
+        carry = result[start + len(block) - 1]
+    return result
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of at most `max_points` shape-preserving points"""
+    count = len(x)
+    if count <= max_points or max_points < 3:
+        return np.arange(count)
+    
+    # Interior points split into max_points - 2 buckets; first and last are always kept
+    edges = np.linspace(1, count - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = count - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x, next_y = x[end:edges[bucket + 2]], y[end:edges[bucket + 2]]
+        else:
+            next_x, next_y = x[-1:], y[-1:]
+        average_x, average_y = next_x.mean(), next_y.mean()
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def build_trend(
+    dates: List[date],
+    weights: np.ndarray,
+    max_points: int,
+    window: int,
+) -> List[Dict[str, Any]]:
+    """Smooth the full series, then downsample it to at most `max_points` points"""
+    averages = moving_average(weights, window)
+    true_weights = ewma(weights)
+    ordinals = np.fromiter((day.toordinal() for day in dates), dtype=float, count=len(dates))
+    
+    return [
+        {
+            "date": dates[index],
+            "weight": float(weights[index]),
+            "moving_average": round(float(averages[index]), 2),
+            "true_weight": round(float(true_weights[index]), 2),
+        }
+        for index in lttb(ordinals, weights, max_points)
+    ]
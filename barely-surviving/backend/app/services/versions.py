@@ -0,0 +1,90 @@
+import hashlib
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, Optional, Sequence
+
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.models.version import CollectionVersion
+from app.services.cache import read_cache, user_tag
+
+# Read cache tag holding what each collection's writes make stale
+STALE_TAGS = {
+    "meals": "rollups",
+    "workouts": "rollups",
+    "weights": "weights",
+    "goals": "goals",
+}
+
+
+class VersionCounters:
+    """Per-user write counters for each collection, stored in MongoDB so every replica agrees
+    
+    Writes bump the counter; conditional GETs read the counters their response
+    depends on and compare an ETag built from them before running any query.
+    Counters that moved without a local bump mean another replica wrote, so
+    the matching read cache entries are dropped as well.
+    """
+    
+    def __init__(self):
+        self._seen: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+    
+    def _collection(self):
+        return CollectionVersion.get_motor_collection()
+    
+    async def bump(self, user_id: str, *names: str) -> None:
+        for name in names:
+            doc = await self._collection().find_one_and_update(
+                {"user_id": user_id, "collection": name},
+                {"$inc": {"version": 1}},
+                projection={"_id": 0, "version": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            self._observe(user_id, name, doc["version"], bumped=True)
+    
+    async def current(self, user_id: str, names: Sequence[str]) -> Dict[str, int]:
+        versions = {name: 0 for name in names}
+        cursor = self._collection().find(
+            {"user_id": user_id, "collection": {"$in": list(names)}},
+            {"_id": 0, "collection": 1, "version": 1},
+        )
+        async for doc in cursor:
+            versions[doc["collection"]] = doc["version"]
+        for name, version in versions.items():
+            self._observe(user_id, name, version)
+        return versions
+    
+    def _observe(self, user_id: str, name: str, version: int, bumped: bool = False) -> None:
+        seen = self._seen.get(user_id)
+        if seen is None:
+            seen = self._seen[user_id] = {}
+            while len(self._seen) > settings.version_cache_max_users:
+                self._seen.popitem(last=False)
+        else:
+            self._seen.move_to_end(user_id)
+        
+        previous: Optional[int] = seen.get(name)
+        expected = previous + 1 if bumped and previous is not None else previous
+        if version != expected:
+            read_cache.invalidate(user_tag(user_id, STALE_TAGS[name]))
+        seen[name] = version
+
+
+def make_etag(user_id: str, target: str, versions: Dict[str, int]) -> str:
+    """Weak ETag for one user's view of `target` (path and query) at these versions"""
+    # Today's date is part of it because several endpoints default to "today"
+    parts = [user_id, target, date.today().isoformat()] + [f"{name}={versions[name]}" for name in sorted(versions)]
+    return f'W/"{hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    candidates: Iterable[str] = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/") for candidate in candidates)
+
+
+version_counters = VersionCounters()
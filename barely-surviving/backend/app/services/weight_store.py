@@ -0,0 +1,437 @@
+from datetime import datetime, date
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pymongo import DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.models.weight import Weight
+from app.models.weight_bucket import WeightBucket
+from app.services.listing import STREAM_BATCH_SIZE, list_page, stream_ndjson
+from app.services.pagination import KEYSET_SORT, NEXT_CURSOR_HEADER, after_cursor, cursor_position, encode_cursor
+from app.services.serialize import dumps, serializer_for
+
+# Buckets pulled per round trip when walking newest-first; one bucket holds up to a month of entries
+BUCKET_BATCH_SIZE = 4
+
+EXPORT_SORT = [("date", 1), ("_id", 1)]
+
+# Recomputes the precomputed stats after entries are removed
+BUCKET_STATS = {
+    "count": {"$size": "$entries"},
+    "sum": {"$sum": "$entries.weight"},
+    "min": {"$min": "$entries.weight"},
+    "max": {"$max": "$entries.weight"},
+}
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def month_start(day: date) -> datetime:
+    """Key of the bucket holding `day`"""
+    return datetime(day.year, day.month, 1)
+
+
+def _date_range(start_date: Optional[date], end_date: Optional[date]) -> Dict[str, Any]:
+    query = {}
+    if start_date or end_date:
+        date_query = {}
+        if start_date:
+            date_query["$gte"] = _midnight(start_date)
+        if end_date:
+            date_query["$lte"] = _midnight(end_date)
+        query["date"] = date_query
+    return query
+
+
+class DocumentWeightStore:
+    """One `weights` document per measurement; every read is scoped to one user"""
+    
+    @property
+    def collection_name(self) -> str:
+        return Weight.get_settings().name
+    
+    async def insert(self, weight: Weight) -> None:
+        await weight.insert()
+    
+    async def insert_many(self, weights: List[Weight], ordered: bool = False) -> None:
+        await Weight.insert_many(weights, ordered=ordered)
+    
+    async def get(self, user_id: str, weight_id: PydanticObjectId) -> Optional[Weight]:
+        return await Weight.find_one({"_id": weight_id, "user_id": user_id})
+    
+    async def delete(self, weight: Weight) -> None:
+        await weight.delete()
+    
+    async def latest(self, user_id: str) -> Optional[Weight]:
+        return await Weight.find_one({"user_id": user_id}, sort=[("date", -1)])
+    
+    async def series(self, user_id: str, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        cursor = Weight.get_motor_collection().find(
+            {"user_id": user_id, **_date_range(start_date, end_date)},
+            {"_id": 0, "date": 1, "weight": 1},
+            sort=[("date", 1)],
+        )
+        return await cursor.to_list(length=None)
+    
+    async def user_ids(self) -> List[str]:
+        return await Weight.get_motor_collection().distinct("user_id")
+    
+    async def existing_dates(self, user_id: str, days: List[date]) -> Set[date]:
+        """Which of `days` already have an entry"""
+        cursor = Weight.get_motor_collection().find(
+            {"user_id": user_id, "date": {"$in": [_midnight(day) for day in days]}},
+            {"_id": 0, "date": 1},
+        )
+        return {doc["date"].date() async for doc in cursor}
+    
+    async def iter_all(self, user_id: str, projection: Dict[str, Any], batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+        """Every entry oldest-first, `batch_size` documents per round trip"""
+        cursor = Weight.get_motor_collection().find({"user_id": user_id}, projection, sort=EXPORT_SORT, batch_size=batch_size)
+        async for doc in cursor:
+            yield doc
+    
+    async def list_page(
+        self,
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        limit: int,
+        cursor: Optional[str],
+    ) -> ORJSONResponse:
+        return await list_page(Weight, {"user_id": user_id, **_date_range(start_date, end_date)}, limit, cursor)
+    
+    def stream(
+        self,
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        cursor: Optional[str],
+    ) -> StreamingResponse:
+        return stream_ndjson(Weight, after_cursor({"user_id": user_id, **_date_range(start_date, end_date)}, cursor))
+    
+    def feed_pipeline(self, user_id: str, cursor: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        return [{"$match": after_cursor({"user_id": user_id}, cursor)}, {"$sort": dict(KEYSET_SORT)}, {"$limit": limit}]
+
+
+class BucketWeightStore:
+    """Per-user monthly `weight_buckets` documents holding date-sorted entries plus count/sum/min/max
+    
+    Entries don't repeat the owner; `user_id` is copied onto them from the bucket on the way out.
+    """
+    
+    @property
+    def collection_name(self) -> str:
+        return WeightBucket.get_settings().name
+    
+    def _collection(self):
+        return WeightBucket.get_motor_collection()
+    
+    @staticmethod
+    def _entry(weight: Weight) -> Dict[str, Any]:
+        return {
+            "_id": weight.id,
+            "weight": weight.weight,
+            "date": _midnight(weight.date),
+            "created_at": weight.created_at,
+        }
+    
+    @staticmethod
+    def _push(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        values = [entry["weight"] for entry in entries]
+        return {
+            "$push": {"entries": {"$each": entries, "$sort": {"date": 1, "_id": 1}}},
+            "$inc": {"count": len(entries), "sum": sum(values)},
+            "$min": {"min": min(values)},
+            "$max": {"max": max(values)},
+            "$set": {"last_added": [entry["_id"] for entry in entries]},
+        }
+    
+    async def insert(self, weight: Weight) -> None:
+        if weight.id is None:
+            weight.id = PydanticObjectId()
+        entry = self._entry(weight)
+        await self._collection().update_one(
+            {"user_id": weight.user_id, "month": month_start(weight.date)},
+            self._push([entry]),
+            upsert=True,
+        )
+    
+    async def insert_many(self, weights: List[Weight], ordered: bool = False) -> None:
+        """One upsert per touched user and month
+        
+        A failed upsert loses its whole month, so its write error is raised once for
+        every weight in that month, indexed by the weight's position in `weights`.
+        """
+        by_month: Dict[Tuple[str, datetime], List[Dict[str, Any]]] = {}
+        positions: Dict[Tuple[str, datetime], List[int]] = {}
+        for index, weight in enumerate(weights):
+            if weight.id is None:
+                weight.id = PydanticObjectId()
+            month = (weight.user_id, month_start(weight.date))
+            by_month.setdefault(month, []).append(self._entry(weight))
+            positions.setdefault(month, []).append(index)
+        if not by_month:
+            return
+        try:
+            await self._collection().bulk_write(
+                [
+                    UpdateOne({"user_id": user_id, "month": month}, self._push(entries), upsert=True)
+                    for (user_id, month), entries in by_month.items()
+                ],
+                ordered=ordered,
+            )
+        except BulkWriteError as exc:
+            op_positions = list(positions.values())
+            details = dict(exc.details)
+            details["writeErrors"] = [
+                {**write_error, "index": index}
+                for write_error in exc.details.get("writeErrors", [])
+                for index in op_positions[write_error["index"]]
+            ]
+            raise BulkWriteError(details) from exc
+    
+    async def get(self, user_id: str, weight_id: PydanticObjectId) -> Optional[Weight]:
+        bucket = await self._collection().find_one(
+            {"user_id": user_id, "entries._id": weight_id},
+            {"entries": {"$elemMatch": {"_id": weight_id}}},
+        )
+        if not bucket or not bucket.get("entries"):
+            return None
+        return self._to_weight(user_id, bucket["entries"][0])
+    
+    async def delete(self, weight: Weight) -> None:
+        await self._collection().update_one(
+            {"user_id": weight.user_id, "entries._id": weight.id},
+            [
+                {"$set": {"entries": {"$filter": {"input": "$entries", "cond": {"$ne": ["$$this._id", weight.id]}}}}},
+                {"$set": {**BUCKET_STATS, "last_added": []}},
+            ],
+        )
+        await self._collection().delete_one({"user_id": weight.user_id, "month": month_start(weight.date), "count": 0})
+    
+    async def latest(self, user_id: str) -> Optional[Weight]:
+        bucket = await self._collection().find_one(
+            {"user_id": user_id, "count": {"$gt": 0}},
+            {"entries": {"$slice": -1}},
+            sort=[("month", DESCENDING)],
+        )
+        if not bucket or not bucket.get("entries"):
+            return None
+        return self._to_weight(user_id, bucket["entries"][0])
+    
+    async def series(self, user_id: str, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        low, high = _midnight(start_date), _midnight(end_date)
+        buckets = self._collection().find(
+            {"user_id": user_id, "month": {"$gte": month_start(start_date), "$lte": month_start(end_date)}},
+            {"_id": 0, "entries.date": 1, "entries.weight": 1},
+            sort=[("month", 1)],
+        )
+        return [
+            entry
+            async for bucket in buckets
+            for entry in bucket["entries"]
+            if low <= entry["date"] <= high
+        ]
+    
+    async def user_ids(self) -> List[str]:
+        return await self._collection().distinct("user_id")
+    
+    async def existing_dates(self, user_id: str, days: List[date]) -> Set[date]:
+        wanted = {_midnight(day) for day in days}
+        buckets = self._collection().find(
+            {"user_id": user_id, "month": {"$in": list({month_start(day) for day in days})}},
+            {"_id": 0, "entries.date": 1},
+        )
+        return {entry["date"].date() async for bucket in buckets for entry in bucket["entries"] if entry["date"] in wanted}
+    
+    async def iter_all(self, user_id: str, projection: Dict[str, Any], batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+        """Every entry oldest-first; entries are stored whole, so `projection` is not applied"""
+        buckets = self._collection().find(
+            {"user_id": user_id}, {"entries": 1}, sort=[("month", 1)], batch_size=BUCKET_BATCH_SIZE
+        )
+        async for bucket in buckets:
+            for entry in bucket["entries"]:
+                entry["user_id"] = user_id
+                yield entry
+    
+    async def _iter_entries(
+        self,
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        cursor: Optional[str],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Entries newest-first in (date, _id) order, reading only the buckets the range overlaps"""
+        low = _midnight(start_date) if start_date else None
+        high = _midnight(end_date) if end_date else None
+        position: Optional[Tuple[datetime, Any]] = cursor_position(cursor) if cursor else None
+        
+        query: Dict[str, Any] = {"user_id": user_id}
+        month_query = {}
+        if low:
+            month_query["$gte"] = month_start(low)
+        if high:
+            month_query["$lte"] = month_start(high)
+        if position and (high is None or position[0] < high):
+            month_query["$lte"] = month_start(position[0])
+        
+        if month_query:
+            query["month"] = month_query
+        buckets = self._collection().find(
+            query,
+            {"entries": 1},
+            sort=[("month", DESCENDING)],
+            batch_size=BUCKET_BATCH_SIZE,
+        )
+        async for bucket in buckets:
+            for entry in reversed(bucket["entries"]):
+                if high and entry["date"] > high:
+                    continue
+                if low and entry["date"] < low:
+                    return
+                if position and (entry["date"], entry["_id"]) >= position:
+                    continue
+                entry["user_id"] = user_id
+                yield entry
+    
+    async def list_page(
+        self,
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        limit: int,
+        cursor: Optional[str],
+    ) -> ORJSONResponse:
+        serializer = serializer_for(Weight)
+        entries = []
+        async for entry in self._iter_entries(user_id, start_date, end_date, cursor):
+            entries.append(entry)
+            if len(entries) == limit:
+                break
+        
+        headers = {}
+        if len(entries) == limit:
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(entries[-1])
+        return ORJSONResponse([serializer.to_dict(entry) for entry in entries], headers=headers)
+    
+    async def _iter_ndjson(
+        self,
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        cursor: Optional[str],
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[bytes]:
+        serializer = serializer_for(Weight)
+        lines: List[bytes] = []
+        async for entry in self._iter_entries(user_id, start_date, end_date, cursor):
+            lines.append(dumps(serializer.to_dict(entry)) + b"\n")
+            if len(lines) >= batch_size:
+                yield b"".join(lines)
+                lines = []
+        if lines:
+            yield b"".join(lines)
+    
+    def stream(
+        self,
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        cursor: Optional[str],
+    ) -> StreamingResponse:
+        return StreamingResponse(
+            self._iter_ndjson(user_id, start_date, end_date, cursor), media_type="application/x-ndjson"
+        )
+    
+    def feed_pipeline(self, user_id: str, cursor: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        # Every bucket older than the cursor's month holds at least one entry past the cursor,
+        # but the cursor's own month may hold none, so one more bucket than `limit` covers the page
+        bucket_match: Dict[str, Any] = {"user_id": user_id, "count": {"$gt": 0}}
+        if cursor:
+            bucket_match["month"] = {"$lte": month_start(cursor_position(cursor)[0])}
+        return [
+            {"$match": bucket_match},
+            {"$sort": {"month": -1}},
+            {"$limit": limit + 1},
+            {"$unwind": "$entries"},
+            {"$replaceRoot": {"newRoot": "$entries"}},
+            {"$match": after_cursor({}, cursor)},
+            {"$sort": dict(KEYSET_SORT)},
+            {"$limit": limit},
+        ]
+    
+    @staticmethod
+    def _to_weight(user_id: str, entry: Dict[str, Any]) -> Weight:
+        return Weight(
+            id=entry["_id"],
+            user_id=user_id,
+            weight=entry["weight"],
+            date=entry["date"].date(),
+            created_at=entry["created_at"],
+        )
+
+
+_stores = {
+    "documents": DocumentWeightStore(),
+    "buckets": BucketWeightStore(),
+}
+
+
+def get_weight_store():
+    """Store for the configured WEIGHT_STORAGE mode"""
+    return _stores[settings.weight_storage]
+
+
+# Folds a migrated bucket into one that already exists: entries only the bucket has
+# (written after the switch to buckets) are kept, and entries already copied are not doubled
+MERGE_BUCKET = [
+    {"$set": {"entries": {"$concatArrays": [
+        "$entries",
+        {"$filter": {"input": "$$new.entries", "cond": {"$not": [{"$in": ["$$this._id", "$entries._id"]}]}}},
+    ]}}},
+    {"$set": {"entries": {"$sortArray": {"input": "$entries", "sortBy": {"date": 1, "_id": 1}}}}},
+    {"$set": BUCKET_STATS},
+]
+
+
+async def migrate_to_buckets(drop_source: bool = False) -> int:
+    """Copy `weights` into `weight_buckets` server-side; returns the number of buckets
+    
+    Safe to re-run: existing buckets are merged into by entry id, never replaced.
+    """
+    pipeline = [
+        {"$sort": {"date": 1, "_id": 1}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "month": {"$dateTrunc": {"date": "$date", "unit": "month"}}},
+            "entries": {"$push": {"_id": "$_id", "weight": "$weight", "date": "$date", "created_at": "$created_at"}},
+            "count": {"$sum": 1},
+            "sum": {"$sum": "$weight"},
+            "min": {"$min": "$weight"},
+            "max": {"$max": "$weight"},
+        }},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id.user_id",
+            "month": "$_id.month",
+            "entries": 1,
+            "count": 1,
+            "sum": 1,
+            "min": 1,
+            "max": 1,
+        }},
+        {"$merge": {
+            "into": WeightBucket.get_settings().name,
+            "on": ["user_id", "month"],
+            "whenMatched": MERGE_BUCKET,
+            "whenNotMatched": "insert",
+        }},
+    ]
+    await Weight.get_motor_collection().aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+    if drop_source:
+        await Weight.get_motor_collection().delete_many({})
+    return await WeightBucket.get_motor_collection().count_documents({})
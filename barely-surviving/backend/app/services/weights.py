@@ -0,0 +1,14 @@
+from typing import Optional
+
+from app.models.weight import Weight
+from app.services.cache import read_cache, user_tag
+from app.services.weight_store import get_weight_store
+
+
+async def get_latest_weight(user_id: str) -> Optional[Weight]:
+    """A user's most recent weight entry, served from the read cache"""
+    return await read_cache.get_or_load(
+        ("weights.latest", user_id),
+        lambda: get_weight_store().latest(user_id),
+        tags=[user_tag(user_id, "weights")],
+    )
@@ -0,0 +1,134 @@
+import asyncio
+from collections import defaultdict
+from contextlib import suppress
+from typing import Dict, List, Optional, Type
+
+from beanie import Document, PydanticObjectId
+
+from app.config import settings
+from app.metrics import write_behind_depth, write_behind_documents
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.models.weight import Weight
+from app.services.autocomplete import autocomplete_index
+from app.services.bulk import insert_chunked
+from app.services.cache import read_cache, user_tag
+from app.services.events import event_hub
+from app.services.forecast import apply_regression_deltas, weight_delta
+from app.services.rollups import apply_deltas, meal_delta, workout_delta
+from app.services.versions import version_counters
+from app.services.weight_store import get_weight_store
+
+
+class WriteBehindQueue:
+    """Single creates queued by the handlers and written in batches by one background task
+    
+    A batch is flushed once it holds `write_behind_batch_size` documents or
+    `write_behind_flush_ms` after its first document arrived. The queue is
+    bounded: when the writer falls behind, `enqueue` waits for room, so
+    clients slow down instead of the process growing without limit.
+    """
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+    
+    def start(self) -> None:
+        """Start the writer if WRITE_BEHIND is on; called from the app lifespan"""
+        if settings.write_behind and self._task is None:
+            self._queue = asyncio.Queue(maxsize=settings.write_behind_max_queue)
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the writer"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self._queue = None
+    
+    async def enqueue(self, document: Document) -> None:
+        """Assign the id up front so the response can carry it, then wait for room in the queue"""
+        if document.id is None:
+            document.id = PydanticObjectId()
+        await self._queue.put(document)
+        write_behind_depth.set(self._queue.qsize())
+    
+    async def _next_batch(self) -> List[Document]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + settings.write_behind_flush_ms / 1000
+        while len(batch) < settings.write_behind_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                write_behind_depth.set(self._queue.qsize())
+    
+    async def _flush(self, batch: List[Document]) -> None:
+        by_model: Dict[Type[Document], List[Document]] = defaultdict(list)
+        for document in batch:
+            by_model[type(document)].append(document)
+        
+        for document_model, documents in by_model.items():
+            collection = document_model.get_settings().name
+            insert_many = get_weight_store().insert_many if document_model is Weight else None
+            try:
+                inserted, errors = await insert_chunked(
+                    document_model, documents, list(range(len(documents))), insert_many
+                )
+            except Exception as exc:
+                # Already acknowledged to the client; nothing to do but report the loss
+                write_behind_documents.inc(len(documents), collection=collection, outcome="failed")
+                print(f"Write-behind flush of {len(documents)} {collection} failed: {exc!r}")
+                continue
+            write_behind_documents.inc(len(inserted), collection=collection, outcome="written")
+            if errors:
+                write_behind_documents.inc(len(errors), collection=collection, outcome="failed")
+                print(f"Write-behind flush rejected {len(errors)} {collection}: {errors[0]['errors'][0]['msg']}")
+            if inserted:
+                try:
+                    await _after_insert(document_model, inserted)
+                except Exception as exc:
+                    print(f"Write-behind rollup update for {collection} failed (run rebuild-rollups): {exc!r}")
+
+
+async def _after_insert(document_model: Type[Document], documents: List[Document]) -> None:
+    if document_model is Meal:
+        await apply_deltas(meal_delta(meal) for meal in documents)
+    elif document_model is Workout:
+        await apply_deltas(workout_delta(workout) for workout in documents)
+    elif document_model is Weight:
+        await apply_regression_deltas(weight_delta(weight) for weight in documents)
+        read_cache.invalidate(*{user_tag(weight.user_id, "weights") for weight in documents})
+    for user_id in {document.user_id for document in documents}:
+        await version_counters.bump(user_id, document_model.get_settings().name)
+    autocomplete_index.observe(documents)
+    for document in documents:
+        event_hub.publish(document.user_id, document)
+
+
+write_queue = WriteBehindQueue()
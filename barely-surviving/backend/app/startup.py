@@ -0,0 +1,32 @@
+import time
+from typing import Dict
+
+from app import IMPORT_STARTED
+from app.metrics import startup_seconds
+
+
+class StartupReport:
+    """Seconds spent in each phase from importing the app to serving, logged once and kept on /metrics"""
+    
+    def __init__(self, started: float):
+        self.started = started
+        self._last = started
+        self.phases: Dict[str, float] = {}
+    
+    def mark(self, phase: str) -> None:
+        """Close `phase` at the current time"""
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+        startup_seconds.set(round(self.phases[phase], 4), phase=phase)
+    
+    def ready(self) -> float:
+        """Record the total time to ready and log the breakdown"""
+        total = time.perf_counter() - self.started
+        startup_seconds.set(round(total, 4), phase="total")
+        breakdown = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in self.phases.items())
+        print(f"Ready in {total:.3f}s ({breakdown})")
+        return total
+
+
+startup_report = StartupReport(IMPORT_STARTED)
@@ -0,0 +1,40 @@
+"""Compare two endpoint benchmark reports
+
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 10]
+
+Exits non-zero when any endpoint's p95 latency regressed by more than the
+threshold (percent).
+"""
+import argparse
+import json
+
+
+def main(args: argparse.Namespace) -> None:
+    with open(args.baseline) as baseline_file, open(args.candidate) as candidate_file:
+        baseline = json.load(baseline_file)
+        candidate = json.load(candidate_file)
+    
+    print(f"baseline  {baseline.get('commit')}  ({baseline.get('target')})")
+    print(f"candidate {candidate.get('commit')}  ({candidate.get('target')})")
+    regressions = []
+    for name, new in candidate["endpoints"].items():
+        old = baseline["endpoints"].get(name)
+        if old is None:
+            print(f"{name:34} new endpoint")
+            continue
+        change = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        throughput = (new["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] * 100 if old["throughput_rps"] else 0.0
+        print(f"{name:34} p95 {old['p95_ms']:>8.2f} -> {new['p95_ms']:>8.2f} ms ({change:+6.1f}%)  throughput {throughput:+6.1f}%")
+        if change > args.threshold:
+            regressions.append(name)
+    
+    if regressions:
+        raise SystemExit(f"p95 regressed by more than {args.threshold}%: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    main(parser.parse_args())
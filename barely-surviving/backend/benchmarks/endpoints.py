@@ -0,0 +1,335 @@
+"""Endpoint benchmark suite
+
+Seeds a realistic multi-year history into a scratch database, then drives every
+GET route plus the create routes through the ASGI app with a concurrent load
+generator and writes throughput and p50/p95/p99 latency per endpoint to JSON.
+    
+    # Against a local mongod
+    python -m benchmarks.endpoints --target mongod --uri mongodb://localhost:27017
+    
+    # Against the in-memory stand-in (pip install -r benchmarks/requirements.txt)
+    python -m benchmarks.endpoints --target memory
+
+Compare two result files with `python -m benchmarks.compare old.json new.json`.
+Requests are sent as the default user; `--users N` seeds N - 1 other users with
+the same history alongside it, so runs with different N show whether per-user
+latency stays flat as the user count grows.
+Numbers from the in-memory target measure the API layer only; use mongod for
+anything that depends on indexes or aggregation performance.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from datetime import datetime, date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from beanie import PydanticObjectId
+from fastapi.routing import APIRoute
+
+from app import database
+from app.config import settings
+from app.main import app
+from app.models.workout import Workout
+from app.models.meal import Meal
+from app.models.weight import Weight
+from app.models.weight_bucket import WeightBucket
+from app.models.goal import Goal
+from app.models.rollup import DailyRollup
+from app.models.version import CollectionVersion
+from app.models.regression import WeightRegression
+from app.services.forecast import apply_regression_deltas, weight_delta
+from app.services.rollups import apply_deltas, meal_delta, workout_delta
+from app.services.weight_store import get_weight_store
+
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+WORKOUT_TYPES = ("cardio", "strength", "flexibility", "sports", "other")
+MEAL_NAMES = ("Oatmeal with berries", "Chicken salad", "Salmon and rice", "Greek yogurt", "Protein shake")
+WORKOUT_NAMES = ("Morning Run", "Upper Body", "Yoga Flow", "Pickup Basketball", "Long Walk")
+
+
+class Scenario:
+    """One endpoint under load: a route path plus a function producing request kwargs"""
+    
+    def __init__(self, name: str, method: str, path: str, build: Callable[[random.Random], Dict[str, Any]]):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.build = build
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+async def seed(years: int, rng: random.Random, users: int = 1) -> Dict[str, List[str]]:
+    """Insert `years` of history for the default user plus `users - 1` others; returns the default user's ids"""
+    for model in (Workout, Meal, Weight, WeightBucket, Goal, DailyRollup, CollectionVersion, WeightRegression):
+        await model.find_all().delete()
+    
+    user_id = settings.default_user_id
+    for other in range(1, users):
+        await seed_user(f"bench-user-{other}", years, rng)
+    weights = await seed_user(user_id, years, rng)
+    
+    owned = {"user_id": user_id}
+    return {
+        "workout_ids": [str(doc["_id"]) for doc in await Workout.get_motor_collection().find(owned, {"_id": 1}).limit(500).to_list(None)],
+        "meal_ids": [str(doc["_id"]) for doc in await Meal.get_motor_collection().find(owned, {"_id": 1}).limit(500).to_list(None)],
+        "weight_ids": [str(weight.id) for weight in weights[-500:]],
+    }
+
+
+async def seed_user(user_id: str, years: int, rng: random.Random) -> List[Weight]:
+    """Insert one user's `years` of meals, workouts and weights ending today, plus a goal"""
+    today = date.today()
+    start = today - timedelta(days=365 * years)
+    meals: List[Meal] = []
+    workouts: List[Workout] = []
+    weights: List[Weight] = []
+    current_weight = 210.0
+    
+    day = start
+    while day <= today:
+        midnight = datetime.combine(day, datetime.min.time())
+        for slot, meal_type in enumerate(MEAL_TYPES[:rng.randint(2, 4)]):
+            meals.append(Meal(
+                user_id=user_id,
+                type=meal_type,
+                description=rng.choice(MEAL_NAMES),
+                calories=rng.randint(150, 900),
+                protein=rng.randint(5, 60),
+                carbs=rng.randint(10, 120),
+                fat=rng.randint(2, 45),
+                notes="",
+                date=midnight + timedelta(hours=7 + slot * 4, minutes=rng.randint(0, 59)),
+            ))
+        if rng.random() < 0.7:
+            workouts.append(Workout(
+                user_id=user_id,
+                type=rng.choice(WORKOUT_TYPES),
+                name=rng.choice(WORKOUT_NAMES),
+                duration=rng.randint(15, 90),
+                calories_burned=rng.randint(80, 700),
+                notes="",
+                date=midnight + timedelta(hours=18, minutes=rng.randint(0, 59)),
+            ))
+        if rng.random() < 0.8:
+            current_weight += rng.uniform(-0.6, 0.5)
+            weights.append(Weight(id=PydanticObjectId(), user_id=user_id, weight=round(current_weight, 1), date=day))
+        day += timedelta(days=1)
+    
+    store = get_weight_store()
+    for insert_many, documents in ((Meal.insert_many, meals), (Workout.insert_many, workouts), (store.insert_many, weights)):
+        for offset in range(0, len(documents), 5000):
+            await insert_many(documents[offset:offset + 5000])
+    
+    await apply_deltas([meal_delta(meal) for meal in meals] + [workout_delta(workout) for workout in workouts])
+    await apply_regression_deltas(weight_delta(weight) for weight in weights)
+    await Goal(user_id=user_id, start_weight=210.0, target_weight=175.0, target_date=today + timedelta(days=180), daily_calorie_goal=2000, weekly_workouts=4).insert()
+    
+    print(f"Seeded {user_id}: {len(meals)} meals, {len(workouts)} workouts, {len(weights)} weights over {years} year(s)")
+    return weights
+
+
+def build_scenarios(ids: Dict[str, List[str]], years: int) -> List[Scenario]:
+    prefix = settings.api_v1_prefix
+    today = date.today()
+    
+    def random_day(rng: random.Random) -> str:
+        return (today - timedelta(days=rng.randint(0, 365 * years))).isoformat()
+    
+    def range_params(rng: random.Random) -> Dict[str, Any]:
+        end = today - timedelta(days=rng.randint(0, 365 * years))
+        return {"start_date": (end - timedelta(days=30)).isoformat(), "end_date": end.isoformat()}
+    
+    return [
+        Scenario("list workouts", "GET", f"{prefix}/workouts", lambda rng: {"params": {"limit": 100}}),
+        Scenario("list workouts by type and range", "GET", f"{prefix}/workouts", lambda rng: {
+            "params": {"workout_type": rng.choice(WORKOUT_TYPES), **range_params(rng)}
+        }),
+        Scenario("get workout", "GET", f"{prefix}/workouts/{{workout_id}}", lambda rng: {
+            "path": {"workout_id": rng.choice(ids["workout_ids"])}
+        }),
+        Scenario("create workout", "POST", f"{prefix}/workouts", lambda rng: {"json": {
+            "type": rng.choice(WORKOUT_TYPES), "name": rng.choice(WORKOUT_NAMES),
+            "duration": rng.randint(15, 90), "calories_burned": rng.randint(80, 700),
+        }}),
+        Scenario("list meals", "GET", f"{prefix}/meals", lambda rng: {"params": {"limit": 500}}),
+        Scenario("list meals by type", "GET", f"{prefix}/meals", lambda rng: {
+            "params": {"meal_type": rng.choice(MEAL_TYPES), "limit": 100}
+        }),
+        Scenario("get meal", "GET", f"{prefix}/meals/{{meal_id}}", lambda rng: {
+            "path": {"meal_id": rng.choice(ids["meal_ids"])}
+        }),
+        Scenario("daily summary", "GET", f"{prefix}/meals/daily-summary", lambda rng: {
+            "params": {"target_date": random_day(rng)}
+        }),
+        Scenario("create meal", "POST", f"{prefix}/meals", lambda rng: {"json": {
+            "type": rng.choice(MEAL_TYPES), "description": rng.choice(MEAL_NAMES),
+            "calories": rng.randint(150, 900), "protein": rng.randint(5, 60),
+        }}),
+        Scenario("list weights", "GET", f"{prefix}/weight", lambda rng: {"params": {"limit": 100}}),
+        Scenario("get weight", "GET", f"{prefix}/weight/{{weight_id}}", lambda rng: {
+            "path": {"weight_id": rng.choice(ids["weight_ids"])}
+        }),
+        Scenario("weight trend 90d", "GET", f"{prefix}/weight/trend", lambda rng: {"params": {"days": 90}}),
+        Scenario("weight trend 1y", "GET", f"{prefix}/weight/trend", lambda rng: {"params": {"days": 365}}),
+        Scenario("weight trend all", "GET", f"{prefix}/weight/trend", lambda rng: {"params": {"days": 365 * years}}),
+        Scenario("create weight", "POST", f"{prefix}/weight", lambda rng: {"json": {"weight": round(rng.uniform(170, 200), 1)}}),
+        Scenario("get goals", "GET", f"{prefix}/goals", lambda rng: {}),
+        Scenario("goal progress", "GET", f"{prefix}/goals/progress", lambda rng: {}),
+        Scenario("dashboard stats", "GET", f"{prefix}/dashboard/stats", lambda rng: {}),
+        Scenario("dashboard stats (past day)", "GET", f"{prefix}/dashboard/stats", lambda rng: {
+            "params": {"target_date": random_day(rng)}
+        }),
+        Scenario("dashboard streak", "GET", f"{prefix}/dashboard/streak", lambda rng: {}),
+        Scenario("recent activity", "GET", f"{prefix}/dashboard/recent-activity", lambda rng: {"params": {"limit": 20}}),
+        Scenario("autocomplete", "GET", f"{prefix}/autocomplete", lambda rng: {
+            "params": {"q": rng.choice(MEAL_NAMES + WORKOUT_NAMES)[:3]}
+        }),
+        Scenario("export weight csv", "GET", f"{prefix}/export", lambda rng: {
+            "params": {"format": "csv", "collections": "weight"}
+        }),
+        Scenario("health", "GET", "/health", lambda rng: {}),
+        Scenario("ready", "GET", "/ready", lambda rng: {}),
+        Scenario("api health", "GET", f"{prefix}/health", lambda rng: {}),
+        Scenario("cache stats", "GET", f"{prefix}/cache/stats", lambda rng: {}),
+        Scenario("metrics", "GET", "/metrics", lambda rng: {}),
+    ]
+
+
+def uncovered_routes(scenarios: List[Scenario]) -> List[str]:
+    """GET routes of the app that no scenario exercises"""
+    covered = {(scenario.method, scenario.path) for scenario in scenarios}
+    missing = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+        if ("GET", route.path) not in covered and not route.path.startswith(("/docs", "/openapi", "/redoc")):
+            missing.append(route.path)
+    return missing
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    rng: random.Random,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    queue = list(range(requests))
+    
+    async def worker() -> None:
+        while queue:
+            queue.pop()
+            kwargs = scenario.build(rng)
+            path = scenario.path.format(**kwargs.pop("path", {}))
+            started = time.perf_counter()
+            response = await client.request(scenario.method, path, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "method": scenario.method,
+        "path": scenario.path,
+        "requests": requests,
+        "errors": errors,
+        "status_codes": statuses,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_target(args: argparse.Namespace) -> None:
+    """Point the app's connection settings at the benchmark database"""
+    settings.mongodb_db_name = args.db
+    if args.target == "mongod":
+        settings.mongodb_uri = args.uri
+        return
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("--target memory needs mongomock-motor: pip install -r benchmarks/requirements.txt")
+    database.AsyncIOMotorClient = AsyncMongoMockClient
+
+
+async def main(args: argparse.Namespace) -> None:
+    use_target(args)
+    rng = random.Random(args.seed)
+    
+    async with app.router.lifespan_context(app):
+        ids = await seed(args.years, rng, args.users)
+        scenarios = build_scenarios(ids, args.years)
+        if args.only:
+            scenarios = [scenario for scenario in scenarios if args.only in scenario.name]
+        
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in scenarios:
+                results[scenario.name] = await run_scenario(client, scenario, args.requests, args.concurrency, rng)
+                result = results[scenario.name]
+                print(
+                    f"{scenario.name:34} {result['throughput_rps']:>9.1f} req/s  "
+                    f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  "
+                    f"p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}"
+                )
+        
+        if args.target == "mongod":
+            await database.db.client.drop_database(args.db)
+    
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "target": args.target,
+        "years": args.years,
+        "users": args.users,
+        "requests_per_endpoint": args.requests,
+        "concurrency": args.concurrency,
+        "uncovered_routes": uncovered_routes(build_scenarios({}, args.years)),
+        "endpoints": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("mongod", "memory"), default="mongod")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="barely_surviving_bench")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--users", type=int, default=1, help="Users seeded with the same history; requests go to one of them")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", default=None, help="Only run scenarios whose name contains this text")
+    parser.add_argument("--output", default="bench_results.json")
+    asyncio.run(main(parser.parse_args()))
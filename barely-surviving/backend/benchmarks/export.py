@@ -0,0 +1,144 @@
+"""Full-history export benchmark
+
+Seeds the same multi-year history as the endpoint suite, then downloads
+GET /export in every format through the ASGI app. Each run reports rows,
+bytes, time to first byte and throughput, then repeats the download under
+tracemalloc to record peak Python heap. Run it with two --years values: peak
+memory should stay flat while bytes and rows grow with the history. The
+in-memory target sorts and materialises whole collections inside the driver
+stand-in, so check memory and time to first byte against mongod.
+    
+    python -m benchmarks.export --target mongod --uri mongodb://localhost:27017 --years 1 10
+    python -m benchmarks.export --target memory --years 1 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict
+from urllib.parse import urlencode
+
+from app import database
+from app.config import settings
+from app.main import app
+from app.services.export import EXPORT_COLLECTIONS, EXPORT_WRITERS
+from benchmarks.endpoints import git_commit, seed, use_target
+
+
+async def download(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Drive the ASGI app directly: httpx's ASGITransport buffers whole bodies, which hides streaming"""
+    started = time.perf_counter()
+    state = {"status": None, "first_byte": None, "bytes": 0, "chunks": 0}
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"{settings.api_v1_prefix}/export",
+        "raw_path": f"{settings.api_v1_prefix}/export".encode(),
+        "query_string": urlencode(params).encode(),
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    
+    request_sent = False
+    finished = asyncio.Event()
+    
+    async def receive() -> Dict[str, Any]:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if state["first_byte"] is None:
+                state["first_byte"] = time.perf_counter() - started
+            state["bytes"] += len(message["body"])
+            state["chunks"] += 1
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            finished.set()
+    
+    await app(scope, receive, send)
+    if state["status"] != 200:
+        raise SystemExit(f"GET /export {params} returned {state['status']}")
+    return {
+        "seconds": time.perf_counter() - started,
+        "ttfb_ms": (state["first_byte"] or 0.0) * 1000,
+        "bytes": state["bytes"],
+        "chunks": state["chunks"],
+    }
+
+
+async def measure(params: Dict[str, Any], rows: int) -> Dict[str, Any]:
+    timed = await download(params)
+    
+    tracemalloc.start()
+    await download(params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        "rows": rows,
+        "bytes": timed["bytes"],
+        "chunks": timed["chunks"],
+        "seconds": round(timed["seconds"], 3),
+        "ttfb_ms": round(timed["ttfb_ms"], 2),
+        "rows_per_second": round(rows / timed["seconds"], 1),
+        "peak_heap_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    use_target(args)
+    results = {}
+    
+    async with app.router.lifespan_context(app):
+        for years in args.years:
+            await seed(years, random.Random(args.seed))
+            rows = 0
+            for document_model in EXPORT_COLLECTIONS.values():
+                rows += await document_model.find({"user_id": settings.default_user_id}).count()
+            for format in EXPORT_WRITERS:
+                for gzip in (False, True):
+                    name = f"{years}y {format}{' gzip' if gzip else ''}"
+                    result = await measure({"format": format, "gzip": str(gzip).lower()}, rows)
+                    results[name] = result
+                    print(
+                        f"{name:22} {result['rows']:>8} rows {result['bytes'] / 2 ** 20:>8.2f} MB  "
+                        f"ttfb {result['ttfb_ms']:>7.2f} ms  {result['rows_per_second']:>10.1f} rows/s  "
+                        f"peak heap {result['peak_heap_mb']:>6.2f} MB"
+                    )
+        
+        if args.target == "mongod":
+            await database.db.client.drop_database(args.db)
+    
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "target": args.target,
+        "exports": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("mongod", "memory"), default="mongod")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="barely_surviving_bench")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 10], help="History sizes to compare")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results_export.json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,103 @@
+"""Before/after benchmark for the hydration-free list path
+
+Seeds a scratch database with workouts, then times one 500-item page served
+(a) the old way: Beanie documents validated and re-serialised through the
+route's response_model, and (b) the fast path: projected raw Motor documents
+rendered with orjson. Both bodies are compared before timing starts.
+    
+    python -m benchmarks.list_fast_path --uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from beanie import init_beanie
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.database import DOCUMENT_MODELS
+from app.models.workout import Workout
+from app.routes.workouts import router as workouts_router
+from app.services.listing import list_page
+from app.services.pagination import KEYSET_SORT
+
+
+def _list_route_field():
+    for route in workouts_router.routes:
+        if route.name == "list_workouts":
+            return route.response_field
+    raise RuntimeError("list_workouts route not found")
+
+
+async def _seed(count: int) -> None:
+    await Workout.find_all().delete()
+    start = datetime.utcnow()
+    await Workout.insert_many([
+        Workout(
+            user_id=settings.default_user_id,
+            type=("cardio", "strength", "flexibility")[i % 3],
+            name=f"Session {i}",
+            duration=20 + i % 60,
+            calories_burned=100 + i % 400,
+            notes="Felt great, kept the pace steady through the second half",
+            date=start - timedelta(hours=i),
+        )
+        for i in range(count)
+    ])
+
+
+async def _before(field, limit: int) -> bytes:
+    docs = await Workout.find({"user_id": settings.default_user_id}).sort(KEYSET_SORT).limit(limit).to_list()
+    content = await serialize_response(field=field, response_content=docs)
+    return JSONResponse(content).body
+
+
+async def _after(limit: int) -> bytes:
+    return (await list_page(Workout, {"user_id": settings.default_user_id}, limit, None)).body
+
+
+async def _time(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = AsyncIOMotorClient(args.uri)
+    await init_beanie(database=client[args.db], document_models=DOCUMENT_MODELS)
+    await _seed(args.documents)
+    field = _list_route_field()
+    
+    if json.loads(await _before(field, args.limit)) != json.loads(await _after(args.limit)):
+        raise SystemExit("Fast path output differs from the response_model output")
+    
+    results = {}
+    for name, fn in (("before", lambda: _before(field, args.limit)), ("after", lambda: _after(args.limit))):
+        samples = await _time(fn, args.repeat)
+        results[name] = {
+            "median_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(sorted(samples)[int(len(samples) * 0.95) - 1], 3),
+        }
+    results["speedup"] = round(results["before"]["median_ms"] / results["after"]["median_ms"], 2)
+    print(json.dumps(results, indent=2))
+    
+    await client.drop_database(args.db)
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="barely_surviving_bench")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
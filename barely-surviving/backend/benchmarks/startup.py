@@ -0,0 +1,127 @@
+"""Import-time and time-to-ready report for app.main:app
+    
+    # Import cost only (no database needed)
+    python -m benchmarks.startup --imports-only
+    
+    # Also start uvicorn and poll /ready, once per INDEX_SYNC mode
+    python -m benchmarks.startup --uri mongodb://localhost:27017 --index-sync startup background skip
+
+Import time is taken from `python -X importtime` in fresh interpreters and
+grouped by top-level package. Modules meant to load lazily are checked too:
+the run exits non-zero if importing the app pulls one of them in. Time to
+ready is measured from spawning uvicorn until /ready answers 200, next to the
+app's own "Ready in" breakdown.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Only needed by routes that use them; importing the app must not load these
+LAZY_MODULES = ("numpy", "pyarrow", "anthropic")
+
+
+def import_report(runs: int) -> Dict[str, Any]:
+    totals: List[float] = []
+    per_package: Dict[str, List[float]] = defaultdict(list)
+    loaded = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            capture_output=True, text=True, check=True,
+        )
+        self_times: Dict[str, float] = defaultdict(float)
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            module = name.strip()
+            package = module.split(".")[0]
+            self_times[package] += int(self_us) / 1000
+            loaded.add(package)
+            if module == "app.main":
+                totals.append(int(cumulative_us) / 1000)
+        for package, milliseconds in self_times.items():
+            per_package[package].append(milliseconds)
+    
+    packages = sorted(
+        ((package, statistics.median(times)) for package, times in per_package.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return {
+        "import_ms": round(statistics.median(totals), 1),
+        "packages_ms": {package: round(milliseconds, 1) for package, milliseconds in packages[:15]},
+        "eager_lazy_modules": [module for module in LAZY_MODULES if module in loaded],
+    }
+
+
+def ready_report(uri: str, index_sync: str, port: int, timeout: float) -> Dict[str, Any]:
+    env = {**os.environ, "MONGODB_URI": uri, "INDEX_SYNC": index_sync, "PYTHONUNBUFFERED": "1"}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    ready_s: Optional[float] = None
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - started < timeout and server.poll() is None:
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/ready").status_code == 200:
+                        ready_s = time.perf_counter() - started
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        output, _ = server.communicate(timeout=30)
+    
+    breakdown = next((line for line in output.splitlines() if line.startswith("Ready in")), None)
+    return {
+        "index_sync": index_sync,
+        "time_to_ready_s": None if ready_s is None else round(ready_s, 3),
+        "app_report": breakdown,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    results: Dict[str, Any] = {"imports": import_report(args.runs)}
+    imports = results["imports"]
+    print(f"import app.main: {imports['import_ms']} ms (median of {args.runs})")
+    for package, milliseconds in imports["packages_ms"].items():
+        print(f"  {package:<24} {milliseconds:>8.1f} ms")
+    
+    if not args.imports_only:
+        results["ready"] = []
+        for index_sync in args.index_sync:
+            report = ready_report(args.uri, index_sync, args.port, args.timeout)
+            results["ready"].append(report)
+            print(f"INDEX_SYNC={index_sync}: ready after {report['time_to_ready_s']} s; {report['app_report']}")
+    
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Wrote {args.output}")
+    
+    if imports["eager_lazy_modules"]:
+        raise SystemExit(f"Importing the app loaded {', '.join(imports['eager_lazy_modules'])}; keep them lazy")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time the import in")
+    parser.add_argument("--imports-only", action="store_true", help="Skip starting the server")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--index-sync", nargs="+", default=["startup"], choices=["startup", "background", "skip"])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for /ready")
+    parser.add_argument("--output", default="bench_results_startup.json")
+    main(parser.parse_args())
@@ -0,0 +1,21 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database
+from app.config import settings
+from app.main import app
+
+mongomock_motor = pytest.importorskip(
+    "mongomock_motor", reason="the tests run against mongomock-motor: pip install -r tests/requirements.txt"
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app against a fresh in-memory database, the same stand-in as `benchmarks.endpoints --target memory`"""
+    monkeypatch.setattr(database, "AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient)
+    monkeypatch.setattr(settings, "mongodb_db_name", f"test_{uuid.uuid4().hex}")
+    with TestClient(app, headers={settings.user_id_header: f"user-{uuid.uuid4().hex}"}) as test_client:
+        yield test_client
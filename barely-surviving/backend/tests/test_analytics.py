@@ -0,0 +1,57 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.services import analytics
+from app.services.analytics import period_starts
+
+API = "/api/v1"
+
+
+def test_period_starts_align_to_mondays_and_month_starts():
+    assert period_starts(date(2026, 10, 18), "week", 3) == [date(2026, 9, 28), date(2026, 10, 5), date(2026, 10, 12)]
+    assert period_starts(date(2026, 2, 15), "month", 3) == [date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1)]
+
+
+class CannedAggregate:
+    """Stands in for the meals collection: mongomock has no $dateTrunc"""
+    
+    def __init__(self, facet):
+        self.facet = facet
+        self.pipelines = []
+    
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return SimpleNamespace(to_list=self.to_list)
+    
+    async def to_list(self, length):
+        return [self.facet]
+
+
+def test_facets_become_periods_checked_against_the_weekly_goal(client, monkeypatch):
+    client.post(f"{API}/goals", json={"start_weight": 200, "target_weight": 190, "weekly_workouts": 3, "active_days_per_week": 4})
+    october = datetime(2026, 10, 1)
+    collection = CannedAggregate({
+        "totals": [{"_id": october, "calories_in": 60000, "calories_out": 4000, "protein": 3000, "carbs": 6000, "fat": 2000, "meal_count": 90, "workout_count": 12}],
+        "workout_minutes": [
+            {"_id": {"period": october, "type": "running"}, "minutes": 300},
+            {"_id": {"period": october, "type": "strength"}, "minutes": 240},
+        ],
+        "days": [{"_id": october, "active_days": 20, "workout_days": 12}],
+    })
+    monkeypatch.setattr(analytics, "Meal", SimpleNamespace(get_motor_collection=lambda: collection))
+    
+    body = client.get(f"{API}/analytics", params={"period": "month", "range": 2, "end_date": "2026-10-18"}).json()
+    assert (body["start_date"], body["end_date"]) == ("2026-09-01", "2026-10-31")
+    assert body["goal"] == {"weekly_workouts": 3, "active_days_per_week": 4}
+    
+    september, current = body["periods"]
+    assert (september["meal_count"], september["workouts_met"]) == (0, False)
+    assert current["net_calories"] == 56000
+    assert current["workout_minutes"] == 540
+    assert current["workout_minutes_by_type"] == {"running": 300, "strength": 240}
+    # A 31-day month scales the weekly targets by 31/7
+    assert (current["target_workouts"], current["workouts_met"]) == (13, False)
+    assert (current["target_active_days"], current["active_days_met"]) == (18, True)
+    
+    match = collection.pipelines[0][0]["$match"]
+    assert match["date"] == {"$gte": datetime(2026, 9, 1), "$lt": datetime(2026, 11, 1)}
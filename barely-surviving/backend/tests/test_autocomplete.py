@@ -0,0 +1,30 @@
+API = "/api/v1"
+
+
+def test_offset_dates_mix_with_stored_ones(client):
+    """Dates sent with an offset are stored as naive UTC, so they rank against dates read back from MongoDB"""
+    first = client.post(f"{API}/meals", json={"type": "lunch", "description": "Chicken salad", "calories": 450})
+    assert first.status_code == 201
+    assert client.get(f"{API}/autocomplete", params={"q": "chi"}).status_code == 200
+    
+    again = client.post(
+        f"{API}/meals",
+        json={"type": "lunch", "description": "chicken salad", "calories": 500, "date": "2026-02-09T12:30:00+02:00"},
+    )
+    assert again.status_code == 201
+    assert again.json()["date"] == "2026-02-09T10:30:00"
+    
+    client.post(f"{API}/meals", json={"type": "snack", "description": "Chia pudding", "calories": 300, "date": "2026-02-09T12:30:00Z"})
+    client.post(f"{API}/meals", json={"type": "snack", "description": "Chia pudding", "calories": 300})
+    suggestions = client.get(f"{API}/autocomplete", params={"q": "chi"})
+    assert suggestions.status_code == 200
+    assert [(item["text"], item["count"]) for item in suggestions.json()["suggestions"]] == [("Chia pudding", 2), ("Chicken salad", 2)]
+
+
+def test_suggestions_load_on_demand_for_the_caller_only(client):
+    client.post(f"{API}/meals", json={"type": "dinner", "description": "Chili", "calories": 500})
+    client.post(f"{API}/meals", json={"type": "lunch", "description": "Chili", "calories": 500}, headers={"X-User-Id": "someone-else"})
+    client.post(f"{API}/workouts", json={"type": "strength", "name": "Chin-ups", "duration": 20}, headers={"X-User-Id": "someone-else"})
+    
+    suggestions = client.get(f"{API}/autocomplete", params={"q": "chi"}).json()["suggestions"]
+    assert [(item["kind"], item["text"], item["count"]) for item in suggestions] == [("meal", "Chili", 1)]
@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import json
+
+import pytest
+
+from app import database
+from app.config import settings
+from benchmarks import compare, endpoints
+
+
+def test_get_routes_without_a_scenario_are_reported():
+    scenarios = endpoints.build_scenarios({}, years=1)
+    assert "/api/v1/goals" not in endpoints.uncovered_routes(scenarios)
+    
+    without_goals = [scenario for scenario in scenarios if scenario.name != "get goals"]
+    assert "/api/v1/goals" in endpoints.uncovered_routes(without_goals)
+
+
+def test_memory_run_writes_a_report(tmp_path, monkeypatch):
+    # main() repoints these at the benchmark database; monkeypatch puts them back
+    monkeypatch.setattr(settings, "mongodb_db_name", settings.mongodb_db_name)
+    monkeypatch.setattr(database, "AsyncIOMotorClient", database.AsyncIOMotorClient)
+    output = tmp_path / "bench.json"
+    args = argparse.Namespace(
+        target="memory",
+        uri=None,
+        db="bench_test",
+        years=1,
+        users=2,
+        requests=4,
+        concurrency=2,
+        seed=1,
+        only="weight",
+        output=str(output),
+    )
+    asyncio.run(endpoints.main(args))
+    
+    report = json.loads(output.read_text())
+    assert report["target"] == "memory" and report["users"] == 2
+    assert report["endpoints"]
+    for result in report["endpoints"].values():
+        assert result["requests"] == 4 and result["errors"] == 0
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+
+
+def test_compare_fails_on_a_p95_regression(tmp_path):
+    def report(name, p95):
+        path = tmp_path / name
+        path.write_text(json.dumps({"endpoints": {"list meals": {"p95_ms": p95, "throughput_rps": 100.0}}}))
+        return str(path)
+    
+    baseline = report("old.json", 10.0)
+    compare.main(argparse.Namespace(baseline=baseline, candidate=report("same.json", 10.5), threshold=10.0))
+    with pytest.raises(SystemExit, match="list meals"):
+        compare.main(argparse.Namespace(baseline=baseline, candidate=report("slow.json", 12.0), threshold=10.0))
@@ -0,0 +1,41 @@
+from pymongo.errors import AutoReconnect
+
+from app.config import settings
+from app.models.meal import Meal
+
+API = "/api/v1"
+
+
+def test_lost_connection_keeps_the_chunks_already_written(client, monkeypatch):
+    monkeypatch.setattr(settings, "bulk_chunk_size", 2)
+    insert_many = Meal.insert_many
+    calls = []
+    
+    async def drops_after_first_chunk(documents, **kwargs):
+        calls.append(len(documents))
+        if len(calls) > 1:
+            raise AutoReconnect("connection reset")
+        return await insert_many(documents, **kwargs)
+    
+    monkeypatch.setattr(Meal, "insert_many", drops_after_first_chunk)
+    items = [{"type": "snack", "description": f"Apple {n}", "calories": 100, "date": "2026-10-01T10:00:00"} for n in range(5)]
+    report = client.post(f"{API}/meals/bulk", json=items).json()
+    
+    assert calls == [2, 2]
+    assert (report["inserted"], report["failed"]) == (2, 3)
+    assert [error["index"] for error in report["errors"]] == [2, 3, 4]
+    summary = client.get(f"{API}/meals/daily-summary", params={"target_date": "2026-10-01"}).json()
+    assert (summary["meal_count"], summary["total_calories"]) == (2, 200)
+
+
+def test_invalid_items_are_reported_by_position(client):
+    items = [
+        {"type": "snack", "description": "Apple", "calories": 95},
+        {"type": "snack", "description": "No calories"},
+        {"type": "snack", "description": "Banana", "calories": 105},
+    ]
+    report = client.post(f"{API}/meals/bulk", json=items).json()
+    
+    assert (report["received"], report["inserted"], report["failed"]) == (3, 2, 1)
+    assert report["errors"][0]["index"] == 1
+    assert len(client.get(f"{API}/meals").json()) == 2
@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+from beanie import PydanticObjectId
+
+from app.config import settings
+from app.models.meal import Meal
+from app.models.weight_bucket import WeightBucket
+from app.services.events import EventHub, event_hub, event_stream
+
+API = "/api/v1"
+
+
+def test_stream_ends_on_its_own_and_asks_for_a_quick_reconnect(client, monkeypatch):
+    monkeypatch.setattr(settings, "events_max_stream_seconds", 0.2)
+    monkeypatch.setattr(settings, "events_keepalive_seconds", 0.05)
+    
+    with client.stream("GET", f"{API}/dashboard/events") as response:
+        assert response.status_code == 200
+        lines = list(response.iter_lines())
+    
+    assert lines[0] == f"retry: {settings.events_retry_ms}"
+    assert lines[2] == "event: update"
+    opening = json.loads(lines[3].removeprefix("data: "))
+    assert set(opening) == {"stats", "streak", "activity"}
+    assert ": keepalive" in lines
+
+
+def test_bucket_writes_from_the_change_stream_become_weight_activity(client, monkeypatch):
+    monkeypatch.setattr(settings, "weight_storage", "buckets")
+    user_id = client.headers[settings.user_id_header]
+    client.post(f"{API}/weight", json={"weight": 180, "date": "2026-10-01"})
+    second = client.post(f"{API}/weight", json={"weight": 179, "date": "2026-10-02"}).json()
+    
+    async def changes():
+        bucket = await WeightBucket.get_motor_collection().find_one({"user_id": user_id})
+        hub = EventHub()
+        async with hub.subscribe(user_id):
+            pushed = {
+                "operationType": "update",
+                "ns": {"coll": "weight_buckets"},
+                "fullDocument": bucket,
+                "updateDescription": {"updatedFields": {"last_added": bucket["last_added"]}},
+            }
+            removed = {**pushed, "updateDescription": {"updatedFields": {"last_added": []}}}
+            for change in (pushed, removed):
+                hub._on_change(change, {}, "collection_versions")
+            return hub._activity[user_id]
+    
+    activity = client.portal.call(changes)
+    assert [(item["type"], item["id"], item["details"]) for item in activity] == [("weight", second["_id"], "179.0 lbs")]
+
+
+def test_a_burst_of_writes_reaches_every_connection_as_one_update(client):
+    user_id = client.headers[settings.user_id_header]
+    
+    async def fan_out():
+        hub = EventHub()
+        async with hub.subscribe(user_id) as first, hub.subscribe(user_id) as second, hub.subscribe("someone-else") as other:
+            for description in ("Oats", "Chili"):
+                hub.publish(user_id, Meal(id=PydanticObjectId(), user_id=user_id, type="snack", description=description, calories=100))
+            await asyncio.gather(*hub._tasks)
+            return [subscription.queue.qsize() for subscription in (first, second, other)], first.queue.get_nowait()
+    
+    sizes, update = client.portal.call(fan_out)
+    assert sizes == [1, 1, 0]
+    assert [item["title"] for item in update["activity"]] == ["Oats", "Chili"]
+    assert set(update) == {"stats", "streak", "activity"}
+
+
+def test_a_slow_client_drops_the_oldest_update_and_is_told_to_resync(client, monkeypatch):
+    monkeypatch.setattr(settings, "events_buffer_size", 2)
+    user_id = client.headers[settings.user_id_header]
+    
+    async def slow_client():
+        stream = event_stream(user_id)
+        await stream.__anext__()
+        await stream.__anext__()
+        subscription = next(iter(event_hub._subscribers[user_id]))
+        for number in range(3):
+            subscription.push({"number": number})
+        events = [await stream.__anext__() for _ in range(2)]
+        await stream.aclose()
+        return events
+    
+    events = client.portal.call(slow_client)
+    assert [json.loads(event.split(b"data: ")[1]) for event in events] == [{"number": 1, "resync": True}, {"number": 2}]
+    assert user_id not in event_hub._subscribers
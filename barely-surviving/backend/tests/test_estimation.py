@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.services.estimation import macro_cache
+
+API = "/api/v1"
+
+
+class SlowEstimator:
+    name = "slow"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def estimate(self, description):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"calories": 100, "protein": 1, "carbs": 2, "fat": 3}
+
+
+@pytest.fixture
+def estimator(client):
+    slow = SlowEstimator()
+    macro_cache.use(slow)
+    yield slow
+    macro_cache.use(None)
+
+
+def test_concurrent_requests_share_one_estimate(client, estimator):
+    async def burst():
+        return await asyncio.gather(*(macro_cache.estimate("Two  Eggs") for _ in range(20)))
+    
+    results = client.portal.call(burst)
+    assert estimator.calls == 1
+    assert all(result == results[0] for result in results)
+    assert client.post(f"{API}/meals/estimate", json={"description": "two eggs"}).json()["calories"] == 100
+    assert estimator.calls == 1
+
+
+def test_cancelled_leader_does_not_cancel_waiters(client, estimator):
+    async def leader_goes_away():
+        leader = asyncio.create_task(macro_cache.estimate("oatmeal"))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(macro_cache.estimate("oatmeal")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*waiters), leader.cancelled()
+    
+    results, leader_cancelled = client.portal.call(leader_goes_away)
+    assert leader_cancelled
+    assert [result["calories"] for result in results] == [100, 100, 100]
+    assert estimator.calls == 2
@@ -0,0 +1,45 @@
+from app.config import settings
+from app.models.goal import Goal
+from app.models.version import CollectionVersion
+
+API = "/api/v1"
+
+
+def test_unchanged_lists_answer_304_until_a_write(client):
+    first = client.get(f"{API}/meals")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    
+    cached = client.get(f"{API}/meals", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+    
+    # Other queries, other users and other collections don't share or move the tag
+    assert client.get(f"{API}/meals", params={"limit": 5}).headers["etag"] != etag
+    client.post(f"{API}/meals", json={"type": "lunch", "description": "Not mine", "calories": 1}, headers={settings.user_id_header: "someone-else"})
+    client.post(f"{API}/weight", json={"weight": 180, "date": "2026-10-01"})
+    assert client.get(f"{API}/meals", headers={"If-None-Match": etag}).status_code == 304
+    
+    client.post(f"{API}/meals", json={"type": "lunch", "description": "Chili", "calories": 500})
+    changed = client.get(f"{API}/meals", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert [meal["description"] for meal in changed.json()] == ["Chili"]
+
+
+def test_a_write_on_another_replica_drops_the_cached_goal(client):
+    user_id = client.headers[settings.user_id_header]
+    client.post(f"{API}/goals", json={"start_weight": 200, "target_weight": 190})
+    etag = client.get(f"{API}/goals").headers["etag"]
+    
+    async def other_replica():
+        await CollectionVersion.get_motor_collection().update_one(
+            {"user_id": user_id, "collection": "goals"}, {"$inc": {"version": 1}}
+        )
+        await Goal.get_motor_collection().update_one({"user_id": user_id}, {"$set": {"target_weight": 185}})
+    
+    client.portal.call(other_replica)
+    response = client.get(f"{API}/goals", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["target_weight"] == 185
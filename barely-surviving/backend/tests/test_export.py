@@ -0,0 +1,54 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def history(client):
+    client.post(f"{API}/meals", json={"type": "lunch", "description": "Chicken, rice", "calories": 450, "date": "2026-10-01T12:00:00"})
+    client.post(f"{API}/meals", json={"type": "dinner", "description": "Chili", "calories": 500, "date": "2026-10-02T19:00:00"})
+    client.post(f"{API}/weight", json={"weight": 180, "date": "2026-10-01"})
+    client.post(f"{API}/meals", json={"type": "lunch", "description": "Not mine", "calories": 1}, headers={"X-User-Id": "someone-else"})
+    return client
+
+
+def test_csv_export_has_one_header_and_every_collection(history):
+    response = history.get(f"{API}/export", params={"format": "csv", "collections": "meals,weight"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"].endswith('.csv"')
+    
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["collection"], row["description"], row["weight"]) for row in rows] == [
+        ("meals", "Chicken, rice", ""),
+        ("meals", "Chili", ""),
+        ("weight", "", "180.0"),
+    ]
+
+
+def test_gzipped_ndjson_export(history):
+    response = history.get(f"{API}/export", params={"format": "ndjson", "collections": "meals", "gzip": True})
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+    
+    lines = gzip.decompress(response.content).decode().splitlines()
+    assert [json.loads(line)["description"] for line in lines] == ["Chicken, rice", "Chili"]
+
+
+def test_parquet_export_has_typed_columns(history):
+    pq = pytest.importorskip("pyarrow.parquet")
+    response = history.get(f"{API}/export", params={"format": "parquet"})
+    table = pq.read_table(io.BytesIO(response.content))
+    
+    assert table.num_rows == 3
+    assert str(table.schema.field("calories").type) == "int64"
+    assert table.column("collection").to_pylist() == ["meals", "meals", "weight"]
+
+
+def test_unknown_collections_are_rejected(client):
+    assert client.get(f"{API}/export", params={"collections": "meals,passwords"}).status_code == 400
@@ -0,0 +1,32 @@
+from datetime import date, datetime, timedelta
+
+from app.config import settings
+from app.models.regression import WeightRegression
+from app.services.forecast import window_start
+
+API = "/api/v1"
+
+
+def test_forecast_projects_the_fitted_rate(client):
+    today = date.today()
+    client.post(f"{API}/goals", json={"start_weight": 200, "target_weight": 190})
+    for days_ago, weight in ((14, 200), (7, 199), (0, 198)):
+        client.post(f"{API}/weight", json={"weight": weight, "date": (today - timedelta(days=days_ago)).isoformat()})
+    
+    progress = client.get(f"{API}/goals/progress").json()
+    assert progress["weekly_rate"] == -1
+    assert progress["projected_date"] == (today + timedelta(weeks=8)).isoformat()
+
+
+def test_regression_weeks_expire_when_they_leave_the_window(client):
+    oldest = window_start()
+    client.post(f"{API}/weight", json={"weight": 180, "date": oldest.date().isoformat()})
+    client.post(f"{API}/weight", json={"weight": 181, "date": (oldest - timedelta(weeks=1)).date().isoformat()})
+    
+    async def stored_weeks():
+        return await WeightRegression.get_motor_collection().find({}, {"_id": 0, "week": 1, "expires_at": 1}).to_list(None)
+    
+    weeks = client.portal.call(stored_weeks)
+    assert weeks == [{"week": oldest, "expires_at": oldest + timedelta(weeks=settings.forecast_window_weeks)}]
+    assert weeks[0]["expires_at"] > datetime.utcnow()
+    assert weeks[0]["expires_at"] - timedelta(weeks=1) <= datetime.combine(date.today(), datetime.min.time())
@@ -0,0 +1,26 @@
+from app.models.goal import Goal
+
+API = "/api/v1"
+
+
+def test_create_that_loses_the_race_updates_the_winners_goal(client):
+    assert client.post(f"{API}/goals", json={"start_weight": 200, "target_weight": 180}).status_code == 201
+    
+    async def nothing():
+        return None
+    
+    def missed_the_concurrent_insert(*args, **kwargs):
+        # Only the route's existence check misses; the retry and Beanie's own lookups see the goal
+        del Goal.find_one
+        return nothing()
+    
+    Goal.find_one = missed_the_concurrent_insert
+    try:
+        response = client.post(f"{API}/goals", json={"start_weight": 200, "target_weight": 175})
+    finally:
+        if "find_one" in vars(Goal):
+            del Goal.find_one
+    
+    assert response.status_code == 201
+    assert response.json()["target_weight"] == 175
+    assert client.get(f"{API}/goals").json()["target_weight"] == 175
@@ -0,0 +1,50 @@
+import json
+
+API = "/api/v1"
+
+MEALS_CSV = """Date,Meal,Food,Calories,Protein (g)
+2026-10-01T12:30:00Z,Lunch,Chicken salad,450,35
+2026-10-01T19:00:00+02:00,Dinner,Pasta,700,25
+2026-10-02T08:15:30.123456,Breakfast,Oatmeal,300,10
+10/03/2026 13:00,Lunch,Burrito,650,30
+"""
+
+
+def import_csv(client, kind: str, content: str) -> dict:
+    response = client.post(f"{API}/import/{kind}", files={"file": (f"{kind}.csv", content, "text/csv")})
+    assert response.status_code == 200
+    report = json.loads(response.text.strip().splitlines()[-1])
+    assert report["done"]
+    return report
+
+
+def test_reimporting_the_same_file_skips_every_row(client):
+    first = import_csv(client, "meals", MEALS_CSV)
+    assert (first["inserted"], first["duplicates"], first["failed"]) == (4, 0, 0)
+    
+    again = import_csv(client, "meals", MEALS_CSV)
+    assert (again["inserted"], again["duplicates"], again["failed"]) == (0, 4, 0)
+    assert client.get(f"{API}/meals/daily-summary", params={"target_date": "2026-10-01"}).json()["meal_count"] == 2
+
+
+def test_offset_dates_are_stored_as_utc(client):
+    import_csv(client, "meals", MEALS_CSV)
+    
+    dates = {meal["description"]: meal["date"] for meal in client.get(f"{API}/meals").json()}
+    assert dates["Chicken salad"] == "2026-10-01T12:30:00"
+    assert dates["Pasta"] == "2026-10-01T17:00:00"
+    assert dates["Oatmeal"] == "2026-10-02T08:15:30.123000"
+
+
+def test_rows_without_a_date_are_rejected_rather_than_stamped_now(client):
+    content = MEALS_CSV + ",Snack,Apple,95,0\n"
+    first = import_csv(client, "meals", content)
+    assert (first["inserted"], first["failed"]) == (4, 1)
+    
+    again = import_csv(client, "meals", content)
+    assert (again["inserted"], again["duplicates"], again["failed"]) == (0, 4, 1)
+
+
+def test_file_without_a_date_column_is_refused(client):
+    response = client.post(f"{API}/import/meals", files={"file": ("meals.csv", "Food,Calories\nApple,95\n", "text/csv")})
+    assert "CSV has no column for date" in response.text
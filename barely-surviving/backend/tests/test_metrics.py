@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from app.metrics import CONTENT_TYPE, Histogram, MongoCommandListener, Registry, registry
+
+API = "/api/v1"
+
+
+def test_metrics_count_requests_by_route_template(client):
+    created = client.post(f"{API}/weight", json={"weight": 180, "date": "2026-10-01"}).json()
+    client.get(f"{API}/weight/{created['_id']}")
+    client.get(f"{API}/weight/not-an-id")
+    
+    response = client.get("/metrics")
+    assert response.headers["content-type"] == CONTENT_TYPE
+    lines = response.text.splitlines()
+    assert "# TYPE http_requests_total counter" in lines
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    
+    route = f'route="{API}/weight/{{weight_id}}"'
+    counted = [line for line in lines if line.startswith("http_requests_total{") and route in line]
+    assert any('status="200"' in line for line in counted)
+    assert not any(created["_id"] in line for line in lines)
+    assert any(line.startswith(f'http_request_duration_seconds_count{{method="GET",{route}}}') for line in lines)
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, route="/x")
+    
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/x",le="0.1"} 1.0',
+        'latency_seconds_bucket{route="/x",le="1.0"} 2.0',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 3.0',
+        'latency_seconds_count{route="/x"} 3.0',
+        'latency_seconds_sum{route="/x"} 5.55',
+    ]
+
+
+def test_command_listener_labels_getmore_with_its_collection():
+    listener = MongoCommandListener()
+    for command_name, command, reply in (
+        ("find", {"find": "metrics_probe"}, {"cursor": {"firstBatch": [{}, {}]}}),
+        ("getMore", {"getMore": 1, "collection": "metrics_probe"}, {"cursor": {"nextBatch": [{}]}}),
+    ):
+        listener.started(SimpleNamespace(command_name=command_name, command=command, request_id=1, operation_id=1))
+        listener.succeeded(SimpleNamespace(command_name=command_name, reply=reply, request_id=1, operation_id=1, duration_micros=1500))
+    
+    lines = registry.render().splitlines()
+    assert 'mongodb_documents_returned_total{collection="metrics_probe",command="find"} 2' in lines
+    assert 'mongodb_documents_returned_total{collection="metrics_probe",command="getMore"} 1' in lines
+    assert 'mongodb_commands_total{collection="metrics_probe",command="getMore",outcome="success"} 1' in lines
@@ -0,0 +1,34 @@
+import json
+
+API = "/api/v1"
+
+
+def test_cursor_pages_cover_same_timestamp_entries_once(client):
+    run = {"type": "cardio", "duration": 30, "date": "2026-10-01T07:00:00"}
+    for n in range(5):
+        client.post(f"{API}/workouts", json={**run, "name": f"Run {n}"})
+    client.post(f"{API}/workouts", json={**run, "name": "Older run", "date": "2026-09-30T07:00:00"})
+    
+    names, cursor = [], None
+    while True:
+        response = client.get(f"{API}/workouts", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        names += [workout["name"] for workout in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    assert len(names) == len(set(names)) == 6
+    assert names[-1] == "Older run"
+
+
+def test_stream_returns_every_entry_as_ndjson(client):
+    for n in range(3):
+        client.post(f"{API}/meals", json={"type": "snack", "description": f"Apple {n}", "calories": 95})
+    
+    response = client.get(f"{API}/meals", params={"stream": True, "limit": 1})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len([json.loads(line) for line in response.text.splitlines()]) == 3
+
+
+def test_garbled_cursor_is_a_400(client):
+    assert client.get(f"{API}/meals", params={"cursor": "not-a-cursor"}).status_code == 400
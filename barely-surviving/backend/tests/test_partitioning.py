@@ -0,0 +1,35 @@
+from app.models.goal import Goal
+from app.models.meal import Meal
+from app.services.partitioning import drop_legacy_indexes, shard_filter
+
+API = "/api/v1"
+
+
+def test_entries_are_sharded_on_user_and_date(client):
+    meal = Meal(user_id="someone", type="lunch", description="Soup", calories=200)
+    assert shard_filter(meal) == {"_id": meal.id, "user_id": "someone", "date": meal.date}
+    goal = Goal(user_id="someone", start_weight=200, target_weight=180)
+    assert shard_filter(goal) == {"_id": goal.id, "user_id": "someone"}
+
+
+def test_update_moving_a_meal_to_another_day(client):
+    created = client.post(f"{API}/meals", json={"type": "lunch", "description": "Soup", "calories": 200, "date": "2026-05-01T12:00:00"}).json()
+    
+    updated = client.put(f"{API}/meals/{created['_id']}", json={"date": "2026-05-02T12:00:00"})
+    assert updated.status_code == 200
+    assert updated.json()["date"] == "2026-05-02T12:00:00"
+    assert client.get(f"{API}/meals/{created['_id']}").json()["date"] == "2026-05-02T12:00:00"
+    summaries = [client.get(f"{API}/meals/daily-summary", params={"target_date": day}).json() for day in ("2026-05-01", "2026-05-02")]
+    assert [summary["meal_count"] for summary in summaries] == [0, 1]
+
+
+def test_descending_entry_index_is_dropped_once_replaced(client):
+    collection = Meal.get_motor_collection()
+    
+    async def add_old_index():
+        await collection.create_index([("user_id", 1), ("date", -1), ("_id", -1)])
+        return set(await collection.index_information())
+    
+    assert "user_id_1_date_-1__id_-1" in client.portal.call(add_old_index)
+    assert "meals.user_id_1_date_-1__id_-1" in client.portal.call(drop_legacy_indexes)
+    assert "user_id_1_date_1__id_1" in client.portal.call(collection.index_information)
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from app.services.autocomplete import PrefixIndex
+
+API = "/api/v1"
+
+
+def test_prefix_matches_the_start_of_any_word_ranked_by_use():
+    index = PrefixIndex()
+    index.add("meal", "Chicken  salad", datetime(2026, 10, 1), {"calories": 450})
+    index.add("meal", "Egg salad", datetime(2026, 10, 2), {"calories": 300}, count=3)
+    index.add("meal", "chicken SALAD", datetime(2026, 10, 3), {"calories": 500})
+    index.add("workout", "Salsa dancing", datetime(2026, 10, 4), {"duration": 45})
+    index.add("meal", "Saltines", datetime(2026, 9, 1), {"calories": 120}, count=2)
+    
+    found = index.search("SAL", None, 10)
+    assert [(item.text, item.count) for item in found] == [
+        ("Egg salad", 3), ("chicken SALAD", 2), ("Saltines", 2), ("Salsa dancing", 1),
+    ]
+    assert found[1].values == {"calories": 500}
+    assert [item.text for item in index.search("sal", "workout", 10)] == ["Salsa dancing"]
+    assert [item.text for item in index.search("sal", None, 2)] == ["Egg salad", "chicken SALAD"]
+    assert [item.text for item in index.search("chicken s", None, 10)] == ["chicken SALAD"]
+    assert index.search("ken", None, 10) == []
+
+
+def test_edits_and_new_entries_reach_a_loaded_index(client):
+    meal = client.post(f"{API}/meals", json={"type": "lunch", "description": "Chili", "calories": 500}).json()
+    assert [item["text"] for item in client.get(f"{API}/autocomplete", params={"q": "ch"}).json()["suggestions"]] == ["Chili"]
+    
+    client.post(f"{API}/workouts", json={"type": "strength", "name": "Chin-ups", "duration": 20})
+    client.put(f"{API}/meals/{meal['_id']}", json={"description": "Chowder"})
+    suggestions = client.get(f"{API}/autocomplete", params={"q": "ch"}).json()["suggestions"]
+    assert sorted((item["kind"], item["text"]) for item in suggestions) == [("meal", "Chowder"), ("workout", "Chin-ups")]
@@ -0,0 +1,61 @@
+from app.models.workout import Workout
+from app.services.feed import feed_pipeline
+from app.services.query_plans import PipelineShape, build_query_shapes, check_plans
+
+
+def cursor_stage(*stages):
+    plan = {}
+    for stage in reversed(stages):
+        plan = {"stage": stage, **({"inputStage": plan} if plan else {})}
+    return {"$cursor": {"queryPlanner": {"winningPlan": plan}}}
+
+
+def union(coll, *stages):
+    return {"$unionWith": {"coll": coll, "pipeline": [cursor_stage(*stages)]}}
+
+
+def test_pipeline_needs_an_index_scan_for_every_collection_it_reads(client):
+    shape = PipelineShape("recent activity feed", Workout, feed_pipeline("someone", None, 20))
+    assert shape.reads() == 3
+    
+    indexed = {"stages": [
+        cursor_stage("LIMIT", "FETCH", "IXSCAN"),
+        union("meals", "LIMIT", "FETCH", "IXSCAN"),
+        union("weights", "LIMIT", "FETCH", "IXSCAN"),
+        {"$sort": {"sortKey": {"date": -1, "_id": -1}}},
+    ]}
+    assert check_plans(shape, indexed)["ok"]
+    
+    scanned = {"stages": [
+        cursor_stage("LIMIT", "FETCH", "IXSCAN"),
+        union("meals", "SORT", "COLLSCAN"),
+        union("weights", "LIMIT", "FETCH", "IXSCAN"),
+    ]}
+    assert not check_plans(shape, scanned)["ok"]
+    
+    unexplained = {"stages": [cursor_stage("LIMIT", "FETCH", "IXSCAN"), union("meals", "LIMIT", "FETCH", "IXSCAN")]}
+    assert not check_plans(shape, unexplained)["ok"]
+
+
+def test_analytics_reads_meals_and_workouts_through_indexes(client):
+    shape = next(shape for shape in build_query_shapes() if shape.name == "analytics")
+    assert shape.reads() == 2
+    
+    explanation = {"stages": [
+        cursor_stage("PROJECTION_SIMPLE", "FETCH", "IXSCAN"),
+        {"$project": {}},
+        union("workouts", "PROJECTION_SIMPLE", "FETCH", "IXSCAN"),
+        {"$facet": {}},
+    ]}
+    assert check_plans(shape, explanation)["ok"]
+
+
+def test_text_search_plan_counts_as_an_index_scan(client):
+    shape = next(shape for shape in build_query_shapes() if shape.name == "meals: text search")
+    
+    explanation = {"queryPlanner": {"winningPlan": {"queryPlan": {
+        "stage": "TEXT_MATCH",
+        "inputStage": {"stage": "FETCH", "inputStage": {"stage": "TEXT_OR", "inputStage": {"stage": "IXSCAN"}}},
+    }}}}
+    assert check_plans(shape, explanation)["ok"]
+    assert not check_plans(shape, {"queryPlanner": {"winningPlan": {"queryPlan": {"stage": "COLLSCAN"}}}})["ok"]
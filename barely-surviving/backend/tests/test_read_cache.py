@@ -0,0 +1,46 @@
+import asyncio
+
+from app.services.cache import ReadCache
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    cache = ReadCache(max_entries=10, ttl=60)
+    loads = []
+    
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.05)
+        return len(loads)
+    
+    async def leader_goes_away():
+        leader = asyncio.create_task(cache.get_or_load(("stats", "user"), loader, ["rollup:user"]))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_load(("stats", "user"), loader, ["rollup:user"])) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*waiters), leader.cancelled()
+    
+    results, leader_cancelled = asyncio.run(leader_goes_away())
+    assert leader_cancelled
+    assert results == [2, 2, 2]
+    assert len(loads) == 2
+
+
+def test_invalidating_a_tag_drops_only_its_entries():
+    cache = ReadCache(max_entries=10, ttl=60)
+    values = {"a": 1, "b": 1}
+    
+    async def lookups():
+        def load(name):
+            async def loader():
+                return values[name]
+            return loader
+        
+        await cache.get_or_load(("a",), load("a"), ["weights:a"])
+        await cache.get_or_load(("b",), load("b"), ["weights:b"])
+        values.update(a=2, b=2)
+        cache.invalidate("weights:a")
+        return await cache.get_or_load(("a",), load("a"), ["weights:a"]), await cache.get_or_load(("b",), load("b"), ["weights:b"])
+    
+    assert asyncio.run(lookups()) == (2, 1)
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from app import database
+
+
+def test_ready_once_the_pool_is_warm(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert set(response.json()["pool"]) == {"max_pool_size", "min_pool_size", "servers"}
+
+
+def test_not_ready_before_warm_up_or_when_mongodb_is_down(client, monkeypatch):
+    monkeypatch.setattr(database.db, "warm", False)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "unavailable", "detail": "MongoDB connection pool is not warmed up yet"}
+    
+    monkeypatch.setattr(database.db, "warm", True)
+    
+    async def unreachable(*args, **kwargs):
+        raise TimeoutError
+    
+    unreachable_client = SimpleNamespace(admin=SimpleNamespace(command=unreachable), close=lambda: None)
+    monkeypatch.setattr(database.db, "client", unreachable_client)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["detail"] == "TimeoutError"
+    
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from app.models.meal import Meal
+from app.services.rollups import meal_delta
+
+API = "/api/v1"
+
+
+def summary(client, day):
+    return client.get(f"{API}/meals/daily-summary", params={"target_date": day}).json()
+
+
+def test_offset_date_counts_on_its_utc_day(client):
+    meal = {"type": "dinner", "description": "Late pasta", "calories": 700, "date": "2026-03-01T23:30:00-05:00"}
+    assert client.post(f"{API}/meals", json=meal).status_code == 201
+    
+    assert summary(client, "2026-03-02")["total_calories"] == 700
+    assert summary(client, "2026-03-01")["total_calories"] == 0
+
+
+def test_delta_uses_the_utc_day_whatever_the_callers_offset():
+    late = datetime.fromisoformat("2026-03-01T23:30:00-05:00")
+    meal = Meal.model_construct(user_id="someone", date=late, calories=500, protein=20, carbs=None, fat=None)
+    _, day, delta = meal_delta(meal)
+    
+    assert day.isoformat() == "2026-03-02"
+    assert delta["calories_consumed"] == 500
+
+
+def test_rollup_follows_moves_and_deletes(client):
+    created = client.post(
+        f"{API}/meals", json={"type": "lunch", "description": "Soup", "calories": 300, "date": "2026-03-01T12:00:00"}
+    ).json()
+    client.put(f"{API}/meals/{created['_id']}", json={"date": "2026-03-03T12:00:00", "calories": 350})
+    assert (summary(client, "2026-03-01")["meal_count"], summary(client, "2026-03-03")["total_calories"]) == (0, 350)
+    
+    client.delete(f"{API}/meals/{created['_id']}")
+    assert summary(client, "2026-03-03")["meal_count"] == 0
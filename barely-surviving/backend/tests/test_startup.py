@@ -0,0 +1,58 @@
+import subprocess
+import sys
+import uuid
+
+import mongomock_motor
+from fastapi.testclient import TestClient
+
+from app import database
+from app.config import settings
+from app.main import app
+from app.models.meal import Meal
+from app.startup import startup_report
+
+
+def meal_indexes(client):
+    async def names():
+        return set(await Meal.get_motor_collection().index_information())
+    
+    return client.portal.call(names)
+
+
+async def background_build():
+    await database.db.index_task
+
+
+def start(monkeypatch, index_sync):
+    monkeypatch.setattr(database, "AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient)
+    monkeypatch.setattr(settings, "mongodb_db_name", f"test_{uuid.uuid4().hex}")
+    monkeypatch.setattr(settings, "index_sync", index_sync)
+    return TestClient(app)
+
+
+def test_index_sync_modes(monkeypatch):
+    with start(monkeypatch, "skip") as client:
+        assert meal_indexes(client) <= {"_id_"}
+        assert database.db.index_task is None
+    
+    with start(monkeypatch, "background") as client:
+        client.portal.call(background_build)
+        assert len(meal_indexes(client)) > 1
+    
+    with start(monkeypatch, "startup") as client:
+        assert len(meal_indexes(client)) > 1
+        assert client.get("/ready").status_code == 200
+
+
+def test_startup_phases_are_reported(client):
+    assert {"import", "init_beanie", "indexes", "warm_pool"} <= set(startup_report.phases)
+    lines = client.get("/metrics").text.splitlines()
+    assert any(line.startswith('startup_phase_seconds{phase="total"}') for line in lines)
+
+
+def test_heavy_optional_modules_are_imported_on_first_use():
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(sorted({'numpy', 'pyarrow'} & set(sys.modules)))"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert loaded.strip() == "[]"
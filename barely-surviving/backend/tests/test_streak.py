@@ -0,0 +1,29 @@
+from datetime import date, datetime, timedelta
+
+API = "/api/v1"
+
+
+def log_meal(client, days_ago):
+    day = datetime.combine(date.today() - timedelta(days=days_ago), datetime.min.time()) + timedelta(hours=12)
+    client.post(f"{API}/meals", json={"type": "lunch", "description": "Soup", "calories": 300, "date": day.isoformat()})
+
+
+def streak(client):
+    return client.get(f"{API}/dashboard/streak").json()
+
+
+def test_run_that_ended_before_yesterday_is_no_streak(client):
+    for days_ago in range(10, 4, -1):
+        log_meal(client, days_ago)
+    
+    assert streak(client) == {"streak": 0, "last_activity_date": (date.today() - timedelta(days=5)).isoformat()}
+
+
+def test_filling_the_gap_joins_the_older_run(client):
+    for days_ago in range(10, 4, -1):
+        log_meal(client, days_ago)
+    assert streak(client)["streak"] == 0
+    
+    for days_ago in range(4, -1, -1):
+        log_meal(client, days_ago)
+    assert streak(client) == {"streak": 11, "last_activity_date": date.today().isoformat()}
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.trend import EWMA_BLOCK, ewma, lttb, moving_average
+
+API = "/api/v1"
+
+
+def naive_ewma(values, alpha):
+    result, smoothed = [], values[0]
+    for value in values:
+        smoothed = smoothed + alpha * (value - smoothed)
+        result.append(smoothed)
+    return np.array(result)
+
+
+def test_moving_average_is_trailing_with_a_short_start():
+    assert moving_average(np.array([1.0, 2.0, 3.0, 4.0, 5.0]), 3).tolist() == [1.0, 1.5, 2.0, 3.0, 4.0]
+
+
+def test_ewma_matches_the_recurrence_across_blocks():
+    values = 180 + np.sin(np.arange(3 * EWMA_BLOCK + 17) / 10.0) * 5
+    assert np.allclose(ewma(values, 0.1), naive_ewma(values, 0.1))
+    assert len(ewma(np.array([]))) == 0
+
+
+def test_lttb_keeps_the_ends_and_the_spike():
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[42] = 10
+    
+    selected = lttb(x, y, 10)
+    assert len(selected) == 10
+    assert selected[0] == 0 and selected[-1] == 99
+    assert 42 in selected
+    assert list(selected) == sorted(selected)
+    assert lttb(x[:5], y[:5], 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_trend_is_downsampled_server_side(client):
+    today = date.today()
+    entries = [
+        {"weight": 200 - day * 0.1, "date": (today - timedelta(days=59 - day)).isoformat()}
+        for day in range(60)
+    ]
+    client.post(f"{API}/weight/bulk", json=entries)
+    
+    trend = client.get(f"{API}/weight/trend", params={"days": 90, "max_points": 12, "window": 5}).json()
+    assert trend["data_points"] == 60
+    assert trend["returned_points"] == len(trend["trend"]) == 12
+    assert trend["trend"][0]["date"] == entries[0]["date"]
+    assert trend["trend"][-1]["date"] == entries[-1]["date"]
+    assert trend["change"] == -5.9
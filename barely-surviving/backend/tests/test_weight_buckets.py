@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.models.weight_bucket import WeightBucket
+from app.services.pagination import encode_cursor
+from app.services.weight_store import get_weight_store
+
+API = "/api/v1"
+
+
+def test_feed_pages_through_sparse_buckets(client, monkeypatch):
+    """One weigh-in a month: the cursor's own bucket adds nothing to the next page"""
+    monkeypatch.setattr(settings, "weight_storage", "buckets")
+    for month in range(1, 7):
+        assert client.post(f"{API}/weight", json={"weight": 180 - month, "date": f"2026-{month:02d}-15"}).status_code == 201
+    user_id = client.headers[settings.user_id_header]
+    
+    async def page(cursor, limit):
+        pipeline = get_weight_store().feed_pipeline(user_id, cursor, limit)
+        return await WeightBucket.get_motor_collection().aggregate(pipeline).to_list(length=None)
+    
+    seen, cursor = [], None
+    while True:
+        docs = client.portal.call(page, cursor, 2)
+        seen += [doc["weight"] for doc in docs]
+        if len(docs) < 2:
+            break
+        cursor = encode_cursor(docs[-1])
+    
+    assert seen == [174, 175, 176, 177, 178, 179]
+
+
+class FailingMonth:
+    """Collection wrapper whose bulk upserts fail for one month, as a server-side write error would"""
+    
+    def __init__(self, collection, month):
+        self.collection = collection
+        self.month = month
+    
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+    
+    async def bulk_write(self, operations, ordered=True):
+        failed = [index for index, op in enumerate(operations) if op._filter["month"] == self.month]
+        await self.collection.bulk_write([op for index, op in enumerate(operations) if index not in failed], ordered=ordered)
+        raise BulkWriteError({"writeErrors": [{"index": index, "code": 2, "errmsg": "bad bucket"} for index in failed]})
+
+
+def test_bulk_write_error_fails_every_weight_in_its_month(client, monkeypatch):
+    monkeypatch.setattr(settings, "weight_storage", "buckets")
+    store = get_weight_store()
+    collection = store._collection()
+    monkeypatch.setattr(store, "_collection", lambda: FailingMonth(collection, datetime(2026, 2, 1)))
+    items = [
+        {"weight": 180, "date": "2026-01-10"},
+        {"weight": 179, "date": "2026-02-10"},
+        {"weight": 178, "date": "2026-01-20"},
+        {"weight": 177, "date": "2026-02-20"},
+    ]
+    report = client.post(f"{API}/weight/bulk", json=items).json()
+    
+    assert (report["inserted"], report["failed"]) == (2, 2)
+    assert [error["index"] for error in report["errors"]] == [1, 3]
+    assert [weight["weight"] for weight in client.get(f"{API}/weight").json()] == [178, 180]
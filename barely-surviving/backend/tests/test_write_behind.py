@@ -0,0 +1,44 @@
+import time
+
+from app.config import settings
+from app.models.meal import Meal
+from app.services.write_behind import write_queue
+
+API = "/api/v1"
+
+
+def stored_meals(client):
+    async def count():
+        return await Meal.get_motor_collection().count_documents({})
+    
+    return client.portal.call(count)
+
+
+def log_meal(client, description):
+    response = client.post(f"{API}/meals", json={"type": "snack", "description": description, "calories": 100})
+    assert response.status_code == 202
+    return response.json()
+
+
+def test_full_batches_flush_and_the_rest_waits_for_the_timer(client, monkeypatch):
+    monkeypatch.setattr(settings, "write_behind", True)
+    monkeypatch.setattr(settings, "write_behind_batch_size", 3)
+    monkeypatch.setattr(settings, "write_behind_flush_ms", 500)
+    client.portal.call(write_queue.start)
+    try:
+        ids = [log_meal(client, f"Snack {number}")["_id"] for number in range(3)]
+        client.portal.call(write_queue._queue.join)
+        assert stored_meals(client) == 3
+        
+        ids.append(log_meal(client, "Snack 3")["_id"])
+        time.sleep(0.05)
+        assert stored_meals(client) == 3
+    finally:
+        client.portal.call(write_queue.stop)
+    
+    # Shutdown drains the partial batch
+    assert stored_meals(client) == 4
+    assert not write_queue.enabled
+    assert client.get(f"{API}/meals/{ids[-1]}").json()["description"] == "Snack 3"
+    stats = client.get(f"{API}/dashboard/stats").json()
+    assert (stats["meal_count"], stats["calories_consumed"]) == (4, 400)
@@ -50,7 +50,7 @@ export const goals = {
 export const dashboard = {
   getStats: (date) => api.get('/dashboard/stats', { params: { target_date: date } }),
   getStreak: () => api.get('/dashboard/streak'),
-  getRecentActivity: (limit = 10) => api.get('/dashboard/recent-activity', { params: { limit } }),
+  getRecentActivity: (limit = 10, cursor) => api.get('/dashboard/recent-activity', { params: { limit, cursor } }),
 };
 
 export default api;